@@ -0,0 +1,231 @@
+"""Client overhead of every runtime and HTTP backend against a local mock server.
+
+The mock server waits a fixed delay before the first token and between
+tokens, so whatever the client measures above those delays is overhead of
+the client itself (plus loopback). Each combination runs in its own process.
+
+    python benchmarks/client_overhead.py --num_request 4000 --concurrency 512
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import orjson
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+RUNTIMES = ["asyncio", "uvloop"]
+BACKENDS = ["httpx", "aiohttp", "raw"]
+
+
+async def handle_connection(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    first_token_delay: float,
+    token_interval: float,
+    output_tokens: int,
+) -> None:
+    try:
+        while True:
+            if not await reader.readline():
+                return
+            content_length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    content_length = int(value)
+            await reader.readexactly(content_length)
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                b"Transfer-Encoding: chunked\r\n\r\n"
+            )
+
+            def send(data: bytes) -> None:
+                event = b"data: " + data + b"\n\n"
+                writer.write(b"%x\r\n%s\r\n" % (len(event), event))
+
+            await asyncio.sleep(first_token_delay)
+            for index in range(output_tokens):
+                if index > 0:
+                    await asyncio.sleep(token_interval)
+                send(b'{"choices":[{"delta":{"content":"hi "}}]}')
+                await writer.drain()
+            send(
+                b'{"choices":[],"usage":{"prompt_tokens":8,"completion_tokens":%d,'
+                b'"total_tokens":%d}}' % (output_tokens, output_tokens + 8)
+            )
+            send(b"[DONE]")
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(port: int, args: argparse.Namespace) -> None:
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(
+            reader=reader,
+            writer=writer,
+            first_token_delay=args.first_token_delay,
+            token_interval=args.token_interval,
+            output_tokens=args.output_tokens,
+        ),
+        host="127.0.0.1",
+        port=port,
+        backlog=4096,
+    )
+    async with server:
+        await server.serve_forever()
+
+
+async def run_client(backend: str, port: int, args: argparse.Namespace) -> dict:
+    import httpx
+
+    from utils.client_openai import request_openai_format
+    from utils.transport import create_transport
+
+    url = f"http://127.0.0.1:{port}/v1/chat/completions"
+    headers = {"Content-Type": "application/json"}
+    payload = {
+        "model": "mock",
+        "messages": [{"role": "user", "content": "how are you?"}],
+        "max_completion_tokens": args.output_tokens,
+        "stream": True,
+        "stream_options": {"include_usage": True},
+    }
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(limits=limits) as aclient:
+        transport = create_transport(
+            backend=backend, aclient=aclient, max_connections=args.concurrency
+        )
+
+        async def one_request() -> tuple[float, float]:
+            async with semaphore:
+                result = await request_openai_format(
+                    transport=transport,
+                    url=url,
+                    headers=headers,
+                    payload=payload,
+                    timeout=120,
+                )
+                return result.ttft, result.latency
+
+        try:
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            results = await asyncio.gather(
+                *[one_request() for _ in range(args.num_request)]
+            )
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+        finally:
+            await transport.aclose()
+
+    ttft = np.asarray([r[0] for r in results])
+    latency = np.asarray([r[1] for r in results])
+    ttft_overhead = (ttft - args.first_token_delay) * 1000
+    tpot_overhead = (
+        (latency - ttft) / max(args.output_tokens - 1, 1) - args.token_interval
+    ) * 1000
+
+    return {
+        "Request per second (req/s)": round(args.num_request / wall, 2),
+        "P50 ttft overhead (ms)": round(float(np.percentile(ttft_overhead, 50)), 2),
+        "P99 ttft overhead (ms)": round(float(np.percentile(ttft_overhead, 99)), 2),
+        "P50 tpot overhead (ms)": round(float(np.percentile(tpot_overhead, 50)), 3),
+        "CPU per request (ms)": round(cpu / args.num_request * 1000, 3),
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    script = os.path.abspath(__file__)
+    forwarded = [
+        f"--num_request={args.num_request}",
+        f"--concurrency={args.concurrency}",
+        f"--first_token_delay={args.first_token_delay}",
+        f"--token_interval={args.token_interval}",
+        f"--output_tokens={args.output_tokens}",
+    ]
+    server = subprocess.Popen(
+        [sys.executable, script, f"--serve={args.port}", *forwarded]
+    )
+    try:
+        time.sleep(1)
+        rows = list()
+        for runtime, backend in itertools.product(args.runtimes, args.backends):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    script,
+                    f"--client={runtime},{backend}",
+                    f"--port={args.port}",
+                    *forwarded,
+                ],
+                capture_output=True,
+                text=True,
+            )
+            if output.returncode != 0:
+                print(
+                    f"❌ {runtime}/{backend}: {output.stderr.strip().splitlines()[-1]}"
+                )
+                continue
+            rows.append(
+                {"Runtime": runtime, "Backend": backend, **json.loads(output.stdout)}
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = [max(len(c), *(len(str(row[c])) for row in rows)) for c in columns]
+    print(" | ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("-+-".join("-" * w for w in widths))
+    for row in rows:
+        print(" | ".join(str(row[c]).ljust(w) for c, w in zip(columns, widths)))
+
+
+if __name__ == "__main__":
+    parse = argparse.ArgumentParser()
+    parse.add_argument("--num_request", type=int, default=2000)
+    parse.add_argument("--concurrency", type=int, default=256)
+    parse.add_argument("--first_token_delay", type=float, default=0.05)
+    parse.add_argument("--token_interval", type=float, default=0.01)
+    parse.add_argument("--output_tokens", type=int, default=32)
+    parse.add_argument("--port", type=int, default=18123)
+    parse.add_argument("--runtimes", type=str, nargs="+", default=RUNTIMES)
+    parse.add_argument("--backends", type=str, nargs="+", default=BACKENDS)
+    parse.add_argument("--serve", type=int, default=None, help=argparse.SUPPRESS)
+    parse.add_argument("--client", type=str, default=None, help=argparse.SUPPRESS)
+    args = parse.parse_args()
+
+    from utils.transport import install_event_loop
+
+    if args.serve is not None:
+        try:
+            install_event_loop(runtime="uvloop")
+        except RuntimeError:
+            pass
+        asyncio.run(serve(port=args.serve, args=args))
+    elif args.client is not None:
+        runtime, backend = args.client.split(",")
+        install_event_loop(runtime=runtime)
+        result = asyncio.run(run_client(backend=backend, port=args.port, args=args))
+        print(orjson.dumps(result).decode())
+    else:
+        main(args=args)
@@ -0,0 +1,100 @@
+"""Report generation time versus number of samples.
+
+Fills Samples with synthetic requests and times generate_test_report with
+the analyses that scan every sample switched on.
+
+    python benchmarks/report_time.py --sizes 1000 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+from array import array
+
+import numpy as np
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from type.metrics import Samples, Stats  # noqa: E402
+from utils.reporting import generate_test_report  # noqa: E402
+
+
+def build_samples(size: int, seed: int = 0) -> Samples:
+    rng = np.random.default_rng(seed)
+    ttft = rng.lognormal(mean=-3.0, sigma=0.5, size=size)
+    completion_tokens = rng.integers(1, 1024, size=size)
+    latency = ttft + completion_tokens * rng.uniform(0.01, 0.03, size=size)
+    prompt_tokens = rng.integers(16, 8192, size=size)
+
+    samples = Samples()
+    samples.ttft = array("d", ttft.tobytes())
+    samples.ttfb = array("d", (ttft * 0.9).tobytes())
+    samples.latency = array("d", latency.tobytes())
+    samples.prompt_tokens = array("q", prompt_tokens.tobytes())
+    samples.completion_tokens = array("q", completion_tokens.tobytes())
+    samples.token = array("q", (prompt_tokens + completion_tokens).tobytes())
+    samples.start_time = array("d", np.sort(rng.uniform(0, 600, size=size)).tobytes())
+    samples.turn = array("q", rng.integers(0, 4, size=size).tobytes())
+    samples.attempts = array("q", np.ones(size, dtype=np.int64).tobytes())
+    samples.retry_wait = array("d", np.zeros(size).tobytes())
+    samples.queue_time = array("d", np.zeros(size).tobytes())
+    return samples
+
+
+def time_report(samples: Samples, args: argparse.Namespace) -> float:
+    size = len(samples.ttft)
+    stats = Stats(
+        started_requests=size,
+        finished_requests=size,
+        successful_requests=size,
+        attempts=size,
+    )
+    start = time.perf_counter()
+    generate_test_report(
+        model_server="http://localhost:8000",
+        current_time="",
+        run_label="report_time",
+        model="mock",
+        completion_type="chat",
+        max_tokens=1024,
+        num_concurrency=256,
+        stats=stats,
+        duration=600.0,
+        dataset="",
+        prompt="",
+        samples=samples,
+        stop_reason="done",
+        session_mode=True,
+        benchmark_start=0.0,
+        slo_ttft=100.0,
+        slo_tpot=25.0,
+        slo_window=10.0,
+        bootstrap=args.bootstrap,
+        length_analysis=True,
+        max_retries=1,
+    )
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parse = argparse.ArgumentParser()
+    parse.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000]
+    )
+    parse.add_argument("--repeat", type=int, default=3)
+    parse.add_argument(
+        "--bootstrap",
+        action="store_true",
+        default=False,
+        help="Include the bootstrap confidence intervals.",
+    )
+    args = parse.parse_args()
+
+    print(f"{'Samples':>10} | {'Best (ms)':>10} | {'Per sample (ns)':>15}")
+    for size in args.sizes:
+        samples = build_samples(size=size)
+        best = min(time_report(samples=samples, args=args) for _ in range(args.repeat))
+        print(f"{size:>10} | {best * 1000:>10.2f} | {best / size * 1e9:>15.1f}")
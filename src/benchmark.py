@@ -1,26 +1,90 @@
 import argparse
 import asyncio
 import os
+import random
 import time
+from dataclasses import asdict, replace
 from datetime import datetime
 from typing import Literal
 
 import httpx
 import tqdm
 
-from type.metrics import Stats
+from type.checkpoint import CheckpointState
+from type.metrics import Samples, Stats
+from type.phase import Phase
 from type.report import Report
+from type.request import (
+    RequestResult,
+    RequestSpec,
+    RetryPolicy,
+    StructuredOutputSchema,
+)
 from type.run_args import Args
-from utils.client_openai import build_payload, request_openai_format
-from utils.datasets import build_dataset
-from utils.lmcache import get_lmcache_metrics
-from utils.reporting import generate_test_report, save_report_as_file, show_report
+from utils.abort import draw_abort_point
+from utils.checkpoint import Checkpointer, load_checkpoint_state
+from utils.client_openai import (
+    COMPLETION_TYPES,
+    build_payload,
+    request_openai_format,
+)
+from utils.concurrency import AIMDController, ResizableSemaphore, ramp_concurrency
+from utils.datasets import (
+    build_dataset,
+    build_session_dataset,
+    calibrate_tokens_per_word,
+)
+from utils.html_report import save_html_report
+from utils.lmcache import get_lmcache_metrics, get_settled_lmcache_metrics
+from utils.monitor import ClientMonitor
+from utils.phases import flush_prefix_cache, parse_phases
+from utils.profiling import (
+    FunctionProfiler,
+    SpanProfiler,
+    StackSampler,
+    profile_span,
+)
+from utils.reporting import (
+    generate_long_context_summary,
+    generate_repeat_summary,
+    generate_test_report,
+    save_long_context_summary_as_file,
+    save_repeat_summary_as_file,
+    save_report_as_file,
+    show_long_context_summary,
+    show_repeat_summary,
+    show_report,
+)
+from utils.retry import classify_failure, parse_retry_on, retry_delay, should_retry
+from utils.schedule import (
+    RequestScheduler,
+    load_schedule,
+    phase_seed,
+    save_schedule,
+    schedule_path,
+)
+from utils.server_metrics import ServerMetricsScraper
+from utils.store import ingest_report
+from utils.structured_output import load_structured_outputs
+from utils.tokenizer import LocalTokenizer
+from utils.transport import Transport, create_transport, install_event_loop
 from utils.utils import extract_ip_from_url, verbose_log
 
 
-async def main(
-    args: Args, current_time: str, run_label: Literal["cold", "warm", "single"]
+async def run_phase(
+    args: Args,
+    current_time: str,
+    phase: Phase,
+    transport: Transport,
+    test_datasets: list,
+    tokenizer: LocalTokenizer | None,
+    aclient: httpx.AsyncClient,
+    checkpointer: Checkpointer | None = None,
+    resumed: bool = False,
+    scheduler: RequestScheduler | None = None,
+    structured_outputs: list[StructuredOutputSchema] | None = None,
 ) -> Report:
+    run_label = phase.label
     assert args.concurrency >= 1, (
         f"concurrency is {args.concurrency}, must be greater than or equal to 1."
     )
@@ -33,52 +97,242 @@ async def main(
     assert args.temperature >= 0.0, (
         f"temperature is {args.temperature}, must be greater than or equal 0.0."
     )
-
-    print("🛠️  Building datasets")
-    test_datasets_cycle = await build_dataset(
-        path=args.dataset_path, prompt=args.prompt
+    if args.session_mode:
+        assert args.endpoint == "/v1/chat/completions", (
+            "session_mode only supports the /v1/chat/completions endpoint."
+        )
+        assert args.dataset_path, "session_mode requires dataset_path."
+        assert args.think_time >= 0.0, (
+            f"think_time is {args.think_time}, must be greater than or equal 0.0."
+        )
+    if args.adaptive_concurrency:
+        assert args.target_ttft > 0.0, (
+            f"target_ttft is {args.target_ttft}, must be greater than 0.0."
+        )
+        assert args.max_concurrency >= args.concurrency, (
+            f"max_concurrency is {args.max_concurrency}, must be greater than or equal to concurrency."
+        )
+        assert args.control_interval > 0.0, (
+            f"control_interval is {args.control_interval}, must be greater than 0.0."
+        )
+    if args.abort_fraction > 0:
+        assert args.abort_fraction <= 1.0, (
+            f"abort_fraction is {args.abort_fraction}, must be less than or equal to 1.0."
+        )
+        assert args.abort_after_tokens >= 1 or args.abort_after_time > 0.0, (
+            "abort_after_tokens or abort_after_time is required with abort_fraction."
+        )
+        assert args.abort_window > 0.0, (
+            f"abort_window is {args.abort_window}, must be greater than 0.0."
+        )
+    assert args.max_retries >= 0, (
+        f"max_retries is {args.max_retries}, must be greater than or equal 0."
+    )
+    assert args.retry_base_delay >= 0.0 and args.retry_max_delay >= 0.0, (
+        "retry_base_delay and retry_max_delay must be greater than or equal 0.0."
+    )
+    assert args.monitor_interval > 0.0, (
+        f"monitor_interval is {args.monitor_interval}, must be greater than 0.0."
+    )
+    assert args.slo_window > 0.0, (
+        f"slo_window is {args.slo_window}, must be greater than 0.0."
+    )
+    streaming = args.endpoint != "/v1/embeddings" and not args.no_stream
+    assert args.batch_size >= 1, (
+        f"batch_size is {args.batch_size}, must be greater than or equal to 1."
     )
+    if args.batch_size > 1:
+        assert args.endpoint == "/v1/embeddings" or (
+            args.endpoint == "/v1/completions" and args.no_stream
+        ), "batch_size only supports /v1/embeddings and /v1/completions with no_stream."
+    if args.abort_fraction > 0:
+        assert streaming, "abort_fraction requires a streaming endpoint."
+    if args.context_len > 0:
+        assert args.endpoint != "/v1/embeddings" and not args.session_mode, (
+            "context_len does not support /v1/embeddings or session_mode."
+        )
+    assert args.scrape_interval > 0.0, (
+        f"scrape_interval is {args.scrape_interval}, must be greater than 0.0."
+    )
+    if checkpointer is not None:
+        assert not args.adaptive_concurrency, (
+            "checkpoint_interval does not support adaptive_concurrency."
+        )
 
     url = args.base_url.strip("/") + args.endpoint
     headers = {"Content-Type": "application/json"}
     if args.api_key is not None:
         headers.update({"Authorization": f"Bearer {args.api_key}"})
-    completion_type = "chat" if args.endpoint == "/v1/chat/completions" else "generate"
+    completion_type = COMPLETION_TYPES[args.endpoint]
 
-    semaphore = asyncio.Semaphore(args.concurrency)
+    # A ramp phase starts from a single in-flight request
+    semaphore = ResizableSemaphore(1 if phase.kind == "ramp" else args.concurrency)
+    # Runners are started up to the ceiling, the semaphore limit decides
+    # how many of them are in flight
+    num_runners = (
+        args.max_concurrency if args.adaptive_concurrency else args.concurrency
+    )
 
     stats = Stats()
+    elapsed = 0.0
+    if resumed:
+        stats = Stats(**checkpointer.state.stats)
+        # Requests in flight at the checkpoint are lost, not finished
+        stats.started_requests = stats.finished_requests
+        elapsed = checkpointer.state.elapsed
     requests_lock = asyncio.Lock()
 
-    ttft_list: list[float] = list()
-    latencies: list[float] = list()
-    tokens: list[int] = list()
+    samples = Samples()
+    issued_requests = stats.finished_requests
+    issued_sessions = 0
+    profiler = SpanProfiler() if args.profile else None
+    retry_policy = RetryPolicy(
+        max_retries=args.max_retries,
+        retry_on=parse_retry_on(spec=args.retry_on),
+        backoff=args.retry_backoff,
+        base_delay=args.retry_base_delay,
+        max_delay=args.retry_max_delay,
+        jitter=args.retry_jitter,
+        respect_retry_after=not args.ignore_retry_after,
+    )
+
+    def request_rng(key: str) -> random.Random:
+        # Abort point and retry jitter of one request; a stream per request
+        # keeps them independent of the order other requests finish in
+        return random.Random(
+            phase_seed(seed=args.seed, label=f"{run_label}:client:{key}")
+        )
+
+    def in_abort_storm() -> bool:
+        elapsed = time.perf_counter() - stress_test_start_time
+        return elapsed >= args.abort_start and (
+            args.abort_duration <= 0 or elapsed < args.abort_start + args.abort_duration
+        )
+
+    def update_progress(
+        pbar: tqdm.tqdm | None, mode: Literal["duration_time", "num_request"]
+    ) -> None:
+        if pbar is None:
+            return
+
+        postfix = dict(
+            started=stats.started_requests,
+            successful=stats.successful_requests,
+            failed=stats.failed_requests,
+            timeout=stats.timeout_requests,
+            non_200=stats.non_200_requests,
+        )
+        if args.max_retries > 0:
+            postfix["retries"] = stats.retries
+        if args.abort_fraction > 0:
+            postfix["aborted"] = stats.aborted_requests
+        pbar.set_postfix(**postfix)
+        if mode == "num_request":
+            pbar.update(1)
 
     async def worker(
-        semaphore: asyncio.Semaphore,
-        aclient: httpx.AsyncClient,
+        semaphore: ResizableSemaphore,
+        transport: Transport,
         url: str,
         headers: dict,
         timeout: int,
         pbar: tqdm.tqdm | None = None,
         mode: Literal["duration_time", "num_request"] = "num_request",
-    ):
-        prompt = next(test_datasets_cycle)
-        payload = build_payload(
-            completion_type=completion_type, prompt=prompt, args=args
-        )
+        payload: dict | None = None,
+        turn: int = 0,
+        collect_output: bool = False,
+        spec: RequestSpec | None = None,
+        session: int = 0,
+    ) -> RequestResult | None:
+        if payload is None:
+            scheduler.record(spec=spec)
+            with profile_span(profiler=profiler, name="build_payload"):
+                payload = build_payload(
+                    completion_type=completion_type,
+                    prompt=spec.prompt,
+                    args=args,
+                    max_tokens=spec.max_tokens,
+                    seed=spec.seed,
+                    structured=(
+                        structured_outputs[spec.schema].payload
+                        if structured_outputs is not None and spec.schema is not None
+                        else None
+                    ),
+                )
+        queued = time.perf_counter()
         async with semaphore:
+            queue_time = time.perf_counter() - queued
             async with requests_lock:
                 stats.started_requests += 1
 
-            try:
-                _ttft, _latency, _token = await request_openai_format(
-                    aclient=aclient,
-                    url=url,
-                    headers=headers,
-                    payload=payload,
-                    timeout=timeout,
+            rng = (
+                request_rng(
+                    key=str(spec.index) if spec is not None else f"{session}:{turn}"
+                )
+                if args.abort_fraction > 0 or retry_policy.max_retries > 0
+                else None
+            )
+            abort = (
+                draw_abort_point(
+                    fraction=args.abort_fraction,
+                    after_tokens=args.abort_after_tokens,
+                    after_time=args.abort_after_time,
+                    distribution=args.abort_distribution,
+                    rng=rng,
                 )
+                if args.abort_fraction > 0 and in_abort_storm()
+                else None
+            )
+
+            request_start = time.perf_counter()
+            attempt = 0
+            try:
+                # A retrying client keeps its concurrency slot while it backs off
+                while True:
+                    attempt += 1
+                    attempt_start = time.perf_counter()
+                    async with requests_lock:
+                        stats.attempts += 1
+
+                    try:
+                        result = await request_openai_format(
+                            transport=transport,
+                            url=url,
+                            headers=headers,
+                            payload=payload,
+                            timeout=timeout,
+                            collect_output=collect_output or tokenizer is not None,
+                            ttft_include_reasoning=args.ttft_include_reasoning,
+                            abort=abort,
+                            profiler=profiler,
+                        )
+                        failure = None
+                        break
+                    except Exception as e:
+                        failure = classify_failure(error=e)
+
+                    samples.add_error(
+                        failure=failure,
+                        start_time=attempt_start,
+                        latency=time.perf_counter() - attempt_start,
+                    )
+                    if not should_retry(
+                        policy=retry_policy, failure=failure, attempt=attempt
+                    ):
+                        break
+
+                    delay = retry_delay(
+                        policy=retry_policy, failure=failure, attempt=attempt, rng=rng
+                    )
+                    async with requests_lock:
+                        stats.retries += 1
+                        stats.backoff_time += delay
+                    verbose_log(
+                        msg=f"{failure.message}, retry {attempt}/{retry_policy.max_retries} in {delay:.2f}s",
+                        pbar=pbar,
+                        verbose=args.verbose,
+                    )
+                    await asyncio.sleep(delay)
             except asyncio.CancelledError:
                 err_msg = "Request cancelled by user"
                 async with requests_lock:
@@ -86,278 +340,814 @@ async def main(
 
                 verbose_log(msg=err_msg, pbar=pbar, verbose=args.verbose)
                 raise
-            except httpx.ConnectTimeout:
-                err_msg = "Request failed: ConnectTimeout (DNS/TCP/TLS handshake)"
-                async with requests_lock:
-                    stats.timeout_requests += 1
-                    stats.failed_requests += 1
-                    stats.finished_requests += 1
-
-                    if pbar is not None:
-                        pbar.set_postfix(
-                            started=stats.started_requests,
-                            successful=stats.successful_requests,
-                            failed=stats.failed_requests,
-                            timeout=stats.timeout_requests,
-                            non_200=stats.non_200_requests,
-                        )
-                        if mode == "num_request":
-                            pbar.update(1)
 
-                verbose_log(msg=err_msg, pbar=pbar, verbose=args.verbose)
-                return
-            except httpx.WriteTimeout:
-                err_msg = "Request failed: WriteTimeout (likely while sending the request body)"
-                async with requests_lock:
+        if failure is not None:
+            samples.add_missed(end_time=time.perf_counter(), turn=turn)
+            async with requests_lock:
+                stats.failed_requests += 1
+                stats.finished_requests += 1
+                if failure.timeout:
                     stats.timeout_requests += 1
-                    stats.failed_requests += 1
-                    stats.finished_requests += 1
-
-                    if pbar is not None:
-                        pbar.set_postfix(
-                            started=stats.started_requests,
-                            successful=stats.successful_requests,
-                            failed=stats.failed_requests,
-                            timeout=stats.timeout_requests,
-                            non_200=stats.non_200_requests,
-                        )
-                        if mode == "num_request":
-                            pbar.update(1)
+                if failure.non_200:
+                    stats.non_200_requests += 1
+                if attempt > 1:
+                    stats.retry_exhausted += 1
 
-                verbose_log(msg=err_msg, pbar=pbar, verbose=args.verbose)
-                return
-            except httpx.PoolTimeout:
-                err_msg = (
-                    "Request failed: PoolTimeout (no available connection in pool)"
+                update_progress(pbar=pbar, mode=mode)
+
+            verbose_log(msg=failure.message, pbar=pbar, verbose=args.verbose)
+            return None
+
+        result.attempts = attempt
+        result.retry_wait = attempt_start - request_start
+        result.queue_time = queue_time
+        if spec is not None and spec.schema is not None:
+            result.schema = spec.schema
+
+        if result.aborted:
+            samples.add_abort(result=result)
+            samples.add_missed(end_time=result.start_time + result.latency, turn=turn)
+            async with requests_lock:
+                stats.aborted_requests += 1
+                stats.finished_requests += 1
+
+                update_progress(pbar=pbar, mode=mode)
+
+            verbose_log(
+                msg=f"Request aborted after {result.output_chunks} tokens",
+                pbar=pbar,
+                verbose=args.verbose,
+            )
+            return None
+
+        if tokenizer is not None and not result.usage_reported:
+            result.prompt_tokens = await tokenizer.count_payload_tokens(payload=payload)
+            result.completion_tokens = await tokenizer.count_tokens(
+                text=result.output_text
+            )
+            result.token = result.prompt_tokens + result.completion_tokens
+
+        with profile_span(profiler=profiler, name="stats_update"):
+            samples.add(result=result, turn=turn)
+
+            async with requests_lock:
+                stats.successful_requests += 1
+                stats.finished_requests += 1
+
+                update_progress(pbar=pbar, mode=mode)
+
+        return result
+
+    async def session_runner(
+        transport: Transport,
+        end_time: float | None,
+        pbar: tqdm.tqdm,
+        mode: Literal["duration_time", "num_request"],
+    ) -> None:
+        # Each runner is one virtual user replaying whole conversations,
+        # resending the growing history on every turn.
+        nonlocal issued_requests, issued_sessions
+
+        def session_finished() -> bool:
+            if mode == "duration_time":
+                return time.perf_counter() >= end_time
+            return issued_requests >= args.num_request
+
+        while not session_finished():
+            # Conversations are taken in order from the start of the dataset
+            session = issued_sessions
+            conversation = test_datasets[session % len(test_datasets)]
+            issued_sessions += 1
+            if args.max_turns > 0:
+                conversation = conversation[: args.max_turns]
+
+            messages: list[dict[str, str]] = list()
+            for turn, (user_msg, dataset_reply) in enumerate(conversation):
+                if session_finished():
+                    return
+
+                issued_requests += 1
+                messages.append({"role": "user", "content": user_msg})
+                payload = build_payload(
+                    completion_type=completion_type,
+                    prompt=user_msg,
+                    args=args,
+                    messages=messages,
                 )
-                async with requests_lock:
-                    stats.timeout_requests += 1
-                    stats.failed_requests += 1
-                    stats.finished_requests += 1
-
-                    if pbar is not None:
-                        pbar.set_postfix(
-                            started=stats.started_requests,
-                            successful=stats.successful_requests,
-                            failed=stats.failed_requests,
-                            timeout=stats.timeout_requests,
-                            non_200=stats.non_200_requests,
-                        )
-                        if mode == "num_request":
-                            pbar.update(1)
+                result = await worker(
+                    semaphore=semaphore,
+                    transport=transport,
+                    url=url,
+                    headers=headers,
+                    timeout=args.timeout,
+                    pbar=pbar,
+                    mode=mode,
+                    payload=payload,
+                    turn=turn,
+                    collect_output=args.session_reply == "model",
+                    session=session,
+                )
+                if result is None:
+                    break
 
-                verbose_log(msg=err_msg, pbar=pbar, verbose=args.verbose)
-                return
-            except asyncio.TimeoutError:
-                err_msg = (
-                    "Request failed: TimeoutError (overall request timeout exceeded)"
+                reply = (
+                    result.output_text
+                    if args.session_reply == "model"
+                    else dataset_reply
                 )
-                async with requests_lock:
-                    stats.timeout_requests += 1
-                    stats.failed_requests += 1
-                    stats.finished_requests += 1
-
-                    if pbar is not None:
-                        pbar.set_postfix(
-                            started=stats.started_requests,
-                            successful=stats.successful_requests,
-                            failed=stats.failed_requests,
-                            timeout=stats.timeout_requests,
-                            non_200=stats.non_200_requests,
-                        )
-                        if mode == "num_request":
-                            pbar.update(1)
+                messages.append({"role": "assistant", "content": reply})
 
-                verbose_log(msg=err_msg, pbar=pbar, verbose=args.verbose)
-                return
-            except httpx.HTTPStatusError as e:
-                err_msg = f"Request failed: HTTPStatusError (status code: {e.response.status_code}, mes: {e})"
-                async with requests_lock:
-                    stats.failed_requests += 1
-                    stats.non_200_requests += 1
-                    stats.finished_requests += 1
-
-                    if pbar is not None:
-                        pbar.set_postfix(
-                            started=stats.started_requests,
-                            successful=stats.successful_requests,
-                            failed=stats.failed_requests,
-                            timeout=stats.timeout_requests,
-                            non_200=stats.non_200_requests,
-                        )
-                        if mode == "num_request":
-                            pbar.update(1)
+                if args.think_time > 0:
+                    await asyncio.sleep(args.think_time)
 
-                verbose_log(msg=err_msg, pbar=pbar, verbose=args.verbose)
-                return
-            except Exception as e:
-                err_msg = str(e)
-                async with requests_lock:
-                    stats.failed_requests += 1
-                    stats.finished_requests += 1
-
-                    if pbar is not None:
-                        pbar.set_postfix(
-                            started=stats.started_requests,
-                            successful=stats.successful_requests,
-                            failed=stats.failed_requests,
-                            timeout=stats.timeout_requests,
-                        )
-                        if mode == "num_request":
-                            pbar.update(1)
+    async def dispatch_open_loop(
+        end_time: float | None,
+        pbar: tqdm.tqdm,
+        mode: Literal["duration_time", "num_request"],
+        num_request: int = 0,
+    ) -> None:
+        # Requests start at their arrival time whether or not earlier ones
+        # have finished; the semaphore still caps how many are in flight
+        tasks: set[asyncio.Task] = set()
+        issued = 0
+        try:
+            while mode == "duration_time" or issued < num_request:
+                spec = scheduler.next()
+                if spec is None:
+                    break
+                if spec.arrival < elapsed:
+                    # Sent before the checkpoint this phase resumes from
+                    continue
+                arrival = stress_test_start_time + spec.arrival
+                if end_time is not None and arrival >= end_time:
+                    break
+                await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
 
-                verbose_log(msg=err_msg, pbar=pbar, verbose=args.verbose)
-                return
-
-        ttft_list.append(_ttft)
-        latencies.append(_latency)
-        tokens.append(_token)
-
-        async with requests_lock:
-            stats.successful_requests += 1
-            stats.finished_requests += 1
-
-            if pbar is not None:
-                pbar.set_postfix(
-                    started=stats.started_requests,
-                    successful=stats.successful_requests,
-                    failed=stats.failed_requests,
-                    timeout=stats.timeout_requests,
-                    non_200=stats.non_200_requests,
+                task = asyncio.create_task(
+                    worker(
+                        semaphore=semaphore,
+                        transport=transport,
+                        url=url,
+                        headers=headers,
+                        timeout=args.timeout,
+                        pbar=pbar,
+                        mode=mode,
+                        spec=spec,
+                    )
                 )
-                if mode == "num_request":
-                    pbar.update(1)
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                issued += 1
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
 
-    async with httpx.AsyncClient() as aclient:
-        try:
-            print("✅ Check model-server")
-            warmup_payload = build_payload(
-                completion_type=completion_type, prompt="how are you?", args=args
-            )
-            (
-                test_ttft,
-                test_latency,
-                test_token,
-            ) = await request_openai_format(
-                aclient=aclient,
-                url=url,
-                headers=headers,
-                payload=warmup_payload,
-                timeout=args.timeout,
+    if resumed:
+        print(
+            f"\n===== ⏯️  Resume {phase.kind} phase ({run_label}) at {elapsed:.0f}s, {stats.finished_requests} requests ====="
+        )
+    else:
+        print(f"\n===== 🏃 Start {phase.kind} phase ({run_label}) =====")
+    # A resumed phase keeps its clock, so time-based settings and sample
+    # timestamps continue where the checkpoint left off
+    stress_test_start_time = time.perf_counter() - elapsed
+    monitor = ClientMonitor(interval=args.monitor_interval)
+    monitor.start(start_time=stress_test_start_time)
+    scraper = None
+    if args.server_metrics or args.context_len > 0:
+        scraper = ServerMetricsScraper(
+            aclient=aclient, base_url=args.base_url, interval=args.scrape_interval
+        )
+        scraper.start(start_time=stress_test_start_time)
+
+    controller = None
+    controller_task = None
+    ramp_task = None
+    if phase.kind == "ramp":
+        ramp_task = asyncio.create_task(
+            ramp_concurrency(
+                semaphore=semaphore,
+                target=args.concurrency,
+                duration=args.duration_time,
             )
-            if test_ttft is None or test_latency is None or test_token is None:
-                raise RuntimeError("Check model-server failed")
-        except httpx.HTTPStatusError as e:
-            print(f"\n❌ Non-200 status code received: {e.response.status_code}")
-            return
-        except Exception as e:
-            print(f"\n❌ {e}")
-            return
+        )
+    elif args.adaptive_concurrency:
+        controller = AIMDController(
+            semaphore=semaphore,
+            samples=samples,
+            target_ttft=args.target_ttft,
+            max_concurrency=args.max_concurrency,
+            interval=args.control_interval,
+        )
+        controller_task = asyncio.create_task(
+            controller.run(start_time=stress_test_start_time)
+        )
+    if checkpointer is not None:
+        checkpointer.track(name="client_resources", rows=monitor.samples)
+        if scraper is not None:
+            checkpointer.track(name="server_metrics", rows=scraper.samples)
+        checkpointer.start(
+            samples=samples, stats=stats, start_time=stress_test_start_time
+        )
 
-        print("\n===== 🏃 Start benchmark process =====")
-        stress_test_start_time = time.perf_counter()
+    open_loop = scheduler is not None and scheduler.open_loop
+    try:
+        if args.duration_time >= 1:
 
-        try:
-            if args.duration_time >= 1:
+            async def loop_stress_test(end_time: float, pbar: tqdm.tqdm):
+                if args.session_mode:
+                    await session_runner(
+                        transport=transport,
+                        end_time=end_time,
+                        pbar=pbar,
+                        mode="duration_time",
+                    )
+                    return
 
-                async def loop_stress_test(end_time: float, pbar: tqdm.tqdm):
-                    while time.perf_counter() < end_time:
-                        await worker(
-                            semaphore=semaphore,
-                            aclient=aclient,
-                            url=url,
-                            headers=headers,
-                            timeout=args.timeout,
-                            pbar=pbar,
-                            mode="duration_time",
-                        )
+                while time.perf_counter() < end_time:
+                    spec = scheduler.next()
+                    if spec is None:
+                        return
+                    await worker(
+                        semaphore=semaphore,
+                        transport=transport,
+                        url=url,
+                        headers=headers,
+                        timeout=args.timeout,
+                        pbar=pbar,
+                        mode="duration_time",
+                        spec=spec,
+                    )
 
-                stress_test_end_time = stress_test_start_time + args.duration_time
+            stress_test_end_time = stress_test_start_time + args.duration_time
 
-                async def timer_progress(duration: int, pbar: tqdm.tqdm) -> None:
-                    for sec in range(duration):
-                        await asyncio.sleep(1)
-                        pbar.update(1)
+            async def timer_progress(duration: int, pbar: tqdm.tqdm) -> None:
+                for sec in range(max(0, duration - int(elapsed))):
+                    await asyncio.sleep(1)
+                    pbar.update(1)
 
-                    pbar.n = duration
-                    pbar.refresh()
+                pbar.n = duration
+                pbar.refresh()
 
-                with tqdm.tqdm(
-                    total=args.duration_time,
-                    desc=f"Benchmark runner ({run_label})",
-                    unit="sec",
-                    leave=True,
-                ) as pbar:
-                    loop_stress_test_runners = [
+            with tqdm.tqdm(
+                total=args.duration_time,
+                initial=int(elapsed),
+                desc=f"Benchmark runner ({run_label})",
+                unit="sec",
+                leave=True,
+            ) as pbar:
+                loop_stress_test_runners = (
+                    [
+                        asyncio.create_task(
+                            dispatch_open_loop(
+                                end_time=stress_test_end_time,
+                                pbar=pbar,
+                                mode="duration_time",
+                            )
+                        )
+                    ]
+                    if open_loop
+                    else [
                         asyncio.create_task(
                             loop_stress_test(end_time=stress_test_end_time, pbar=pbar)
                         )
-                        for _ in range(args.concurrency)
+                        for _ in range(num_runners)
+                    ]
+                )
+                timer_task = asyncio.create_task(
+                    timer_progress(duration=args.duration_time, pbar=pbar)
+                )
+                await asyncio.gather(*loop_stress_test_runners, timer_task)
+        elif args.num_request >= 1:
+            with tqdm.tqdm(
+                total=args.num_request,
+                initial=stats.finished_requests,
+                desc=f"Benchmark runner ({run_label})",
+                leave=True,
+            ) as pbar:
+                if args.session_mode:
+                    tasks = [
+                        asyncio.create_task(
+                            session_runner(
+                                transport=transport,
+                                end_time=None,
+                                pbar=pbar,
+                                mode="num_request",
+                            )
+                        )
+                        for _ in range(num_runners)
+                    ]
+                elif open_loop:
+                    tasks = [
+                        asyncio.create_task(
+                            dispatch_open_loop(
+                                end_time=None,
+                                pbar=pbar,
+                                mode="num_request",
+                                num_request=args.num_request - stats.finished_requests,
+                            )
+                        )
+                    ]
+                else:
+                    specs = [
+                        scheduler.next()
+                        for _ in range(args.num_request - stats.finished_requests)
                     ]
-                    timer_task = asyncio.create_task(
-                        timer_progress(duration=args.duration_time, pbar=pbar)
-                    )
-                    await asyncio.gather(*loop_stress_test_runners, timer_task)
-            elif args.num_request >= 1:
-                with tqdm.tqdm(
-                    total=args.num_request,
-                    desc=f"Benchmark runner ({run_label})",
-                    leave=True,
-                ) as pbar:
                     tasks = [
                         asyncio.create_task(
                             worker(
                                 semaphore=semaphore,
-                                aclient=aclient,
+                                transport=transport,
                                 url=url,
                                 headers=headers,
                                 timeout=args.timeout,
                                 pbar=pbar,
                                 mode="num_request",
+                                spec=spec,
                             )
                         )
-                        for _ in range(args.num_request)
+                        for spec in specs
+                        if spec is not None
                     ]
-                    await asyncio.gather(*tasks)
+                await asyncio.gather(*tasks)
 
-            stop_reason = "done"
+        stop_reason = "done"
 
-        except asyncio.CancelledError:
-            stop_reason = "cancelled"
-            print(
-                "\n❗ KeyboardInterrupt detected, but the report will still be generated."
-            )
+    except asyncio.CancelledError:
+        stop_reason = "cancelled"
+        print(
+            "\n❗ KeyboardInterrupt detected, but the report will still be generated."
+        )
 
-        except Exception as e:
-            stop_reason = "error"
-            print(
-                f"\n❌ Unexpected error during benchmark processing: {e}, try to generate report."
-            )
+    except Exception as e:
+        stop_reason = "error"
+        print(
+            f"\n❌ Unexpected error during benchmark processing: {e}, try to generate report."
+        )
 
-        finally:
-            stress_test_end = time.perf_counter()
+    finally:
+        stress_test_end = time.perf_counter()
+        if controller_task is not None:
+            controller_task.cancel()
+        if ramp_task is not None:
+            ramp_task.cancel()
+        monitor.stop()
+        if scraper is not None:
+            await scraper.stop()
+        # The settle wait of LMCache's counters overlaps report generation
+        lmcache_task = (
+            asyncio.create_task(
+                get_settled_lmcache_metrics(aclient=aclient, model_server=args.base_url)
+            )
+            if args.use_lmcache_metrics
+            else None
+        )
+        if checkpointer is not None:
+            # The last rows are folded in, the report is built from the
+            # totals and the kept sample of the whole phase
+            await checkpointer.stop(
+                samples=samples, stats=stats, start_time=stress_test_start_time
+            )
+            samples = checkpointer.load_samples(start_time=stress_test_start_time)
 
-            print("📝 Generating report")
-            report = generate_test_report(
+        print("📝 Generating report")
+        # In a thread, so the LMCache settle wait elapses meanwhile
+        report_future = asyncio.ensure_future(
+            asyncio.to_thread(
+                generate_test_report,
                 model_server=args.base_url,
                 current_time=current_time,
                 run_label=run_label,
+                phase=phase.kind,
                 model=args.model,
                 completion_type=completion_type,
                 max_tokens=args.max_tokens,
                 num_concurrency=args.concurrency,
                 stats=stats,
                 duration=stress_test_end - stress_test_start_time,
-                dataset=os.path.basename(args.dataset_path),
+                dataset=(
+                    f"synthetic:{args.context_len}"
+                    if args.context_len > 0
+                    else os.path.basename(args.dataset_path)
+                ),
                 prompt=args.prompt,
-                ttft_list=ttft_list,
-                latency_list=latencies,
-                token_list=tokens,
+                samples=samples,
                 stop_reason=stop_reason,
-                use_lmcache=args.use_lmcache_metrics,
+                session_mode=args.session_mode,
+                benchmark_start=stress_test_start_time,
+                slo_ttft=args.slo_ttft,
+                slo_tpot=args.slo_tpot,
+                slo_latency=args.slo_latency,
+                slo_window=args.slo_window,
+                target_ttft=args.target_ttft,
+                concurrency_trajectory=(
+                    controller.trajectory if controller is not None else None
+                ),
+                bootstrap=args.bootstrap,
+                bootstrap_resamples=args.bootstrap_resamples,
+                confidence=args.confidence,
+                ci_target=args.ci_target,
+                length_analysis=args.length_analysis,
+                abort_fraction=args.abort_fraction,
+                abort_start=args.abort_start,
+                abort_duration=args.abort_duration,
+                abort_window=args.abort_window,
+                max_retries=args.max_retries,
+                client_samples=monitor.samples,
+                max_loop_lag=args.max_loop_lag,
+                profiler=profiler,
+                endpoint=args.endpoint,
+                batch_size=args.batch_size if not streaming else None,
+                context_len=args.context_len,
+                server_samples=scraper.samples if scraper is not None else None,
+                structured_output=args.structured_output,
+                schema_names=(
+                    [schema.name for schema in structured_outputs]
+                    if structured_outputs is not None
+                    else None
+                ),
+                totals=checkpointer.totals if checkpointer is not None else None,
+                sample_rate=(
+                    checkpointer.state.sample_rate if checkpointer is not None else 1.0
+                ),
+            )
+        )
+        try:
+            report = await asyncio.shield(report_future)
+            if lmcache_task is not None:
+                report.lmcache_metrics = await lmcache_task
+        except asyncio.CancelledError:
+            # Interrupted while the report is generated or LMCache settles,
+            # the report is still kept
+            report = await report_future
+            report.stop_reason = "cancelled"
+
+    return report
+
+
+async def main(
+    args: Args,
+    current_time: str,
+    benchmark_reports: dict[str, Report],
+    checkpointer: Checkpointer | None = None,
+) -> None:
+    # Every phase shares one event loop, one client and one dataset load;
+    # reports are added to benchmark_reports as soon as each phase ends
+    phases = parse_phases(spec=args.phases, use_lmcache=args.use_lmcache_metrics)
+
+    assert args.num_prompts >= 0, (
+        f"num_prompts is {args.num_prompts}, must be greater than or equal to 0."
+    )
+    assert args.max_prompt_len == 0 or args.max_prompt_len >= args.min_prompt_len, (
+        f"max_prompt_len is {args.max_prompt_len}, must be 0 or greater than or equal to min_prompt_len."
+    )
+    assert args.length_strata >= 1, (
+        f"length_strata is {args.length_strata}, must be greater than or equal to 1."
+    )
+    assert args.request_rate >= 0.0, (
+        f"request_rate is {args.request_rate}, must be greater than or equal to 0.0."
+    )
+    assert args.min_output_tokens <= args.max_tokens, (
+        f"min_output_tokens is {args.min_output_tokens}, must be less than or equal to max_tokens."
+    )
+    if args.session_mode:
+        assert (
+            args.request_rate == 0
+            and not args.export_schedule
+            and not args.import_schedule
+        ), "session_mode does not support request_rate or request schedules."
+    if args.structured_output != "none":
+        assert args.schema_path, "structured_output requires schema_path."
+        assert not args.session_mode and (
+            args.endpoint == "/v1/chat/completions"
+            or (
+                args.structured_output == "json_schema"
+                and args.endpoint == "/v1/completions"
+            )
+        ), (
+            "structured_output supports /v1/chat/completions, and json_schema "
+            "also /v1/completions, without session_mode."
+        )
+    assert args.num_schemas >= 0, (
+        f"num_schemas is {args.num_schemas}, must be greater than or equal to 0."
+    )
+    assert args.checkpoint_interval >= 0.0, (
+        f"checkpoint_interval is {args.checkpoint_interval}, must be greater than or equal to 0.0."
+    )
+
+    tokenizer = (
+        LocalTokenizer(path=args.tokenizer_path, max_workers=args.tokenizer_workers)
+        if args.tokenizer_path
+        else None
+    )
+
+    print("🛠️  Building datasets")
+    if args.session_mode:
+        test_datasets = await build_session_dataset(path=args.dataset_path)
+    else:
+        test_datasets = await build_dataset(
+            path=args.dataset_path,
+            prompt=args.prompt,
+            input_len=args.input_len,
+            sampling=args.dataset_sampling,
+            seed=args.seed,
+            num_prompts=args.num_prompts,
+            min_prompt_len=args.min_prompt_len,
+            max_prompt_len=args.max_prompt_len,
+            length_strata=args.length_strata,
+            tokenizer=tokenizer,
+        )
+
+    structured_outputs = (
+        await load_structured_outputs(
+            path=args.schema_path,
+            kind=args.structured_output,
+            num_schemas=args.num_schemas,
+            tool_choice=args.tool_choice,
+        )
+        if args.structured_output != "none"
+        else None
+    )
+
+    # Synthesized long prompts are sized in words, calibrated to tokens when
+    # a tokenizer is available
+    tokens_per_word = (
+        await calibrate_tokens_per_word(tokenizer=tokenizer)
+        if tokenizer is not None
+        and (args.context_len > 0 or any(phase.kind == "context" for phase in phases))
+        else 1.0
+    )
+
+    url = args.base_url.strip("/") + args.endpoint
+    headers = {"Content-Type": "application/json"}
+    if args.api_key is not None:
+        headers.update({"Authorization": f"Bearer {args.api_key}"})
+    completion_type = COMPLETION_TYPES[args.endpoint]
+    lmcache_host = (
+        extract_ip_from_url(url=args.base_url) if args.use_lmcache_metrics else None
+    )
+
+    async with httpx.AsyncClient() as aclient:
+        transport = create_transport(backend=args.http_backend, aclient=aclient)
+        try:
+            print("✅ Check model-server")
+            warmup_payload = build_payload(
+                completion_type=completion_type, prompt="how are you?", args=args
+            )
+            test_result = await request_openai_format(
+                transport=transport,
+                url=url,
+                headers=headers,
+                payload=warmup_payload,
+                timeout=args.timeout,
+            )
+            if test_result is None:
+                raise RuntimeError("Check model-server failed")
+        except httpx.HTTPStatusError as e:
+            print(f"\n❌ Non-200 status code received: {e.response.status_code}")
+            return
+        except Exception as e:
+            print(f"\n❌ {e}")
+            return
+
+        try:
+            for repeat_index in range(args.repeat):
+                if args.repeat > 1:
+                    print(f"\n===== 🔁 Repeat {repeat_index + 1}/{args.repeat} =====")
+
+                for phase_index, phase in enumerate(phases):
+                    # Phases finished before a resume already have their report
+                    if checkpointer is not None and (repeat_index, phase_index) < (
+                        checkpointer.state.repeat_index,
+                        checkpointer.state.phase_index,
+                    ):
+                        continue
+                    resumed = checkpointer is not None and checkpointer.begin_phase(
+                        repeat_index=repeat_index, phase_index=phase_index
+                    )
+
+                    if phase.kind == "cooldown":
+                        print(
+                            f"\n===== 💤 Cooldown {phase.overrides['duration_time']}s ====="
+                        )
+                        await asyncio.sleep(phase.overrides["duration_time"])
+                        if checkpointer is not None:
+                            checkpointer.complete_phase(
+                                repeat_index=repeat_index, phase_index=phase_index
+                            )
+                        continue
+                    if phase.kind == "cache_flush":
+                        print("\n===== 🧹 Flush prefix cache =====")
+                        await flush_prefix_cache(
+                            aclient=aclient, base_url=args.base_url, headers=headers
+                        )
+                        if checkpointer is not None:
+                            checkpointer.complete_phase(
+                                repeat_index=repeat_index, phase_index=phase_index
+                            )
+                        continue
+
+                    suffix = ""
+                    if phase.iteration > 0:
+                        suffix += f"_i{phase.iteration}"
+                    if args.repeat > 1:
+                        suffix += f"_r{repeat_index + 1}"
+
+                    phase_args = replace(args, **phase.overrides)
+                    scheduler = None
+                    if not args.session_mode:
+                        scheduler = RequestScheduler(
+                            args=phase_args,
+                            prompts=test_datasets,
+                            seed=phase_seed(
+                                seed=args.seed, label=f"{phase.label}{suffix}"
+                            ),
+                            tokens_per_word=tokens_per_word,
+                            specs=(
+                                await load_schedule(
+                                    path=schedule_path(
+                                        root=args.import_schedule,
+                                        name=f"{phase.label}{suffix}_schedule.jsonl",
+                                    )
+                                )
+                                if args.import_schedule
+                                else None
+                            ),
+                            record=args.export_schedule,
+                            num_schemas=(
+                                len(structured_outputs)
+                                if structured_outputs is not None
+                                else 0
+                            ),
+                        )
+
+                    if args.use_lmcache_metrics:
+                        baseline_lmcache_metrics = await get_lmcache_metrics(
+                            aclient=aclient, lmcache_host=lmcache_host
+                        )
+
+                    report = await run_phase(
+                        args=phase_args,
+                        current_time=current_time,
+                        phase=phase,
+                        transport=transport,
+                        test_datasets=test_datasets,
+                        tokenizer=tokenizer,
+                        aclient=aclient,
+                        checkpointer=checkpointer,
+                        resumed=resumed,
+                        scheduler=scheduler,
+                        structured_outputs=structured_outputs,
+                    )
+                    if args.use_lmcache_metrics and report.lmcache_metrics is not None:
+                        report.lmcache_metrics = report.lmcache_metrics.diff(
+                            baseline=baseline_lmcache_metrics
+                        )
+
+                    show_report(report=report)
+
+                    if scheduler is not None and scheduler.specs is not None:
+                        schedule_file = schedule_path(
+                            root=f"{args.report_file_root}/{current_time}",
+                            name=f"{phase.label}{suffix}_schedule.jsonl",
+                        )
+                        await save_schedule(
+                            specs=scheduler.specs, save_path=schedule_file
+                        )
+                        print(f"🗓️  Save request schedule in {schedule_file}")
+
+                    report_file = f"{args.report_file_root}/{current_time}/{current_time}_{phase.label}{suffix}_{args.output_file}"
+                    if report_file in benchmark_reports:
+                        report_file = f"{args.report_file_root}/{current_time}/{current_time}_{phase.label}{suffix}_p{phase_index + 1}_{args.output_file}"
+                    benchmark_reports[report_file] = report
+
+                    if report.stop_reason == "cancelled":
+                        return
+                    if checkpointer is not None:
+                        # Saved right away, a resume skips this phase
+                        await save_report_as_file(data=report, save_path=report_file)
+                        print(f"📄 Save report file in {report_file}", flush=True)
+                        checkpointer.complete_phase(
+                            repeat_index=repeat_index, phase_index=phase_index
+                        )
+        finally:
+            await transport.aclose()
+            if tokenizer is not None:
+                tokenizer.close()
+
+
+async def save_outputs(
+    args: Args,
+    current_time: str,
+    benchmark_reports: dict[str, Report],
+    checkpointer: Checkpointer | None = None,
+) -> None:
+    # With checkpoints, only a cancelled phase is still unsaved
+    unsaved_reports = {
+        file_path: report
+        for file_path, report in benchmark_reports.items()
+        if checkpointer is None or report.stop_reason == "cancelled"
+    }
+    await asyncio.gather(
+        *(
+            save_report_as_file(data=report, save_path=file_path)
+            for file_path, report in unsaved_reports.items()
+        )
+    )
+    for file_path in unsaved_reports:
+        print(f"📄 Save report file in {file_path}", flush=True)
+
+    if args.store_db is not None:
+        for report in benchmark_reports.values():
+            if report.phase == "warmup":
+                continue
+            run_id = await asyncio.to_thread(
+                ingest_report,
+                db_path=args.store_db,
+                report=report,
+                args=args,
+                tag=args.tag,
             )
+            print(f"🗄️  Store run #{run_id} in {args.store_db}", flush=True)
+
+    if args.html_report and benchmark_reports:
+        html_file = f"{args.report_file_root}/{current_time}/{current_time}_report.html"
+        await save_html_report(
+            reports={
+                os.path.basename(file_path)
+                .removeprefix(f"{current_time}_")
+                .removesuffix(f"_{args.output_file}"): report
+                for file_path, report in benchmark_reports.items()
+            },
+            title=f"{args.model} @ {args.base_url} ({current_time})",
+            save_path=html_file,
+        )
+        print(f"📈 Save HTML report in {html_file}", flush=True)
 
-        return report
+    headline_reports = [
+        report for report in benchmark_reports.values() if report.phase != "warmup"
+    ]
+    for run_label in dict.fromkeys(report.run_label for report in headline_reports):
+        label_reports = [
+            report for report in headline_reports if report.run_label == run_label
+        ]
+        if len(label_reports) < 2:
+            continue
+
+        summary = generate_repeat_summary(
+            reports=label_reports,
+            run_label=run_label,
+            resamples=args.bootstrap_resamples,
+            confidence=args.confidence,
+            ci_target=args.ci_target,
+        )
+        show_repeat_summary(summary=summary)
+        summary_file = f"{args.report_file_root}/{current_time}/{current_time}_{run_label}_repeat_summary_{args.output_file}"
+        await save_repeat_summary_as_file(data=summary, save_path=summary_file)
+        print(f"📄 Save repeat summary file in {summary_file}", flush=True)
+
+    # One summary per context_ramp, whose step labels are <label>_<context_len>
+    context_reports: dict[str, list[Report]] = dict()
+    for report in benchmark_reports.values():
+        if report.phase == "context":
+            ramp_label = report.run_label.removesuffix(f"_{report.context_len}")
+            context_reports.setdefault(ramp_label, list()).append(report)
+    for ramp_label, ramp_reports in context_reports.items():
+        summary = generate_long_context_summary(
+            reports=ramp_reports,
+            run_label=ramp_label,
+            collapse_threshold=args.collapse_threshold,
+        )
+        show_long_context_summary(summary=summary)
+        summary_file = f"{args.report_file_root}/{current_time}/{current_time}_{ramp_label}_long_context_summary_{args.output_file}"
+        await save_long_context_summary_as_file(data=summary, save_path=summary_file)
+        print(f"📄 Save long context summary file in {summary_file}", flush=True)
+
+
+async def run(
+    args: Args,
+    current_time: str,
+    benchmark_reports: dict[str, Report],
+    checkpointer: Checkpointer | None = None,
+) -> None:
+    # The whole lifecycle shares one event loop: dataset load, phases, LMCache
+    # scrapes and report writing; an interrupted run still writes its reports
+    try:
+        await main(
+            args=args,
+            current_time=current_time,
+            benchmark_reports=benchmark_reports,
+            checkpointer=checkpointer,
+        )
+    finally:
+        await save_outputs(
+            args=args,
+            current_time=current_time,
+            benchmark_reports=benchmark_reports,
+            checkpointer=checkpointer,
+        )
 
 
 def build_parse() -> Args:
@@ -365,16 +1155,16 @@ def build_parse() -> Args:
 
     parse.add_argument(
         "--base_url",
-        required=True,
         type=str,
+        default=None,
         help="Base URL of the model server (e.g., http://",
     )
     parse.add_argument(
         "--endpoint",
         type=str,
-        choices=["/v1/chat/completions", "/v1/completions"],
+        choices=["/v1/chat/completions", "/v1/completions", "/v1/embeddings"],
         default="/v1/chat/completions",
-        help="API endpoint for completion requests.",
+        help="API endpoint for completion or embedding requests.",
     )
     parse.add_argument(
         "--api_key",
@@ -382,7 +1172,7 @@ def build_parse() -> Args:
         default=None,
         help="API key for authentication if required.",
     )
-    parse.add_argument("--model", required=True, type=str, help="Model name to test.")
+    parse.add_argument("--model", type=str, default=None, help="Model name to test.")
     parse.add_argument(
         "--concurrency", type=int, default=16, help="Number of concurrent requests."
     )
@@ -422,6 +1212,471 @@ def build_parse() -> Args:
         default=False,
         help="Enable LMCache metrics collection.",
     )
+    parse.add_argument(
+        "--session_mode",
+        action="store_true",
+        default=False,
+        help="Replay full dataset conversations turn by turn with growing history.",
+    )
+    parse.add_argument(
+        "--session_reply",
+        type=str,
+        choices=["model", "dataset"],
+        default="model",
+        help="Assistant reply appended to the history in session mode.",
+    )
+    parse.add_argument(
+        "--think_time",
+        type=float,
+        default=0.0,
+        help="Seconds a virtual user waits between turns in session mode.",
+    )
+    parse.add_argument(
+        "--max_turns",
+        type=int,
+        default=0,
+        help="Maximum turns replayed per conversation in session mode (0 = all).",
+    )
+    parse.add_argument(
+        "--slo_ttft",
+        type=float,
+        default=None,
+        help="SLO threshold for time to first token in ms.",
+    )
+    parse.add_argument(
+        "--slo_tpot",
+        type=float,
+        default=None,
+        help="SLO threshold for time per output token in ms.",
+    )
+    parse.add_argument(
+        "--slo_latency",
+        type=float,
+        default=None,
+        help="SLO threshold for end-to-end latency in seconds.",
+    )
+    parse.add_argument(
+        "--slo_window",
+        type=float,
+        default=10.0,
+        help="Window length in seconds for SLO attainment over time.",
+    )
+    parse.add_argument(
+        "--adaptive_concurrency",
+        action="store_true",
+        default=False,
+        help="Resize concurrency at runtime (AIMD) to hold p95 TTFT at target_ttft.",
+    )
+    parse.add_argument(
+        "--target_ttft",
+        type=float,
+        default=0.0,
+        help="Target p95 TTFT in ms for adaptive concurrency.",
+    )
+    parse.add_argument(
+        "--max_concurrency",
+        type=int,
+        default=256,
+        help="Upper bound of concurrency for adaptive concurrency.",
+    )
+    parse.add_argument(
+        "--control_interval",
+        type=float,
+        default=5.0,
+        help="Seconds between adaptive concurrency adjustments.",
+    )
+    parse.add_argument(
+        "--store_db",
+        type=str,
+        default=None,
+        help="SQLite result store to ingest every run into (e.g. reports/results.db).",
+    )
+    parse.add_argument(
+        "--tag",
+        type=str,
+        default=None,
+        help="Tag stored with the run, used to group baselines in compare.",
+    )
+    parse.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Run the benchmark N times and aggregate metrics with confidence intervals.",
+    )
+    parse.add_argument(
+        "--bootstrap",
+        action="store_true",
+        default=False,
+        help="Add bootstrap confidence intervals computed within each run.",
+    )
+    parse.add_argument(
+        "--bootstrap_resamples",
+        type=int,
+        default=1000,
+        help="Number of bootstrap resamples.",
+    )
+    parse.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence level of the intervals.",
+    )
+    parse.add_argument(
+        "--ci_target",
+        type=float,
+        default=0.05,
+        help="Target relative CI half-width used to estimate required requests/runs.",
+    )
+    parse.add_argument(
+        "--ttft_include_reasoning",
+        action="store_true",
+        default=False,
+        help="Count the first reasoning token as the first token for TTFT.",
+    )
+    parse.add_argument(
+        "--tokenizer_path",
+        type=str,
+        default="",
+        help="Path to a HuggingFace tokenizer.json used to count tokens when the server omits usage.",
+    )
+    parse.add_argument(
+        "--tokenizer_workers",
+        type=int,
+        default=4,
+        help="Threads used for client-side tokenization.",
+    )
+    parse.add_argument(
+        "--length_analysis",
+        action="store_true",
+        default=False,
+        help="Report latency per input/output token bucket with a fitted latency model.",
+    )
+    parse.add_argument(
+        "--phases",
+        type=str,
+        default="",
+        help=(
+            "Phase pipeline, e.g. 'warmup:num_request=16 ramp:duration_time=30 "
+            "steady cache_flush steady repeat:times=2' (default: single run, "
+            "or cold/warm runs with --use_lmcache_metrics)."
+        ),
+    )
+    parse.add_argument(
+        "--abort_fraction",
+        type=float,
+        default=0.0,
+        help="Fraction of streams the client aborts mid-stream (0 disables).",
+    )
+    parse.add_argument(
+        "--abort_after_tokens",
+        type=int,
+        default=0,
+        help="Mean number of streamed tokens before an abort.",
+    )
+    parse.add_argument(
+        "--abort_after_time",
+        type=float,
+        default=0.0,
+        help="Mean seconds after sending before an abort.",
+    )
+    parse.add_argument(
+        "--abort_distribution",
+        type=str,
+        choices=["fixed", "uniform", "exponential"],
+        default="fixed",
+        help="Distribution of the abort point around its mean.",
+    )
+    parse.add_argument(
+        "--abort_start",
+        type=float,
+        default=0.0,
+        help="Seconds into the run when the abort storm starts.",
+    )
+    parse.add_argument(
+        "--abort_duration",
+        type=float,
+        default=0.0,
+        help="Length of the abort storm in seconds (0 = until the end of the run).",
+    )
+    parse.add_argument(
+        "--abort_window",
+        type=float,
+        default=5.0,
+        help="Window length in seconds for the abort recovery timeline.",
+    )
+    parse.add_argument(
+        "--max_retries",
+        type=int,
+        default=0,
+        help="Retries per request on retryable errors (0 disables retries).",
+    )
+    parse.add_argument(
+        "--retry_on",
+        type=str,
+        default="429,503",
+        help=(
+            "Comma-separated status codes or error classes to retry, e.g. "
+            "'429,503,timeout,connect_error'."
+        ),
+    )
+    parse.add_argument(
+        "--retry_backoff",
+        type=str,
+        choices=["constant", "exponential"],
+        default="exponential",
+        help="Backoff between retries.",
+    )
+    parse.add_argument(
+        "--retry_base_delay",
+        type=float,
+        default=0.5,
+        help="Base backoff delay in seconds.",
+    )
+    parse.add_argument(
+        "--retry_max_delay",
+        type=float,
+        default=30.0,
+        help="Upper bound of a single backoff delay in seconds.",
+    )
+    parse.add_argument(
+        "--retry_jitter",
+        type=str,
+        choices=["none", "full", "equal"],
+        default="full",
+        help="Jitter applied to the backoff delay.",
+    )
+    parse.add_argument(
+        "--ignore_retry_after",
+        action="store_true",
+        default=False,
+        help="Ignore the server's Retry-After header and always use the backoff.",
+    )
+    parse.add_argument(
+        "--runtime",
+        type=str,
+        choices=["asyncio", "uvloop"],
+        default="asyncio",
+        help="Event loop implementation (uvloop needs `pip install .[uvloop]`).",
+    )
+    parse.add_argument(
+        "--http_backend",
+        type=str,
+        choices=["httpx", "aiohttp", "raw"],
+        default="httpx",
+        help=(
+            "HTTP client used for benchmark requests: httpx, aiohttp "
+            "(`pip install .[aiohttp]`) or a raw asyncio HTTP/1.1 client."
+        ),
+    )
+    parse.add_argument(
+        "--monitor_interval",
+        type=float,
+        default=0.1,
+        help="Interval in seconds of the client event-loop lag, CPU and RSS probe.",
+    )
+    parse.add_argument(
+        "--max_loop_lag",
+        type=float,
+        default=50.0,
+        help="p99 event-loop lag in ms above which the run is flagged as untrustworthy.",
+    )
+    parse.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help=(
+            "Time spans on the request hot path and write a folded-stack "
+            "flamegraph of the client next to the report."
+        ),
+    )
+    parse.add_argument(
+        "--profiler",
+        type=str,
+        choices=["none", "cprofile", "yappi"],
+        default="none",
+        help="Also run a function profiler with --profile and save its pstats file.",
+    )
+    parse.add_argument(
+        "--html_report",
+        action="store_true",
+        default=False,
+        help=(
+            "Write a self-contained HTML report with latency CDFs and timelines "
+            "of every phase next to the report files."
+        ),
+    )
+    parse.add_argument(
+        "--no_stream",
+        action="store_true",
+        default=False,
+        help="Send chat/completions requests with stream=false and read the whole body.",
+    )
+    parse.add_argument(
+        "--batch_size",
+        type=int,
+        default=1,
+        help=(
+            "Inputs per request for /v1/embeddings, or prompts per request for "
+            "/v1/completions with --no_stream."
+        ),
+    )
+    parse.add_argument(
+        "--input_len",
+        type=int,
+        default=0,
+        help="Truncate or repeat every prompt to this many words, 0 keeps them as is.",
+    )
+    parse.add_argument(
+        "--dataset_sampling",
+        type=str,
+        choices=["sequential", "random", "stratified"],
+        default="sequential",
+        help=(
+            "Order of dataset prompts: file order, a seeded shuffle, or "
+            "interleaved prompt-length strata."
+        ),
+    )
+    parse.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help=(
+            "Seed of the dataset sampling, arrival times, output lengths, "
+            "abort points and the server's sampling seed; unset draws fresh "
+            "ones per run."
+        ),
+    )
+    parse.add_argument(
+        "--num_prompts",
+        type=int,
+        default=0,
+        help="Use exactly this many dataset prompts, 0 uses all of them.",
+    )
+    parse.add_argument(
+        "--min_prompt_len",
+        type=int,
+        default=0,
+        help="Drop dataset prompts shorter than this (tokens with a tokenizer, else words).",
+    )
+    parse.add_argument(
+        "--max_prompt_len",
+        type=int,
+        default=0,
+        help="Drop dataset prompts longer than this, 0 disables the limit.",
+    )
+    parse.add_argument(
+        "--length_strata",
+        type=int,
+        default=4,
+        help="Number of equal-count prompt-length strata of stratified sampling.",
+    )
+    parse.add_argument(
+        "--context_len",
+        type=int,
+        default=0,
+        help=(
+            "Send synthesized prompts of about this many tokens instead of the "
+            "dataset; context_ramp phases set it per step."
+        ),
+    )
+    parse.add_argument(
+        "--server_metrics",
+        action="store_true",
+        default=False,
+        help=(
+            "Scrape vLLM preemption, KV-cache usage and queue metrics from "
+            "<base_url>/metrics during every phase (always on for context phases)."
+        ),
+    )
+    parse.add_argument(
+        "--scrape_interval",
+        type=float,
+        default=1.0,
+        help="Interval in seconds between server metrics scrapes.",
+    )
+    parse.add_argument(
+        "--collapse_threshold",
+        type=float,
+        default=0.3,
+        help=(
+            "A context_ramp step collapses when its throughput falls this "
+            "fraction below the peak so far, or this share of requests fails."
+        ),
+    )
+    parse.add_argument(
+        "--request_rate",
+        type=float,
+        default=0.0,
+        help=(
+            "Open-loop Poisson arrivals at this many requests per second, "
+            "capped by concurrency in flight; 0 runs closed-loop."
+        ),
+    )
+    parse.add_argument(
+        "--min_output_tokens",
+        type=int,
+        default=0,
+        help=(
+            "Draw each request's max_tokens uniformly from "
+            "[min_output_tokens, max_tokens]; 0 sends max_tokens."
+        ),
+    )
+    parse.add_argument(
+        "--export_schedule",
+        action="store_true",
+        default=False,
+        help="Save every phase's request schedule next to its report.",
+    )
+    parse.add_argument(
+        "--import_schedule",
+        type=str,
+        default="",
+        help="Run directory whose exported request schedules are replayed.",
+    )
+    parse.add_argument(
+        "--structured_output",
+        type=str,
+        default="none",
+        choices=["none", "json_schema", "tools"],
+        help=(
+            "Attach a response_format JSON schema or tools to every request, "
+            "rotating through the schemas in schema_path."
+        ),
+    )
+    parse.add_argument(
+        "--schema_path",
+        type=str,
+        default="",
+        help="JSON file with a list of JSON schemas or tool definitions.",
+    )
+    parse.add_argument(
+        "--num_schemas",
+        type=int,
+        default=0,
+        help="Rotate through the first num_schemas schemas, 0 uses all.",
+    )
+    parse.add_argument(
+        "--tool_choice",
+        type=str,
+        default="required",
+        choices=["auto", "required"],
+        help="tool_choice sent with tools, required makes the server use guided decoding.",
+    )
+    parse.add_argument(
+        "--checkpoint_interval",
+        type=float,
+        default=0.0,
+        help=(
+            "Seconds between checkpoints of the running phase, 0 disables "
+            "checkpointing."
+        ),
+    )
+    parse.add_argument(
+        "--resume",
+        type=str,
+        default="",
+        help="Checkpoint directory of an interrupted run to continue.",
+    )
     parse.add_argument(
         ("--verbose"),
         action="store_true",
@@ -430,6 +1685,12 @@ def build_parse() -> Args:
     )
 
     args = parse.parse_args()
+    # A resumed run takes them from the checkpoint
+    if not args.resume and (args.base_url is None or args.model is None):
+        parse.error(
+            "the following arguments are required: --base_url, --model "
+            "(unless --resume is given)"
+        )
     print(f"{args}\n", flush=True)
 
     return Args(**vars(args))
@@ -437,46 +1698,50 @@ def build_parse() -> Args:
 
 if __name__ == "__main__":
     args = build_parse()
+    assert args.repeat >= 1, (
+        f"repeat is {args.repeat}, must be greater than or equal to 1."
+    )
     current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+    checkpointer = None
+    if args.resume:
+        # The checkpointed run's arguments and output directory are reused,
+        # credentials are not checkpointed and come from this command line
+        state = load_checkpoint_state(path=args.resume)
+        args = replace(Args(**state.args), api_key=args.api_key, resume=args.resume)
+        current_time = state.current_time
+        checkpointer = Checkpointer(
+            root=args.resume, state=state, interval=args.checkpoint_interval
+        )
+        print(f"⏯️  Resume run {current_time} from {args.resume}")
+    elif args.checkpoint_interval > 0:
+        checkpointer = Checkpointer(
+            root=f"{args.report_file_root}/{current_time}/checkpoint",
+            # Never persist credentials
+            state=CheckpointState(
+                current_time=current_time, args=asdict(args) | {"api_key": None}
+            ),
+            interval=args.checkpoint_interval,
+        )
     benchmark_reports: dict[str, Report] = dict()
+    stack_sampler = None
+    function_profiler = None
 
     try:
-        if args.use_lmcache_metrics:
-            lmcache_host = extract_ip_from_url(url=args.base_url)
-            baseline_lmcache_metrics = get_lmcache_metrics(lmcache_host=lmcache_host)
-            cold_report = asyncio.run(
-                main(args=args, current_time=current_time, run_label="cold")
-            )
-            if cold_report.lmcache_metrics is not None:
-                clean_cold_metrics = cold_report.lmcache_metrics.diff(
-                    baseline=baseline_lmcache_metrics
-                )
-                cold_report.lmcache_metrics = clean_cold_metrics
-
-            show_report(report=cold_report)
-            cold_report_file = f"{args.report_file_root}/{current_time}/{current_time}_cold_{args.output_file}"
-            benchmark_reports[cold_report_file] = cold_report
-
-            baseline_lmcache_metrics = get_lmcache_metrics(lmcache_host=lmcache_host)
-            warm_report = asyncio.run(
-                main(args=args, current_time=current_time, run_label="warm")
-            )
-            if warm_report.lmcache_metrics is not None:
-                clean_warm_metrics = warm_report.lmcache_metrics.diff(
-                    baseline=baseline_lmcache_metrics
-                )
-                warm_report.lmcache_metrics = clean_warm_metrics
-            show_report(report=warm_report)
-            warm_report_file = f"{args.report_file_root}/{current_time}/{current_time}_warm_{args.output_file}"
-            benchmark_reports[warm_report_file] = warm_report
-
-        else:
-            single_report = asyncio.run(
-                main(args=args, current_time=current_time, run_label="single")
+        install_event_loop(runtime=args.runtime)
+        if args.profile:
+            stack_sampler = StackSampler()
+            if args.profiler != "none":
+                function_profiler = FunctionProfiler(engine=args.profiler)
+                function_profiler.start()
+            stack_sampler.start()
+        asyncio.run(
+            run(
+                args=args,
+                current_time=current_time,
+                benchmark_reports=benchmark_reports,
+                checkpointer=checkpointer,
             )
-            show_report(report=single_report)
-            single_report_file = f"{args.report_file_root}/{current_time}/{current_time}_single_{args.output_file}"
-            benchmark_reports[single_report_file] = single_report
+        )
 
     except KeyboardInterrupt:
         print("\n❗ User interrupted")
@@ -485,11 +1750,12 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\n❌ Unexpected error: {e}")
     finally:
-        for file_path, report in benchmark_reports.items():
-            asyncio.run(
-                save_report_as_file(
-                    data=report,
-                    save_path=file_path,
-                )
-            )
-            print(f"📄 Save report file in {file_path}", flush=True)
+        profile_root = f"{args.report_file_root}/{current_time}/{current_time}"
+        if stack_sampler is not None:
+            stack_sampler.stop()
+            stack_sampler.save(path=f"{profile_root}_profile.folded")
+            print(f"🔥 Save flamegraph stacks in {profile_root}_profile.folded")
+        if function_profiler is not None:
+            function_profiler.stop()
+            function_profiler.save(path=f"{profile_root}_profile.prof")
+            print(f"🔥 Save {args.profiler} stats in {profile_root}_profile.prof")
@@ -0,0 +1,193 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from utils.statistics import mann_whitney_u
+from utils.store import list_runs, load_runs
+
+# (name, sample column, unit scale), lower is better
+DISTRIBUTION_METRICS = [("ttft (ms)", "ttft", 1000), ("latency (s)", "latency", 1)]
+# (name, report key), higher is better
+THROUGHPUT_METRICS = [
+    ("request per sec (req/s)", "Request per second (req/s)"),
+    ("throughput token (tok/s)", "Throughput token (tok/s)"),
+]
+
+
+def compute_tpot(samples: dict[str, np.ndarray]) -> np.ndarray:
+    completion_tokens = samples["completion_tokens"]
+    mask = completion_tokens > 1
+    return (samples["latency"][mask] - samples["ttft"][mask]) / (
+        completion_tokens[mask] - 1
+    )
+
+
+def compare_runs(
+    baseline_reports: list[dict],
+    baseline_samples: dict[str, np.ndarray],
+    candidate_reports: list[dict],
+    candidate_samples: dict[str, np.ndarray],
+    threshold: float,
+    alpha: float,
+) -> bool:
+    regression = False
+    print(
+        f"{'metric':<28}{'baseline':>12}{'candidate':>12}{'change':>10}{'p-value':>10}  verdict"
+    )
+
+    baseline_samples["tpot"] = compute_tpot(samples=baseline_samples)
+    candidate_samples["tpot"] = compute_tpot(samples=candidate_samples)
+    for name, column, scale in DISTRIBUTION_METRICS + [("tpot (ms)", "tpot", 1000)]:
+        baseline_values = baseline_samples.get(column, np.empty(0))
+        candidate_values = candidate_samples.get(column, np.empty(0))
+        if len(baseline_values) == 0 or len(candidate_values) == 0:
+            print(f"{name:<28}{'-':>12}{'-':>12}{'-':>10}{'-':>10}  no samples")
+            continue
+
+        baseline_q = np.percentile(baseline_values, [50, 95]) * scale
+        candidate_q = np.percentile(candidate_values, [50, 95]) * scale
+        changes = np.where(
+            baseline_q > 0,
+            (candidate_q - baseline_q) / np.maximum(baseline_q, 1e-12),
+            0.0,
+        )
+        for q, baseline_value, candidate_value, change in zip(
+            (50, 95), baseline_q, candidate_q, changes
+        ):
+            print(
+                f"{f'p{q} {name}':<28}{baseline_value:>12.2f}{candidate_value:>12.2f}"
+                f"{change:>+10.1%}{'-':>10}"
+            )
+
+        # The U test compares whole distributions, so it gives one verdict per
+        # metric: a significant shift that slows p50 or p95 past the threshold
+        _, p_value = mann_whitney_u(
+            baseline=baseline_values, candidate=candidate_values
+        )
+        is_regression = bool(changes.max() > threshold) and p_value < alpha
+        regression |= is_regression
+        print(
+            f"{f'{name} distribution':<28}{'-':>12}{'-':>12}{changes.max():>+10.1%}"
+            f"{p_value:>10.4f}  {'REGRESSION' if is_regression else 'ok'}"
+        )
+
+    for name, key in THROUGHPUT_METRICS:
+        baseline_value = sum(report[key] for report in baseline_reports) / len(
+            baseline_reports
+        )
+        candidate_value = sum(report[key] for report in candidate_reports) / len(
+            candidate_reports
+        )
+        change = (
+            (candidate_value - baseline_value) / baseline_value
+            if baseline_value > 0
+            else 0.0
+        )
+        is_regression = change < -threshold
+        regression |= is_regression
+        print(
+            f"{name:<28}{baseline_value:>12.2f}{candidate_value:>12.2f}"
+            f"{change:>+10.1%}{'-':>10}  {'REGRESSION' if is_regression else 'ok'}"
+        )
+
+    return regression
+
+
+def build_parse() -> argparse.Namespace:
+    parse = argparse.ArgumentParser(
+        description="Compare benchmark runs stored in the result store."
+    )
+
+    parse.add_argument(
+        "--store_db",
+        type=str,
+        default=f"{os.getcwd()}/reports/results.db",
+        help="Path to the SQLite result store.",
+    )
+    parse.add_argument(
+        "--list", action="store_true", default=False, help="List stored runs."
+    )
+    parse.add_argument("--baseline", type=int, default=None, help="Baseline run id.")
+    parse.add_argument(
+        "--baseline_tag",
+        type=str,
+        default=None,
+        help="Use every run with this tag as the baseline.",
+    )
+    parse.add_argument("--candidate", type=int, default=None, help="Candidate run id.")
+    parse.add_argument(
+        "--candidate_tag",
+        type=str,
+        default=None,
+        help="Use every run with this tag as the candidate.",
+    )
+    parse.add_argument(
+        "--run_label",
+        type=str,
+        default=None,
+        help="Only compare runs with this run label (e.g. cold, warm, single).",
+    )
+    parse.add_argument(
+        "--threshold",
+        type=float,
+        default=0.05,
+        help="Relative change treated as a regression (0.05 = 5%%).",
+    )
+    parse.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="Significance level of the Mann-Whitney U test.",
+    )
+
+    return parse.parse_args()
+
+
+if __name__ == "__main__":
+    args = build_parse()
+
+    if args.list:
+        for row in list_runs(db_path=args.store_db):
+            print(
+                f"#{row['id']} {row['run_time']} {row['run_label']:<6} tag={row['tag']} "
+                f"model={row['model']} stop={row['stop_reason']} "
+                f"rps={row['request_per_sec']} tok/s={row['throughput_token']} "
+                f"avg ttft={row['avg_ttft']}ms avg latency={row['avg_latency']}s"
+            )
+        sys.exit(0)
+
+    if (args.baseline is None) == (args.baseline_tag is None):
+        sys.exit("❌ Exactly one of --baseline or --baseline_tag is required.")
+    if (args.candidate is None) == (args.candidate_tag is None):
+        sys.exit("❌ Exactly one of --candidate or --candidate_tag is required.")
+
+    baseline_reports, baseline_samples = load_runs(
+        db_path=args.store_db,
+        run_id=args.baseline,
+        tag=args.baseline_tag,
+        run_label=args.run_label,
+    )
+    candidate_reports, candidate_samples = load_runs(
+        db_path=args.store_db,
+        run_id=args.candidate,
+        tag=args.candidate_tag,
+        run_label=args.run_label,
+    )
+    if not baseline_reports or not candidate_reports:
+        sys.exit("❌ Baseline or candidate run not found in the result store.")
+
+    regression = compare_runs(
+        baseline_reports=baseline_reports,
+        baseline_samples=baseline_samples,
+        candidate_reports=candidate_reports,
+        candidate_samples=candidate_samples,
+        threshold=args.threshold,
+        alpha=args.alpha,
+    )
+    if regression:
+        print("\n❌ Regression detected")
+        sys.exit(1)
+
+    print("\n✅ No regression detected")
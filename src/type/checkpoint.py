@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class CheckpointState:
+    current_time: str
+    # Args of the checkpointed run, a resumed run reuses them
+    args: dict
+    # Phase in progress; earlier phases already have their report file
+    repeat_index: int = 0
+    phase_index: int = 0
+    # Progress of that phase: seconds run, Stats and SampleTotals fields
+    elapsed: float = 0.0
+    stats: dict = field(default_factory=dict)
+    totals: dict = field(default_factory=dict)
+    # Share of rows kept in the sample, and every how many rows each
+    # monitoring log keeps
+    sample_rate: float = 1.0
+    log_strides: dict[str, int] = field(default_factory=dict)
+    # Snapshot number whose sample and log files are complete, 0 before the
+    # first checkpoint of the phase
+    sequence: int = 0
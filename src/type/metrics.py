@@ -1,4 +1,10 @@
+from array import array
 from dataclasses import dataclass, field, fields
+from typing import Literal
+
+import numpy as np
+
+from type.request import RequestFailure, RequestResult
 
 
 @dataclass
@@ -10,6 +16,13 @@ class Stats:
     timeout_requests: int = 0
     non_200_requests: int = 0
     cancelled_requests: int = 0
+    aborted_requests: int = 0
+    # Every attempt sent to the server, retries included
+    attempts: int = 0
+    retries: int = 0
+    # Requests that failed after at least one retry
+    retry_exhausted: int = 0
+    backoff_time: float = 0.0
 
 
 @dataclass
@@ -20,6 +33,14 @@ class TTFT:
     min_ttft: float | None
 
 
+@dataclass
+class TTFB:
+    # Time to first parsed stream chunk (ms)
+    avg_ttfb: float | None
+    max_ttfb: float | None
+    min_ttfb: float | None
+
+
 @dataclass
 class Latency:
     avg_latency: float | None
@@ -32,6 +53,480 @@ class Token:
     avg_token: float | None
     max_token: int | None
     min_token: int | None
+    avg_input_token: float | None = None
+    avg_output_token: float | None = None
+
+
+@dataclass
+class TurnTTFT:
+    # Per-turn time to first token (ms) in session mode
+    turn: int
+    num_requests: int
+    avg_ttft: float | None
+    max_ttft: float | None
+    min_ttft: float | None
+    avg_prompt_tokens: float | None
+
+
+def float_buffer() -> array:
+    return array("d")
+
+
+def int_buffer() -> array:
+    return array("q")
+
+
+@dataclass
+class Samples:
+    # Unboxed, growable buffers; column() hands them to NumPy
+    ttft: array = field(default_factory=float_buffer)
+    ttfb: array = field(default_factory=float_buffer)
+    latency: array = field(default_factory=float_buffer)
+    token: array = field(default_factory=int_buffer)
+    prompt_tokens: array = field(default_factory=int_buffer)
+    completion_tokens: array = field(default_factory=int_buffer)
+    start_time: array = field(default_factory=float_buffer)
+    turn: array = field(default_factory=int_buffer)
+    # Streams the client disconnected on purpose, kept out of the stats above
+    abort_start_time: array = field(default_factory=float_buffer)
+    abort_latency: array = field(default_factory=float_buffer)
+    abort_tokens: array = field(default_factory=int_buffer)
+    # Attempts and retry time of each successful request
+    attempts: array = field(default_factory=int_buffer)
+    retry_wait: array = field(default_factory=float_buffer)
+    queue_time: array = field(default_factory=float_buffer)
+    items: array = field(default_factory=int_buffer)
+    schema: array = field(default_factory=int_buffer)
+    # Every failed attempt, retried or not
+    error_class: list[str] = field(default_factory=list)
+    error_start_time: array = field(default_factory=float_buffer)
+    error_latency: array = field(default_factory=float_buffer)
+    # Finish time and turn of every failed or aborted request, which count as
+    # SLO misses
+    missed_end_time: array = field(default_factory=float_buffer)
+    missed_turn: array = field(default_factory=int_buffer)
+
+    def column(self, name: str) -> np.ndarray:
+        # A copy, a view would export the buffer and block further appends
+        buffer = getattr(self, name)
+        return np.frombuffer(
+            buffer, dtype=np.float64 if buffer.typecode == "d" else np.int64
+        ).copy()
+
+    def stack(self, names: tuple[str, ...], dtype: type = np.float64) -> np.ndarray:
+        # (len(names), samples) matrix filled straight from equally long buffers
+        matrix = np.empty((len(names), len(getattr(self, names[0]))), dtype=dtype)
+        for row, name in zip(matrix, names):
+            buffer = getattr(self, name)
+            row[:] = np.frombuffer(
+                buffer, dtype=np.float64 if buffer.typecode == "d" else np.int64
+            )
+        return matrix
+
+    def add_error(
+        self, failure: RequestFailure, start_time: float, latency: float
+    ) -> None:
+        self.error_class.append(failure.error_class)
+        self.error_start_time.append(start_time)
+        self.error_latency.append(latency)
+
+    def add_missed(self, end_time: float, turn: int = 0) -> None:
+        self.missed_end_time.append(end_time)
+        self.missed_turn.append(turn)
+
+    def add_abort(self, result: RequestResult) -> None:
+        self.abort_start_time.append(result.start_time)
+        self.abort_latency.append(result.latency)
+        self.abort_tokens.append(result.output_chunks)
+
+    def add(self, result: RequestResult, turn: int = 0) -> None:
+        self.ttft.append(result.ttft)
+        self.ttfb.append(result.ttfb)
+        self.latency.append(result.latency)
+        self.token.append(result.token)
+        self.prompt_tokens.append(result.prompt_tokens)
+        self.completion_tokens.append(result.completion_tokens)
+        self.start_time.append(result.start_time)
+        self.turn.append(turn)
+        self.attempts.append(result.attempts)
+        self.retry_wait.append(result.retry_wait)
+        self.queue_time.append(result.queue_time)
+        self.items.append(result.items)
+        self.schema.append(result.schema)
+
+
+# Columns of successful requests whose sum, min and max the report shows
+TOTAL_TIME_COLUMNS = ("ttft", "ttfb", "latency")
+TOTAL_TOKEN_COLUMNS = ("token", "prompt_tokens", "completion_tokens")
+
+
+@dataclass
+class SampleTotals:
+    """Exact running reductions of the successful requests.
+
+    Checkpointed runs only keep a sample of the rows, these keep the summary
+    figures of the report exact.
+    """
+
+    count: int = 0
+    sums: dict[str, float] = field(default_factory=dict)
+    mins: dict[str, float] = field(default_factory=dict)
+    maxs: dict[str, float] = field(default_factory=dict)
+
+    def update(self, samples: Samples) -> None:
+        count = len(samples.ttft)
+        if count == 0:
+            return
+
+        self.count += count
+        for names, dtype in (
+            (TOTAL_TIME_COLUMNS, np.float64),
+            (TOTAL_TOKEN_COLUMNS, np.int64),
+        ):
+            matrix = samples.stack(names, dtype=dtype)
+            for name, total, low, high in zip(
+                names,
+                matrix.sum(axis=1).tolist(),
+                matrix.min(axis=1).tolist(),
+                matrix.max(axis=1).tolist(),
+            ):
+                self.sums[name] = self.sums.get(name, 0) + total
+                self.mins[name] = min(self.mins.get(name, low), low)
+                self.maxs[name] = max(self.maxs.get(name, high), high)
+
+
+@dataclass
+class SLOWindow:
+    # Window bounds (s) relative to the start of the benchmark
+    start: float
+    end: float
+    num_requests: int
+    met_requests: int
+    attainment: float
+    goodput: float
+
+
+@dataclass
+class SLOScenario:
+    scenario: str
+    num_requests: int
+    met_requests: int
+    attainment: float
+
+
+@dataclass
+class Goodput:
+    # SLO thresholds, None means the threshold is not checked
+    slo_ttft: float | None
+    slo_tpot: float | None
+    slo_latency: float | None
+    met_requests: int
+    attainment: float
+    goodput: float
+    windows: list[SLOWindow] = field(default_factory=list)
+    scenarios: list[SLOScenario] = field(default_factory=list)
+
+
+@dataclass
+class ConcurrencyStep:
+    # Time (s) relative to the start of the benchmark
+    time: float
+    concurrency: int
+    # p95 time to first token (ms) observed in the control interval
+    p95_ttft: float | None
+    throughput: float
+
+
+@dataclass
+class AdaptiveConcurrency:
+    target_ttft: float
+    final_concurrency: int
+    equilibrium_concurrency: float | None
+    equilibrium_throughput: float | None
+    trajectory: list[ConcurrencyStep] = field(default_factory=list)
+
+
+@dataclass
+class MetricCI:
+    metric: str
+    estimate: float
+    ci_low: float
+    ci_high: float
+    # Samples needed for a CI half-width of ci_target * estimate
+    required_samples: int | None
+
+
+@dataclass
+class ConfidenceIntervals:
+    confidence: float
+    resamples: int
+    ci_target: float
+    metrics: list[MetricCI] = field(default_factory=list)
+
+
+@dataclass
+class RepeatMetric:
+    metric: str
+    mean: float
+    std: float
+    ci_low: float
+    ci_high: float
+    # Runs needed for a CI half-width of ci_target * mean
+    required_runs: int | None
+    values: list[float] = field(default_factory=list)
+
+
+@dataclass
+class RepeatSummary:
+    run_label: str
+    num_runs: int
+    confidence: float
+    metrics: list[RepeatMetric] = field(default_factory=list)
+
+
+@dataclass
+class LengthBucket:
+    # Token ranges of the bucket, e.g. "128-255", or "0"
+    input_tokens: str
+    output_tokens: str
+    num_requests: int
+    # ttft and tpot in ms, latency in s; tpot is None when no request of
+    # the bucket has more than one output token
+    p50_ttft: float
+    p90_ttft: float
+    p99_ttft: float
+    p50_tpot: float | None
+    p90_tpot: float | None
+    p99_tpot: float | None
+    p50_latency: float
+    p90_latency: float
+    p99_latency: float
+
+
+@dataclass
+class LatencyModel:
+    # latency (ms) ≈ intercept + per_input_token·in + per_output_token·out
+    intercept: float
+    per_input_token: float
+    per_output_token: float
+    r_squared: float
+    num_requests: int
+
+
+@dataclass
+class LengthAnalysis:
+    buckets: list[LengthBucket] = field(default_factory=list)
+    latency_model: LatencyModel | None = None
+
+
+@dataclass
+class AbortWindow:
+    # Window bounds (s) relative to the start of the benchmark
+    start: float
+    end: float
+    completed_requests: int
+    aborted_requests: int
+    throughput: float
+    throughput_token: float
+    # Of the streams that were not aborted
+    p50_ttft: float | None
+    p50_tpot: float | None
+
+
+@dataclass
+class AbortStorm:
+    abort_fraction: float
+    aborted_requests: int
+    avg_abort_tokens: float | None
+    avg_abort_time: float | None
+    # Completed req/s before the storm and after it ended
+    pre_storm_throughput: float | None
+    post_storm_throughput: float | None
+    capacity_ratio: float | None
+    # Seconds after the storm until throughput and TTFT are back to baseline
+    recovery_time: float | None
+    capacity_leak: bool | None
+    windows: list[AbortWindow] = field(default_factory=list)
+
+
+@dataclass
+class HistogramBin:
+    # Attempts with latency up to le (ms), None for the unbounded last bin
+    le: float | None
+    count: int
+
+
+@dataclass
+class ErrorClassLatency:
+    # Time until each failed attempt surfaced its error (ms)
+    error_class: str
+    count: int
+    avg_latency: float | None
+    p50_latency: float | None
+    p99_latency: float | None
+    max_latency: float | None
+    histogram: list[HistogramBin] = field(default_factory=list)
+
+
+@dataclass
+class Retries:
+    max_retries: int
+    total_attempts: int
+    retries: int
+    # Attempts sent per logical request, 1.0 means no extra load
+    amplification: float | None
+    retried_requests: int
+    retry_exhausted: int
+    backoff_time: float
+    # End-to-end latency (s) of successful retried requests, backoff included
+    avg_retried_latency: float | None
+
+
+@dataclass
+class Batch:
+    endpoint: str
+    batch_size: int
+    total_items: int
+    items_per_sec: float
+    input_tokens_per_sec: float
+    # Latency of one whole request (ms), however many items it carried
+    avg_batch_latency: float | None
+    p50_batch_latency: float | None
+    p90_batch_latency: float | None
+    p99_batch_latency: float | None
+    # Batch latency divided by its items (ms)
+    avg_item_latency: float | None
+
+
+@dataclass
+class ServerMetricsSample:
+    # Seconds since the phase started; None when the server lacks the metric
+    time: float
+    preemptions: float | None
+    # Fraction of KV-cache blocks in use, 0-1
+    kv_cache_usage: float | None
+    running: float | None
+    waiting: float | None
+    swapped: float | None
+
+
+@dataclass
+class ServerMetrics:
+    num_scrapes: int
+    # Preemptions during the phase
+    preemptions: int | None
+    # KV-cache usage (%)
+    avg_kv_cache_usage: float | None
+    max_kv_cache_usage: float | None
+    max_running: int | None
+    max_waiting: int | None
+    max_swapped: int | None
+
+
+@dataclass
+class SchemaLatency:
+    schema: int
+    name: str
+    requests: int
+    # TTFT of the schema's first request, which pays the grammar compile (ms)
+    first_ttft: float | None
+    # Requests sent after the first one finished, served from the grammar
+    # cache; requests overlapping it may have waited on the same compile
+    steady_requests: int
+    avg_steady_ttft: float | None
+    p50_steady_ttft: float | None
+    # first_ttft minus p50_steady_ttft (ms)
+    compile_overhead: float | None
+
+
+@dataclass
+class StructuredOutput:
+    kind: Literal["json_schema", "tools"]
+    num_schemas: int
+    avg_first_ttft: float | None
+    avg_steady_ttft: float | None
+    p50_steady_ttft: float | None
+    p99_steady_ttft: float | None
+    avg_compile_overhead: float | None
+    schemas: list[SchemaLatency] = field(default_factory=list)
+
+
+@dataclass
+class ContextStep:
+    run_label: str
+    context_len: int
+    concurrency: int
+    successful_requests: int
+    failed_requests: int
+    avg_input_tokens: float | None
+    # ttft in ms; growth is avg ttft over that of the previous step
+    avg_ttft: float | None
+    p99_ttft: float | None
+    ttft_growth: float | None
+    ttft_per_1k_tokens: float | None
+    # Prompt + output tokens per second of wall time
+    throughput: float
+    preemptions: int | None
+    max_kv_cache_usage: float | None
+    collapsed: bool
+
+
+@dataclass
+class LongContextSummary:
+    run_label: str
+    collapse_threshold: float
+    steps: list[ContextStep] = field(default_factory=list)
+    # First step whose throughput fell below (1 - threshold) of the peak so
+    # far, or whose failure share exceeded the threshold
+    collapse_context_len: int | None = None
+    collapse_concurrency: int | None = None
+    first_preemption_context_len: int | None = None
+    kv_saturated_context_len: int | None = None
+
+
+@dataclass
+class ClientResourceSample:
+    # Seconds since the start of the benchmark
+    time: float
+    # Seconds the event loop woke up late
+    loop_lag: float
+    cpu_percent: float
+    # Resident set size (MB)
+    rss: float
+
+
+@dataclass
+class ClientOverhead:
+    # Event-loop lag (ms)
+    avg_loop_lag: float | None
+    p99_loop_lag: float | None
+    max_loop_lag: float | None
+    avg_cpu_percent: float | None
+    max_cpu_percent: float | None
+    max_rss: float | None
+    # Time waiting for a concurrency slot (ms), and its share of
+    # queue + wire time
+    avg_queue_time: float | None
+    p99_queue_time: float | None
+    queue_share: float | None
+    trustworthy: bool
+    warnings: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ProfileSpan:
+    name: str
+    count: int
+    # Total (ms), per call (µs) and per streamed token (µs)
+    total_time: float
+    avg_time: float
+    per_token: float | None
+
+
+@dataclass
+class Profile:
+    streamed_tokens: int
+    spans: list[ProfileSpan] = field(default_factory=list)
 
 
 @dataclass
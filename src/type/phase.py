@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+from typing import Literal
+
+
+@dataclass
+class Phase:
+    kind: Literal["warmup", "ramp", "steady", "cooldown", "cache_flush", "context"]
+    label: str
+    # Args fields overridden for this phase, e.g. num_request or concurrency
+    overrides: dict[str, int] = field(default_factory=dict)
+    # 1-based iteration when the phase is expanded by a repeat phase
+    iteration: int = 0
@@ -1,7 +1,29 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Literal
 
-from type.metrics import TTFT, Latency, LMCache, Stats, Token
+from type.metrics import (
+    TTFB,
+    TTFT,
+    AbortStorm,
+    AdaptiveConcurrency,
+    Batch,
+    ClientOverhead,
+    ClientResourceSample,
+    ConfidenceIntervals,
+    ErrorClassLatency,
+    Goodput,
+    Latency,
+    LengthAnalysis,
+    LMCache,
+    Profile,
+    Retries,
+    Samples,
+    ServerMetrics,
+    Stats,
+    StructuredOutput,
+    Token,
+    TurnTTFT,
+)
 
 
 @dataclass
@@ -9,9 +31,9 @@ class Report:
     model_server: str
     current_time: str
     stop_reason: Literal["done", "cancelled", "error"]
-    run_label: Literal["cold", "warm", "single"]
+    run_label: str
     model: str
-    completion_type: Literal["chat", "generate"]
+    completion_type: Literal["chat", "generate", "embeddings"]
     max_tokens: int
     num_concurrency: int
     total_duration_time: int
@@ -23,3 +45,27 @@ class Report:
     latency: Latency
     token: Token
     lmcache_metrics: LMCache | None = None
+    session_turns: list[TurnTTFT] | None = None
+    goodput: Goodput | None = None
+    adaptive_concurrency: AdaptiveConcurrency | None = None
+    confidence_intervals: ConfidenceIntervals | None = None
+    ttfb: TTFB | None = None
+    length_analysis: LengthAnalysis | None = None
+    phase: str = "steady"
+    abort_storm: AbortStorm | None = None
+    errors: list[ErrorClassLatency] | None = None
+    retries: Retries | None = None
+    client_overhead: ClientOverhead | None = None
+    profile: Profile | None = None
+    batch: Batch | None = None
+    context_len: int = 0
+    server_metrics: ServerMetrics | None = None
+    structured_output: StructuredOutput | None = None
+    # Share of the requests kept in samples, below 1 once a checkpointed run
+    # outgrows its sample budget; breakdown sections are scaled back up
+    sample_rate: float = 1.0
+    # Unrounded total_duration_time for derived rates, kept out of the
+    # report file like the raw per-request samples
+    duration: float = field(default=0.0, repr=False)
+    samples: Samples | None = field(default=None, repr=False)
+    client_samples: list[ClientResourceSample] | None = field(default=None, repr=False)
@@ -0,0 +1,86 @@
+from dataclasses import dataclass, field
+from typing import Literal
+
+
+@dataclass
+class AbortPoint:
+    # Disconnect after this many content chunks or seconds, None disables
+    after_tokens: int | None = None
+    after_time: float | None = None
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 0
+    # Error classes that are retried, e.g. "http_429", "timeout"
+    retry_on: frozenset[str] = field(default_factory=frozenset)
+    backoff: Literal["constant", "exponential"] = "exponential"
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    jitter: Literal["none", "full", "equal"] = "full"
+    respect_retry_after: bool = True
+
+
+@dataclass
+class RequestFailure:
+    # "http_<status>", "connect_timeout", "write_timeout", "pool_timeout",
+    # "timeout", "connect_error" or "error"
+    error_class: str
+    message: str
+    timeout: bool = False
+    non_200: bool = False
+    # Seconds from the Retry-After header, None when absent
+    retry_after: float | None = None
+
+
+@dataclass
+class RequestResult:
+    # Time to first content token (s)
+    ttft: float
+    # End-to-end latency (s)
+    latency: float
+    token: int
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    output_text: str = ""
+    # Time to first parsed SSE chunk (s), may be a role-only delta
+    ttfb: float = 0.0
+    output_chunks: int = 0
+    # False when the server omitted usage and token counts are estimates
+    usage_reported: bool = False
+    # True when the client disconnected on purpose mid-stream
+    aborted: bool = False
+    # perf_counter timestamp when the request was sent
+    start_time: float = 0.0
+    # Attempts including retries, and seconds spent on failed attempts and
+    # backoff before the final one
+    attempts: int = 1
+    retry_wait: float = 0.0
+    # Seconds spent waiting for a concurrency slot before the first attempt
+    queue_time: float = 0.0
+    # Inputs embedded or choices returned by a non-streaming request
+    items: int = 1
+    # Structured output schema of the request, -1 without one
+    schema: int = -1
+
+
+@dataclass
+class RequestSpec:
+    # Position in issue order within the phase
+    index: int
+    # Seconds after the phase start, 0.0 for closed-loop runs
+    arrival: float
+    # A list is one batched request, see --batch_size
+    prompt: str | list[str]
+    max_tokens: int
+    # Sampling seed sent to the server, None omits it
+    seed: int | None = None
+    # Index of the structured output schema, None sends none
+    schema: int | None = None
+
+
+@dataclass
+class StructuredOutputSchema:
+    name: str
+    # Merged into the request payload: response_format, or tools and tool_choice
+    payload: dict
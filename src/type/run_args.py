@@ -5,7 +5,7 @@ from typing import Literal
 @dataclass
 class Args:
     base_url: str
-    endpoint: Literal["/v1/chat/completions", "/v1/completions"]
+    endpoint: Literal["/v1/chat/completions", "/v1/completions", "/v1/embeddings"]
     api_key: str
     model: str
     concurrency: int
@@ -20,3 +20,71 @@ class Args:
     output_file: str
     use_lmcache_metrics: bool = False
     verbose: bool = False
+    session_mode: bool = False
+    session_reply: Literal["model", "dataset"] = "model"
+    think_time: float = 0.0
+    max_turns: int = 0
+    slo_ttft: float | None = None
+    slo_tpot: float | None = None
+    slo_latency: float | None = None
+    slo_window: float = 10.0
+    adaptive_concurrency: bool = False
+    target_ttft: float = 0.0
+    max_concurrency: int = 256
+    control_interval: float = 5.0
+    store_db: str | None = None
+    tag: str | None = None
+    repeat: int = 1
+    bootstrap: bool = False
+    bootstrap_resamples: int = 1000
+    confidence: float = 0.95
+    ci_target: float = 0.05
+    ttft_include_reasoning: bool = False
+    tokenizer_path: str = ""
+    tokenizer_workers: int = 4
+    length_analysis: bool = False
+    phases: str = ""
+    abort_fraction: float = 0.0
+    abort_after_tokens: int = 0
+    abort_after_time: float = 0.0
+    abort_distribution: Literal["fixed", "uniform", "exponential"] = "fixed"
+    abort_start: float = 0.0
+    abort_duration: float = 0.0
+    abort_window: float = 5.0
+    max_retries: int = 0
+    retry_on: str = "429,503"
+    retry_backoff: Literal["constant", "exponential"] = "exponential"
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 30.0
+    retry_jitter: Literal["none", "full", "equal"] = "full"
+    ignore_retry_after: bool = False
+    runtime: Literal["asyncio", "uvloop"] = "asyncio"
+    http_backend: Literal["httpx", "aiohttp", "raw"] = "httpx"
+    monitor_interval: float = 0.1
+    max_loop_lag: float = 50.0
+    profile: bool = False
+    profiler: Literal["none", "cprofile", "yappi"] = "none"
+    html_report: bool = False
+    no_stream: bool = False
+    batch_size: int = 1
+    input_len: int = 0
+    dataset_sampling: Literal["sequential", "random", "stratified"] = "sequential"
+    seed: int | None = None
+    num_prompts: int = 0
+    min_prompt_len: int = 0
+    max_prompt_len: int = 0
+    length_strata: int = 4
+    context_len: int = 0
+    server_metrics: bool = False
+    scrape_interval: float = 1.0
+    collapse_threshold: float = 0.3
+    checkpoint_interval: float = 0.0
+    resume: str = ""
+    request_rate: float = 0.0
+    min_output_tokens: int = 0
+    export_schedule: bool = False
+    import_schedule: str = ""
+    structured_output: Literal["none", "json_schema", "tools"] = "none"
+    schema_path: str = ""
+    num_schemas: int = 0
+    tool_choice: Literal["auto", "required"] = "required"
@@ -0,0 +1,40 @@
+import random
+from typing import Literal
+
+from type.request import AbortPoint
+
+
+def draw_abort_value(
+    value: float,
+    distribution: Literal["fixed", "uniform", "exponential"],
+    rng: random.Random,
+) -> float:
+    # uniform spans [0, 2 * value] and exponential has mean value, so every
+    # distribution aborts after `value` on average
+    if distribution == "uniform":
+        return rng.uniform(0, 2 * value)
+    if distribution == "exponential":
+        return rng.expovariate(1 / value)
+    return value
+
+
+def draw_abort_point(
+    fraction: float,
+    after_tokens: int,
+    after_time: float,
+    distribution: Literal["fixed", "uniform", "exponential"],
+    rng: random.Random,
+) -> AbortPoint | None:
+    if fraction <= 0 or rng.random() >= fraction:
+        return None
+
+    return AbortPoint(
+        after_tokens=(
+            max(1, round(draw_abort_value(after_tokens, distribution, rng)))
+            if after_tokens > 0
+            else None
+        ),
+        after_time=(
+            draw_abort_value(after_time, distribution, rng) if after_time > 0 else None
+        ),
+    )
@@ -0,0 +1,109 @@
+import numpy as np
+
+from type.metrics import LatencyModel, LengthAnalysis, LengthBucket, Samples
+from utils.statistics import scale_count
+
+PERCENTILES = (50, 90, 99)
+
+
+def bucket_bounds(tokens: np.ndarray) -> np.ndarray:
+    # Power-of-two buckets: bucket 0 holds 0 tokens, bucket k > 0 holds
+    # [2^(k-1), 2^k) tokens
+    return np.where(
+        tokens > 0, np.floor(np.log2(np.maximum(tokens, 1))).astype(np.int64) + 1, 0
+    )
+
+
+def bucket_label(bucket: int) -> str:
+    if bucket == 0:
+        return "0"
+    return f"{2 ** (bucket - 1)}-{2**bucket - 1}"
+
+
+def fit_latency_model(
+    input_tokens: np.ndarray, output_tokens: np.ndarray, latency: np.ndarray
+) -> LatencyModel | None:
+    # latency ≈ a + b·in + c·out, b is the prefill cost and c the decode cost
+    if len(latency) < 3:
+        return None
+
+    design = np.column_stack([np.ones_like(latency), input_tokens, output_tokens])
+    coef, _, rank, _ = np.linalg.lstsq(design, latency, rcond=None)
+    if rank < 3:
+        return None
+
+    residual = latency - design @ coef
+    total = latency - latency.mean()
+    ss_total = float(total @ total)
+    r_squared = 1 - float(residual @ residual) / ss_total if ss_total > 0 else 0.0
+
+    return LatencyModel(
+        intercept=round(float(coef[0]) * 1000, 4),
+        per_input_token=round(float(coef[1]) * 1000, 4),
+        per_output_token=round(float(coef[2]) * 1000, 4),
+        r_squared=round(r_squared, 4),
+        num_requests=len(latency),
+    )
+
+
+def generate_length_analysis(
+    samples: Samples, sample_rate: float = 1.0
+) -> LengthAnalysis:
+    ttft = samples.column("ttft")
+    latency = samples.column("latency")
+    input_tokens = samples.column("prompt_tokens")
+    output_tokens = samples.column("completion_tokens")
+    # Undefined with at most one output token, NaN is left out of the
+    # percentiles
+    tpot = np.where(
+        output_tokens > 1, (latency - ttft) / np.maximum(output_tokens - 1, 1), np.nan
+    )
+
+    input_bucket = bucket_bounds(input_tokens)
+    output_bucket = bucket_bounds(output_tokens)
+    # One integer key per (input, output) bucket pair, log2 of any token
+    # count stays far below 64; a 1-D unique is much cheaper than axis=0
+    keys, group = np.unique(input_bucket * 64 + output_bucket, return_inverse=True)
+    pairs = np.column_stack([keys // 64, keys % 64])
+
+    # Sort once so every bucket is a contiguous slice
+    order = np.argsort(group, kind="stable")
+    boundaries = np.searchsorted(group[order], np.arange(len(pairs) + 1))
+    sorted_ttft = ttft[order] * 1000
+    sorted_tpot = tpot[order] * 1000
+    sorted_latency = latency[order]
+
+    buckets: list[LengthBucket] = list()
+    for index, (in_bucket, out_bucket) in enumerate(pairs):
+        start, end = boundaries[index], boundaries[index + 1]
+        ttft_q = np.percentile(sorted_ttft[start:end], PERCENTILES)
+        bucket_tpot = sorted_tpot[start:end]
+        tpot_q = (
+            np.nanpercentile(bucket_tpot, PERCENTILES)
+            if not np.isnan(bucket_tpot).all()
+            else None
+        )
+        latency_q = np.percentile(sorted_latency[start:end], PERCENTILES)
+        buckets.append(
+            LengthBucket(
+                input_tokens=bucket_label(int(in_bucket)),
+                output_tokens=bucket_label(int(out_bucket)),
+                num_requests=scale_count(int(end - start), sample_rate),
+                p50_ttft=round(float(ttft_q[0]), 2),
+                p90_ttft=round(float(ttft_q[1]), 2),
+                p99_ttft=round(float(ttft_q[2]), 2),
+                p50_tpot=round(float(tpot_q[0]), 2) if tpot_q is not None else None,
+                p90_tpot=round(float(tpot_q[1]), 2) if tpot_q is not None else None,
+                p99_tpot=round(float(tpot_q[2]), 2) if tpot_q is not None else None,
+                p50_latency=round(float(latency_q[0]), 3),
+                p90_latency=round(float(latency_q[1]), 3),
+                p99_latency=round(float(latency_q[2]), 3),
+            )
+        )
+
+    return LengthAnalysis(
+        buckets=buckets,
+        latency_model=fit_latency_model(
+            input_tokens=input_tokens, output_tokens=output_tokens, latency=latency
+        ),
+    )
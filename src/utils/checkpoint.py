@@ -0,0 +1,308 @@
+import asyncio
+import os
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+import orjson
+
+from type.checkpoint import CheckpointState
+from type.metrics import (
+    ClientResourceSample,
+    Samples,
+    SampleTotals,
+    ServerMetricsSample,
+    Stats,
+)
+
+# perf_counter timestamps, stored relative to the phase start so a resumed
+# process can rebase them onto its own clock
+TIME_COLUMNS = (
+    "start_time",
+    "abort_start_time",
+    "error_start_time",
+    "missed_end_time",
+)
+
+# Sample columns filled together, one row per request or failed attempt;
+# rows are kept or dropped as a whole
+ROW_GROUPS = (
+    (
+        "ttft",
+        "ttfb",
+        "latency",
+        "token",
+        "prompt_tokens",
+        "completion_tokens",
+        "start_time",
+        "turn",
+        "attempts",
+        "retry_wait",
+        "queue_time",
+        "items",
+        "schema",
+    ),
+    ("abort_start_time", "abort_latency", "abort_tokens"),
+    ("error_class", "error_start_time", "error_latency"),
+    ("missed_end_time", "missed_turn"),
+)
+
+# Monitoring time series; their times are already relative to the phase start
+SAMPLE_LOGS = {
+    "client_resources": ClientResourceSample,
+    "server_metrics": ServerMetricsSample,
+}
+
+# Rows kept per phase, about 100 bytes each
+CHECKPOINT_SAMPLE_ROWS = 200_000
+CHECKPOINT_LOG_ROWS = 10_000
+
+
+def load_checkpoint_state(path: str) -> CheckpointState:
+    state_path = os.path.join(path, "state.json")
+    if not os.path.isfile(state_path):
+        raise FileNotFoundError(f"Checkpoint state {state_path} not found.")
+    with open(state_path, "rb") as f:
+        return CheckpointState(**orjson.loads(f.read()))
+
+
+def column_dtype(name: str) -> type:
+    buffer = getattr(Samples(), name)
+    if isinstance(buffer, list):
+        return np.str_
+    return np.float64 if buffer.typecode == "d" else np.int64
+
+
+class Checkpointer:
+    """Snapshots run progress every `interval` s and keeps memory flat.
+
+    Every checkpoint folds the buffered sample rows into exact SampleTotals
+    and a uniform sample of at most `max_rows` rows, then drops them. Each
+    row draws a random key and is kept while the key is below the sample
+    rate; a full sample halves the rate, so every row kind is kept at the
+    same rate and the report scales counts back up. Tracked monitoring logs
+    keep every n-th row the same way. Snapshot n writes
+    `<root>/r<repeat>_p<phase>/samples_<n>.npz` and `logs_<n>.json` before
+    state.json points at it.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        state: CheckpointState,
+        interval: float,
+        max_rows: int = CHECKPOINT_SAMPLE_ROWS,
+        max_log_rows: int = CHECKPOINT_LOG_ROWS,
+    ) -> None:
+        self.root = root
+        self.state = state
+        self.interval = interval
+        self.max_rows = max_rows
+        self.max_log_rows = max_log_rows
+        self.totals = SampleTotals()
+        self._rng = np.random.default_rng()
+        self._columns: dict[str, np.ndarray] = dict()
+        self._keys: dict[str, np.ndarray] = dict()
+        self._logs: dict[str, list] = dict()
+        self._log_rows: dict[str, int] = dict()
+        self._restored_logs: dict[str, list] = dict()
+        self._task: asyncio.Task | None = None
+        self._writing: asyncio.Future | None = None
+        self._reset_sample()
+
+    @property
+    def phase_dir(self) -> str:
+        return os.path.join(
+            self.root, f"r{self.state.repeat_index}_p{self.state.phase_index}"
+        )
+
+    def begin_phase(self, repeat_index: int, phase_index: int) -> bool:
+        """Returns True when the phase resumes from the checkpoint."""
+        self._logs = dict()
+        self._log_rows = dict()
+        self._restored_logs = dict()
+        if (repeat_index, phase_index) == (
+            self.state.repeat_index,
+            self.state.phase_index,
+        ) and self.state.sequence > 0:
+            self._load()
+            return True
+
+        self.state.repeat_index = repeat_index
+        self.state.phase_index = phase_index
+        self.state.elapsed = 0.0
+        self.state.stats = dict()
+        self.state.totals = dict()
+        self.state.sample_rate = 1.0
+        self.state.log_strides = dict()
+        self.state.sequence = 0
+        self.totals = SampleTotals()
+        self._reset_sample()
+        return False
+
+    def complete_phase(self, repeat_index: int, phase_index: int) -> None:
+        # The next phase starts fresh; its report file already holds this one
+        self.begin_phase(repeat_index=repeat_index, phase_index=phase_index + 1)
+        self._write_state(state=orjson.dumps(asdict(self.state)))
+
+    def track(self, name: str, rows: list) -> None:
+        # Thinned in place; rows restored from the checkpoint go first
+        assert name in SAMPLE_LOGS, f"Unknown sample log {name}."
+        rows[:0] = self._restored_logs.pop(name, list())
+        self._logs[name] = rows
+        self._log_rows[name] = len(rows)
+
+    def _reset_sample(self) -> None:
+        self._columns = {
+            name: np.empty(0, dtype=column_dtype(name))
+            for group in ROW_GROUPS
+            for name in group
+        }
+        self._keys = {group[0]: np.empty(0) for group in ROW_GROUPS}
+
+    def _load(self) -> None:
+        self.totals = SampleTotals(**self.state.totals)
+        path = Path(self.phase_dir, f"samples_{self.state.sequence}.npz")
+        with np.load(path) as data:
+            for name in self._columns:
+                self._columns[name] = data[name]
+            for name in self._keys:
+                self._keys[name] = data[f"keys_{name}"]
+        logs = orjson.loads(
+            Path(self.phase_dir, f"logs_{self.state.sequence}.json").read_bytes()
+        )
+        self._restored_logs = {
+            name: [SAMPLE_LOGS[name](**row) for row in rows]
+            for name, rows in logs.items()
+        }
+
+    def _fold(self, samples: Samples, start_time: float) -> None:
+        self.totals.update(samples=samples)
+        for group in ROW_GROUPS:
+            keys = self._rng.random(len(getattr(samples, group[0])))
+            kept = keys < self.state.sample_rate
+            self._keys[group[0]] = np.concatenate([self._keys[group[0]], keys[kept]])
+            for name in group:
+                buffer = getattr(samples, name)
+                values = (
+                    np.asarray(buffer, dtype=np.str_)
+                    if name == "error_class"
+                    else samples.column(name)
+                )
+                if name in TIME_COLUMNS:
+                    values = values - start_time
+                self._columns[name] = np.concatenate(
+                    [self._columns[name], values[kept]]
+                )
+                del buffer[:]
+
+        while sum(len(keys) for keys in self._keys.values()) > self.max_rows:
+            self.state.sample_rate /= 2
+            for group in ROW_GROUPS:
+                kept = self._keys[group[0]] < self.state.sample_rate
+                self._keys[group[0]] = self._keys[group[0]][kept]
+                for name in group:
+                    self._columns[name] = self._columns[name][kept]
+
+    def _thin_logs(self) -> None:
+        for name, rows in self._logs.items():
+            stride = self.state.log_strides.get(name, 1)
+            thinned = self._log_rows[name]
+            rows[thinned:] = rows[thinned::stride]
+            while len(rows) > self.max_log_rows:
+                del rows[1::2]
+                stride *= 2
+            self.state.log_strides[name] = stride
+            self._log_rows[name] = len(rows)
+
+    def _snapshot(
+        self, samples: Samples, stats: Stats, start_time: float
+    ) -> tuple[dict[str, np.ndarray], bytes, bytes]:
+        # Runs without an await, so stats and samples are taken consistently
+        self._fold(samples=samples, start_time=start_time)
+        self._thin_logs()
+
+        self.state.sequence += 1
+        self.state.elapsed = time.perf_counter() - start_time
+        self.state.stats = asdict(stats)
+        self.state.totals = asdict(self.totals)
+        # The arrays are replaced, never modified, so the writer thread can
+        # use them as they are
+        arrays = dict(self._columns) | {
+            f"keys_{name}": keys for name, keys in self._keys.items()
+        }
+        return arrays, orjson.dumps(self._logs), orjson.dumps(asdict(self.state))
+
+    def _write_file(self, path: str, write) -> None:
+        with open(f"{path}.tmp", "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{path}.tmp", path)
+
+    def _write_state(self, state: bytes) -> None:
+        Path(self.root).mkdir(parents=True, exist_ok=True)
+        self._write_file(
+            path=os.path.join(self.root, "state.json"), write=lambda f: f.write(state)
+        )
+
+    def _write(
+        self, arrays: dict[str, np.ndarray], logs: bytes, state: bytes, sequence: int
+    ) -> None:
+        # Sample and logs first, the state only points at complete files
+        Path(self.phase_dir).mkdir(parents=True, exist_ok=True)
+        self._write_file(
+            path=os.path.join(self.phase_dir, f"samples_{sequence}.npz"),
+            write=lambda f: np.savez(f, **arrays),
+        )
+        self._write_file(
+            path=os.path.join(self.phase_dir, f"logs_{sequence}.json"),
+            write=lambda f: f.write(logs),
+        )
+        self._write_state(state=state)
+        for name in (f"samples_{sequence - 1}.npz", f"logs_{sequence - 1}.json"):
+            Path(self.phase_dir, name).unlink(missing_ok=True)
+
+    async def checkpoint(
+        self, samples: Samples, stats: Stats, start_time: float
+    ) -> None:
+        # One write at a time; a cancelled checkpoint still completes its write
+        if self._writing is not None:
+            await asyncio.shield(self._writing)
+        arrays, logs, state = self._snapshot(
+            samples=samples, stats=stats, start_time=start_time
+        )
+        self._writing = asyncio.ensure_future(
+            asyncio.to_thread(self._write, arrays, logs, state, self.state.sequence)
+        )
+        await asyncio.shield(self._writing)
+
+    async def _run(self, samples: Samples, stats: Stats, start_time: float) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.checkpoint(samples=samples, stats=stats, start_time=start_time)
+
+    def start(self, samples: Samples, stats: Stats, start_time: float) -> None:
+        self._task = asyncio.create_task(
+            self._run(samples=samples, stats=stats, start_time=start_time)
+        )
+
+    async def stop(self, samples: Samples, stats: Stats, start_time: float) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.checkpoint(samples=samples, stats=stats, start_time=start_time)
+
+    def load_samples(self, start_time: float) -> Samples:
+        # The kept sample of the whole phase, resumed runs included, rebased
+        # on start_time
+        samples = Samples()
+        for name, values in self._columns.items():
+            if name == "error_class":
+                samples.error_class = values.tolist()
+                continue
+            if name in TIME_COLUMNS:
+                values = values + start_time
+            getattr(samples, name).frombytes(values.tobytes())
+        return samples
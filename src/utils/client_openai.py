@@ -6,78 +6,282 @@ from typing import Literal
 import httpx
 import orjson
 
+from type.request import AbortPoint, RequestResult
 from type.run_args import Args
+from utils.profiling import SpanProfiler
+from utils.transport import StreamResponse, Transport
+
+COMPLETION_TYPES: dict[str, Literal["chat", "generate", "embeddings"]] = {
+    "/v1/chat/completions": "chat",
+    "/v1/completions": "generate",
+    "/v1/embeddings": "embeddings",
+}
 
 
 def build_payload(
-    completion_type: Literal["chat", "generate"], prompt: str, args: Args
+    completion_type: Literal["chat", "generate", "embeddings"],
+    prompt: str | list[str],
+    args: Args,
+    messages: list[dict[str, str]] | None = None,
+    max_tokens: int | None = None,
+    seed: int | None = None,
+    structured: dict | None = None,
 ) -> dict:
+    # A list prompt is one batched request, see --batch_size; max_tokens,
+    # seed and the structured output schema come from the request schedule,
+    # see RequestScheduler
+    max_tokens = max_tokens if max_tokens is not None else args.max_tokens
+    sampling = {"seed": seed} if seed is not None else {}
+    if structured is not None:
+        sampling.update(structured)
+    stream = (
+        {"stream": True, "stream_options": {"include_usage": True}}
+        if not args.no_stream
+        else {"stream": False}
+    )
     if completion_type == "chat":
         return {
             "model": args.model,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": (
+                list(messages)
+                if messages is not None
+                else [{"role": "user", "content": prompt}]
+            ),
             "temperature": args.temperature,
-            "max_completion_tokens": args.max_tokens,
-            "stream": True,
-            "stream_options": {"include_usage": True},
+            "max_completion_tokens": max_tokens,
+            **sampling,
+            **stream,
         }
     elif completion_type == "generate":
         return {
             "model": args.model,
             "prompt": prompt,
-            "max_tokens": args.max_tokens,
+            "max_tokens": max_tokens,
             "temperature": args.temperature,
-            "stream": True,
-            "stream_options": {"include_usage": True},
+            **sampling,
+            **stream,
         }
+    elif completion_type == "embeddings":
+        return {
+            "model": args.model,
+            "input": prompt if isinstance(prompt, list) else [prompt],
+        }
+
+
+def extract_tool_call_text(tool_calls: list[dict] | None) -> str:
+    # Streamed tool-call names and arguments are the output of a tool call
+    return "".join(
+        (function.get("name") or "") + (function.get("arguments") or "")
+        for function in (
+            tool_call.get("function") or {} for tool_call in tool_calls or []
+        )
+    )
+
+
+def extract_chunk_text(parsed: dict) -> tuple[str, str]:
+    # Returns (content, reasoning) of the first choice
+    choices = parsed.get("choices") or []
+    if len(choices) == 0:
+        return "", ""
+
+    choice = choices[0]
+    if "delta" in choice:
+        delta = choice["delta"]
+        reasoning = delta.get("reasoning_content") or delta.get("reasoning") or ""
+        content = delta.get("content") or extract_tool_call_text(
+            tool_calls=delta.get("tool_calls")
+        )
+        return content, reasoning
+    return choice.get("text") or "", ""
+
+
+def sse_data(line: str) -> str | None:
+    # Payload of a `data:` line, None for comments, other fields and blanks
+    if not line.startswith("data: "):
+        return None
+    return line[6:]
+
+
+async def read_stream(
+    response: StreamResponse,
+    result: RequestResult,
+    output_parts: list[str] | None,
+    ttft_include_reasoning: bool,
+    abort_after_tokens: int | None,
+    profiler: SpanProfiler | None = None,
+) -> None:
+    # Fills result in place so partial progress survives an abort timer;
+    # ttft/ttfb stay inf until reached
+    buffer = ""
+    async for chunk in response.aiter_lines():
+        # Only the client's own work is timed, never the wait for the line
+        if profiler is None:
+            data = sse_data(chunk)
+        else:
+            with profiler.span("sse_parse"):
+                data = sse_data(chunk)
+        if data is None:
+            continue
+
+        if data.strip() == "[DONE]":
+            break
+
+        buffer += data
+        try:
+            if profiler is None:
+                parsed = orjson.loads(buffer)
+            else:
+                with profiler.span("json_decode"):
+                    parsed = orjson.loads(buffer)
+            buffer = ""
+        except Exception:
+            continue
+
+        if math.isinf(result.ttfb):
+            result.ttfb = time.perf_counter() - result.start_time
+
+        # Role-only deltas and usage chunks carry no token
+        content, reasoning = extract_chunk_text(parsed)
+        if content or (ttft_include_reasoning and reasoning):
+            result.output_chunks += 1
+            if math.isinf(result.ttft):
+                result.ttft = time.perf_counter() - result.start_time
+
+        if output_parts is not None:
+            output_parts.append(content)
+
+        usage = parsed.get("usage")
+        if usage is not None and "total_tokens" in usage:
+            result.token = usage.get("total_tokens")
+            result.prompt_tokens = usage.get("prompt_tokens") or 0
+            result.completion_tokens = usage.get("completion_tokens") or 0
+            result.usage_reported = True
+            break
+
+        if (
+            abort_after_tokens is not None
+            and result.output_chunks >= abort_after_tokens
+        ):
+            result.aborted = True
+            break
+
+
+async def read_body(
+    response: StreamResponse,
+    result: RequestResult,
+    output_parts: list[str] | None,
+    profiler: SpanProfiler | None = None,
+) -> None:
+    # Non-streaming chat, completions or embeddings response
+    body = await response.aread()
+    if profiler is None:
+        parsed = orjson.loads(body)
+    else:
+        with profiler.span("json_decode"):
+            parsed = orjson.loads(body)
+
+    if "data" in parsed:
+        result.items = len(parsed["data"])
+    else:
+        choices = parsed.get("choices") or []
+        result.items = len(choices)
+        texts = [
+            (choice.get("message") or {}).get("content")
+            or extract_tool_call_text(
+                tool_calls=(choice.get("message") or {}).get("tool_calls")
+            )
+            or choice.get("text")
+            or ""
+            for choice in choices
+        ]
+        result.output_chunks = sum(1 for text in texts if text)
+        if output_parts is not None:
+            output_parts.extend(texts)
+
+    usage = parsed.get("usage")
+    if usage is not None and "total_tokens" in usage:
+        result.token = usage.get("total_tokens")
+        result.prompt_tokens = usage.get("prompt_tokens") or 0
+        result.completion_tokens = usage.get("completion_tokens") or 0
+        result.usage_reported = True
 
 
 async def request_openai_format(
-    aclient: httpx.AsyncClient,
+    transport: Transport,
     url: str,
     headers: dict,
     payload: dict,
     timeout: int,
-) -> tuple[float | None, float | None, int | None]:
+    collect_output: bool = False,
+    ttft_include_reasoning: bool = False,
+    abort: AbortPoint | None = None,
+    profiler: SpanProfiler | None = None,
+) -> RequestResult:
     try:
-        timeout_cfg = httpx.Timeout(connect=10.0, read=None, write=60.0, pool=10.0)
         async with asyncio.timeout(timeout):
             start = time.perf_counter()
-            token = 0
-            ttft = math.inf
-            buffer = ""
+            result = RequestResult(
+                ttft=math.inf, latency=0.0, token=0, ttfb=math.inf, start_time=start
+            )
+            output_parts: list[str] = list()
 
-            async with aclient.stream(
-                "POST", url=url, headers=headers, json=payload, timeout=timeout_cfg
+            async with transport.stream(
+                url=url, headers=headers, payload=payload
             ) as response:
-                if response.status_code == 200:
-                    first_chunk_received = False
-                    async for chunk in response.aiter_lines():
-                        if not chunk.startswith("data: "):
-                            continue
-
-                        data = chunk[6:]
-                        if data.strip() == "[DONE]":
-                            break
-
-                        buffer += data
-                        try:
-                            parsed = orjson.loads(buffer)
-                            buffer = ""
-                        except Exception:
-                            continue
-
-                        if not first_chunk_received:
-                            first_chunk_received = True
-                            ttft = time.perf_counter() - start
-
-                        usage = parsed.get("usage")
-                        if usage is not None and "total_tokens" in usage:
-                            token = usage.get("total_tokens")
-                            break
-
-                    latency = time.perf_counter() - start
-                    return ttft if not math.isinf(ttft) else latency, latency, token
+                if response.status_code == 200 and not payload.get("stream"):
+                    # Headers arrive with the whole body, so ttft is latency
+                    result.ttfb = time.perf_counter() - start
+                    await read_body(
+                        response=response,
+                        result=result,
+                        output_parts=output_parts if collect_output else None,
+                        profiler=profiler,
+                    )
+                    result.latency = time.perf_counter() - start
+                    result.ttft = result.latency
+                    if not result.usage_reported:
+                        result.completion_tokens = result.output_chunks
+                        result.token = result.output_chunks
+                    result.output_text = "".join(output_parts)
+
+                    return result
+                elif response.status_code == 200:
+                    # Leaving the stream context closes the connection, which
+                    # is how a real client disconnect looks to the server
+                    abort_timer = asyncio.timeout(
+                        abort.after_time
+                        if abort is not None and abort.after_time is not None
+                        else None
+                    )
+                    try:
+                        async with abort_timer:
+                            await read_stream(
+                                response=response,
+                                result=result,
+                                output_parts=output_parts if collect_output else None,
+                                ttft_include_reasoning=ttft_include_reasoning,
+                                abort_after_tokens=(
+                                    abort.after_tokens if abort is not None else None
+                                ),
+                                profiler=profiler,
+                            )
+                    except TimeoutError:
+                        if not abort_timer.expired():
+                            raise
+                        result.aborted = True
+
+                    result.latency = time.perf_counter() - start
+                    if math.isinf(result.ttft):
+                        result.ttft = result.latency
+                    if math.isinf(result.ttfb):
+                        result.ttfb = result.latency
+                    if not result.usage_reported:
+                        # Server omitted usage, fall back to counted chunks
+                        result.completion_tokens = result.output_chunks
+                        result.token = result.output_chunks
+                    result.output_text = "".join(output_parts)
+
+                    return result
                 else:
                     try:
                         error_text = await response.aread()
@@ -85,10 +289,15 @@ async def request_openai_format(
                         error_message = error["error"]["message"]
                     except Exception:
                         error_message = "Failed to get error message"
+                    request = httpx.Request("POST", url)
                     raise httpx.HTTPStatusError(
                         f"{error_message}",
-                        request=response.request,
-                        response=response,
+                        request=request,
+                        response=httpx.Response(
+                            response.status_code,
+                            headers=response.headers,
+                            request=request,
+                        ),
                     )
 
     except httpx.ConnectTimeout:
@@ -100,6 +309,9 @@ async def request_openai_format(
     except httpx.PoolTimeout:
         raise
 
+    except httpx.ConnectError:
+        raise
+
     except asyncio.TimeoutError:
         raise
 
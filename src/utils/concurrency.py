@@ -0,0 +1,138 @@
+import asyncio
+import collections
+import math
+import time
+
+import numpy as np
+
+from type.metrics import ConcurrencyStep, Samples
+
+
+class ResizableSemaphore:
+    """asyncio.Semaphore replacement whose limit can change while tasks wait on it."""
+
+    def __init__(self, limit: int) -> None:
+        self._limit = limit
+        self._in_flight = 0
+        self._waiters: collections.deque[asyncio.Future] = collections.deque()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def set_limit(self, limit: int) -> None:
+        self._limit = max(1, limit)
+        self._wake_waiters()
+
+    async def acquire(self) -> None:
+        if self._in_flight < self._limit and not self._waiters:
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right before cancellation, release
+                # passes it on to the next waiter
+                self.release()
+            else:
+                # _wake_waiters may already have dropped the cancelled waiter
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                self._wake_waiters()
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        # Slots are handed over to waiters directly so a shrinking limit
+        # only takes effect as in-flight requests finish
+        while self._waiters and self._in_flight < self._limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+async def ramp_concurrency(
+    semaphore: ResizableSemaphore, target: int, duration: float
+) -> None:
+    # Raise the limit one step at a time from its current value to target
+    steps = target - semaphore.limit
+    if steps <= 0:
+        return
+
+    interval = duration / (steps + 1)
+    for _ in range(steps):
+        await asyncio.sleep(interval)
+        semaphore.set_limit(semaphore.limit + 1)
+
+
+class AIMDController:
+    """Additive-increase/multiplicative-decrease loop holding p95 TTFT at a target."""
+
+    def __init__(
+        self,
+        semaphore: ResizableSemaphore,
+        samples: Samples,
+        target_ttft: float,
+        max_concurrency: int,
+        interval: float,
+        increase: int = 1,
+        backoff: float = 0.8,
+        min_samples: int = 5,
+    ) -> None:
+        self.semaphore = semaphore
+        self.samples = samples
+        # target_ttft is in ms
+        self.target_ttft = target_ttft
+        self.max_concurrency = max_concurrency
+        self.interval = interval
+        self.increase = increase
+        self.backoff = backoff
+        self.min_samples = min_samples
+        self.trajectory: list[ConcurrencyStep] = list()
+
+    async def run(self, start_time: float) -> None:
+        seen = len(self.samples.ttft)
+        while True:
+            await asyncio.sleep(self.interval)
+
+            window_ttft = self.samples.ttft[seen:]
+            seen += len(window_ttft)
+            limit = self.semaphore.limit
+
+            if len(window_ttft) >= self.min_samples:
+                p95_ttft = float(np.percentile(window_ttft, 95)) * 1000
+                if p95_ttft <= self.target_ttft:
+                    limit = min(self.max_concurrency, limit + self.increase)
+                else:
+                    limit = max(1, math.floor(limit * self.backoff))
+                self.semaphore.set_limit(limit)
+            else:
+                p95_ttft = None
+
+            self.trajectory.append(
+                ConcurrencyStep(
+                    time=round(time.perf_counter() - start_time, 2),
+                    concurrency=limit,
+                    p95_ttft=round(p95_ttft, 2) if p95_ttft is not None else None,
+                    throughput=round(len(window_ttft) / self.interval, 2),
+                )
+            )
@@ -1,14 +1,31 @@
 import itertools
 import os
-from typing import Iterator
+import random
+from typing import Literal
 
+import numpy as np
 import orjson
 from anyio import open_file
 
+from utils.tokenizer import LocalTokenizer
 
-async def read_dataset_file(path: str) -> dict[str, str]:
-    prompts: dict[str, str] = dict()
+# Common English words that most BPE vocabularies encode as one token each
+FILLER_WORDS = (
+    "the of and to in is was for on are with as his they be at one have this "
+    "from or had by word but what some we can out other were all there when up "
+    "use your how said an each she which do their time if will way about many "
+    "then them write would like so these her long make thing see him two has "
+    "look more day could go come did number sound no most people my over know "
+    "water than call first who may down side been now find any new work part "
+    "take get place made live where after back little only round man year came "
+    "show every good me give our under name very through just form great think"
+).split()
+
+USER_ROLES = {"human", "user"}
+ASSISTANT_ROLES = {"gpt", "assistant", "chatgpt", "bing", "bard"}
 
+
+async def load_dataset_contents(path: str) -> list[dict]:
     async with await open_file(path) as f:
         contents = await f.read()
 
@@ -17,6 +34,13 @@ async def read_dataset_file(path: str) -> dict[str, str]:
     except orjson.JSONDecodeError:
         raise RuntimeError("JSON decode error") from None
 
+    return dec_contents
+
+
+async def read_dataset_file(path: str) -> dict[str, str]:
+    prompts: dict[str, str] = dict()
+
+    dec_contents = await load_dataset_contents(path=path)
     for data in dec_contents:
         if len(data["conversations"]) == 0:
             continue
@@ -25,15 +49,215 @@ async def read_dataset_file(path: str) -> dict[str, str]:
     return prompts
 
 
-async def build_dataset(path: str, prompt: str) -> Iterator[str]:
+def split_conversation_turns(conversation: list[dict]) -> list[tuple[str, str]]:
+    # Pair every user message with the assistant reply that follows it,
+    # leading assistant/system messages are dropped.
+    turns: list[tuple[str, str]] = list()
+    user_msg = None
+    for message in conversation:
+        role = message.get("from", "").lower()
+        if role in USER_ROLES:
+            if user_msg is not None:
+                turns.append((user_msg, ""))
+            user_msg = message.get("value", "")
+        elif role in ASSISTANT_ROLES and user_msg is not None:
+            turns.append((user_msg, message.get("value", "")))
+            user_msg = None
+
+    if user_msg is not None:
+        turns.append((user_msg, ""))
+
+    return turns
+
+
+async def read_dataset_conversations(path: str) -> dict[str, list[tuple[str, str]]]:
+    conversations: dict[str, list[tuple[str, str]]] = dict()
+
+    dec_contents = await load_dataset_contents(path=path)
+    for data in dec_contents:
+        turns = split_conversation_turns(conversation=data["conversations"])
+        if len(turns) == 0:
+            continue
+        conversations.update({data["id"]: turns})
+
+    return conversations
+
+
+def resize_prompt(text: str, num_words: int) -> str:
+    # Truncate, or repeat the prompt's words, to exactly num_words words
+    words = text.split()
+    if not words:
+        return text
+    return " ".join(itertools.islice(itertools.cycle(words), num_words))
+
+
+async def load_length_index(
+    path: str, prompts: list[str], tokenizer: LocalTokenizer | None
+) -> tuple[np.ndarray, str]:
+    """Length of every prompt in file order, cached in `<path>.index.json`.
+
+    Lengths are tokens with a tokenizer and whitespace-separated words
+    without one; the cache holds one entry per unit and is rebuilt when the
+    dataset file changes.
+    """
+    unit = (
+        f"tokens:{os.path.basename(tokenizer.path)}"
+        if tokenizer is not None
+        else "words"
+    )
+    stat = os.stat(path)
+    source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    index_path = f"{path}.index.json"
+
+    index = {"source": source, "lengths": dict()}
+    if os.path.isfile(index_path):
+        try:
+            async with await open_file(index_path, "rb") as f:
+                cached = orjson.loads(await f.read())
+            if cached.get("source") == source:
+                index = cached
+        except (OSError, orjson.JSONDecodeError):
+            pass
+
+    lengths = index["lengths"].get(unit)
+    if lengths is None or len(lengths) != len(prompts):
+        if tokenizer is not None:
+            lengths = await tokenizer.count_batch_tokens(texts=prompts)
+        else:
+            lengths = [len(text.split()) for text in prompts]
+        index["lengths"][unit] = lengths
+        try:
+            async with await open_file(index_path, "wb") as f:
+                await f.write(orjson.dumps(index))
+        except OSError as e:
+            print(f"⚠️  Length index not cached: {e}", flush=True)
+
+    if tokenizer is not None:
+        # Later prompt token counts are cache hits
+        tokenizer.prompt_cache.update(zip(prompts, lengths))
+
+    return np.asarray(lengths, dtype=np.int64), unit
+
+
+def sample_prompt_indices(
+    lengths: np.ndarray,
+    sampling: Literal["sequential", "random", "stratified"],
+    rng: np.random.Generator,
+    num_prompts: int = 0,
+    length_strata: int = 4,
+) -> np.ndarray:
+    # num_prompts 0 keeps every prompt, only the order changes
+    size = num_prompts if num_prompts > 0 else len(lengths)
+    if sampling == "sequential":
+        return np.arange(size)
+    if sampling == "random":
+        return rng.permutation(len(lengths))[:size]
+
+    # Equal-count length strata; each stratum contributes in proportion to
+    # its size, and its picks are spread evenly over the order, so every
+    # prefix of the cycle covers the whole length distribution
+    edges = np.quantile(lengths, np.linspace(0, 1, length_strata + 1)[1:-1])
+    strata = np.searchsorted(edges, lengths, side="right")
+    counts = np.bincount(strata, minlength=length_strata)
+    quota = counts / len(lengths) * size
+    take = np.floor(quota).astype(np.int64)
+    remainder = size - int(take.sum())
+    take[np.argsort(take - quota)[:remainder]] += 1
+
+    indices = list()
+    keys = list()
+    for stratum, count in enumerate(take):
+        if count == 0:
+            continue
+        picked = rng.permutation(np.flatnonzero(strata == stratum))[:count]
+        indices.append(picked)
+        keys.append((np.arange(count) + rng.random(count)) / count)
+    indices = np.concatenate(indices)
+    return indices[np.argsort(np.concatenate(keys), kind="stable")]
+
+
+async def build_dataset(
+    path: str,
+    prompt: str,
+    input_len: int = 0,
+    sampling: Literal["sequential", "random", "stratified"] = "sequential",
+    seed: int | None = None,
+    num_prompts: int = 0,
+    min_prompt_len: int = 0,
+    max_prompt_len: int = 0,
+    length_strata: int = 4,
+    tokenizer: LocalTokenizer | None = None,
+) -> list[str]:
     if path:
         if os.path.isfile(path):
-            datasets = await read_dataset_file(path=path)
-            datasets_cycle = itertools.cycle(datasets.values())
+            prompts = list((await read_dataset_file(path=path)).values())
         else:
             raise FileNotFoundError(f"Dataset file {path} not found.")
 
+        lengths, unit = await load_length_index(
+            path=path, prompts=prompts, tokenizer=tokenizer
+        )
+        keep = np.flatnonzero(
+            (lengths >= min_prompt_len)
+            & ((lengths <= max_prompt_len) if max_prompt_len > 0 else True)
+        )
+        if len(keep) == 0:
+            raise RuntimeError(
+                f"No prompt in {path} is within the length range "
+                f"[{min_prompt_len}, {max_prompt_len or 'inf'}] {unit}."
+            )
+        if num_prompts > len(keep):
+            raise RuntimeError(
+                f"num_prompts is {num_prompts}, but only {len(keep)} prompts "
+                f"in {path} are within the length range."
+            )
+
+        selected = keep[
+            sample_prompt_indices(
+                lengths=lengths[keep],
+                sampling=sampling,
+                rng=np.random.default_rng(seed),
+                num_prompts=num_prompts,
+                length_strata=length_strata,
+            )
+        ]
+        prompts = [prompts[index] for index in selected]
+        p50, p90 = np.percentile(lengths[selected], (50, 90))
+        print(
+            f"📚 {len(prompts)} prompts ({sampling}, seed {seed}), {unit} "
+            f"min {lengths[selected].min()} / p50 {p50:.0f} / p90 {p90:.0f} "
+            f"/ max {lengths[selected].max()}",
+            flush=True,
+        )
+
+    else:
+        prompts = [prompt]
+
+    if input_len > 0:
+        prompts = [resize_prompt(text=text, num_words=input_len) for text in prompts]
+
+    return prompts
+
+
+def synthesize_prompt(
+    num_tokens: int, rng: random.Random, tokens_per_word: float = 1.0
+) -> str:
+    # Random words, so no two prompts share a prefix the server could cache
+    num_words = max(1, round(num_tokens / tokens_per_word))
+    return " ".join(rng.choices(FILLER_WORDS, k=num_words))
+
+
+async def calibrate_tokens_per_word(tokenizer: LocalTokenizer) -> float:
+    sample = synthesize_prompt(num_tokens=4096, rng=random.Random(0))
+    return await tokenizer.count_tokens(text=sample) / 4096
+
+
+async def build_session_dataset(path: str) -> list[list[tuple[str, str]]]:
+    if os.path.isfile(path):
+        conversations = await read_dataset_conversations(path=path)
+        if len(conversations) == 0:
+            raise RuntimeError(f"Dataset file {path} contains no conversations.")
     else:
-        datasets_cycle = itertools.cycle([prompt])
+        raise FileNotFoundError(f"Dataset file {path} not found.")
 
-    return datasets_cycle
+    return list(conversations.values())
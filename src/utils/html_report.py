@@ -0,0 +1,448 @@
+import html
+import math
+from pathlib import Path
+
+import numpy as np
+from anyio import open_file
+
+from type.report import Report
+
+# Every chart is downsampled to a fixed number of points, so the file size
+# depends on the number of reports and not on the number of requests
+CDF_QUANTILES = np.unique(
+    np.r_[np.linspace(0.0, 1.0, 201), 1.0 - np.logspace(-2, -5, 13)]
+)
+HISTOGRAM_BINS = 60
+TIMELINE_POINTS = 300
+
+COLORS = (
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+)
+
+WIDTH = 760
+HEIGHT = 300
+MARGIN_LEFT = 64
+MARGIN_RIGHT = 64
+MARGIN_TOP = 16
+MARGIN_BOTTOM = 44
+
+Series = tuple[str, np.ndarray, np.ndarray]
+
+
+def nice_ticks(low: float, high: float, count: int = 5) -> np.ndarray:
+    if not math.isfinite(low) or not math.isfinite(high) or high <= low:
+        return np.asarray([low])
+    raw_step = (high - low) / count
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw_step)
+    return np.arange(math.ceil(low / step) * step, high + step * 1e-9, step)
+
+
+def format_tick(value: float) -> str:
+    if value == 0 or 0.01 <= abs(value) < 1e5:
+        return f"{value:.4g}"
+    return f"{value:.1e}"
+
+
+def svg_chart(
+    names: list[str],
+    series: list[Series],
+    x_label: str,
+    y_label: str,
+    secondary: list[Series] | None = None,
+    secondary_label: str = "",
+    secondary_max: float | None = None,
+) -> str:
+    """Line chart with one colour per report, optionally a dashed right axis.
+
+    `names` lists every report so a report keeps its colour across charts.
+    """
+    if not series:
+        return '<p class="empty">No samples.</p>'
+
+    plot_width = WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+    plot_height = HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+    x_all = np.concatenate([xs for _, xs, _ in series])
+    y_all = np.concatenate([ys for _, _, ys in series])
+    x_min, x_max = float(x_all.min()), float(x_all.max())
+    y_max = float(y_all.max()) * 1.05
+    if x_max <= x_min:
+        x_max = x_min + 1.0
+    if y_max <= 0:
+        y_max = 1.0
+
+    def scale_x(xs: np.ndarray) -> np.ndarray:
+        return MARGIN_LEFT + (xs - x_min) / (x_max - x_min) * plot_width
+
+    def scale_y(ys: np.ndarray, top: float) -> np.ndarray:
+        return MARGIN_TOP + plot_height - ys / top * plot_height
+
+    parts = [
+        f'<svg viewBox="0 0 {WIDTH} {HEIGHT}" xmlns="http://www.w3.org/2000/svg">',
+        f'<rect x="{MARGIN_LEFT}" y="{MARGIN_TOP}" width="{plot_width}" '
+        f'height="{plot_height}" class="plot"/>',
+    ]
+    for tick in nice_ticks(x_min, x_max):
+        x = scale_x(np.float64(tick))
+        parts.append(
+            f'<line x1="{x:.1f}" y1="{MARGIN_TOP}" x2="{x:.1f}" '
+            f'y2="{MARGIN_TOP + plot_height}" class="grid"/>'
+            f'<text x="{x:.1f}" y="{MARGIN_TOP + plot_height + 16}" '
+            f'text-anchor="middle">{format_tick(tick)}</text>'
+        )
+    for tick in nice_ticks(0.0, y_max):
+        y = scale_y(np.float64(tick), y_max)
+        parts.append(
+            f'<line x1="{MARGIN_LEFT}" y1="{y:.1f}" x2="{MARGIN_LEFT + plot_width}" '
+            f'y2="{y:.1f}" class="grid"/>'
+            f'<text x="{MARGIN_LEFT - 6}" y="{y + 4:.1f}" '
+            f'text-anchor="end">{format_tick(tick)}</text>'
+        )
+    parts.append(
+        f'<text x="{MARGIN_LEFT + plot_width / 2}" y="{HEIGHT - 6}" '
+        f'text-anchor="middle" class="label">{html.escape(x_label)}</text>'
+        f'<text transform="translate(14,{MARGIN_TOP + plot_height / 2}) rotate(-90)" '
+        f'text-anchor="middle" class="label">{html.escape(y_label)}</text>'
+    )
+
+    def polyline(
+        name: str, xs: np.ndarray, ys: np.ndarray, top: float, css_class: str
+    ) -> str:
+        index = names.index(name)
+        points = " ".join(
+            f"{x:.1f},{y:.1f}" for x, y in zip(scale_x(xs), scale_y(ys, top))
+        )
+        return (
+            f'<polyline points="{points}" stroke="{COLORS[index % len(COLORS)]}" '
+            f'class="{css_class}"><title>{html.escape(name)}</title></polyline>'
+        )
+
+    for name, xs, ys in series:
+        parts.append(polyline(name=name, xs=xs, ys=ys, top=y_max, css_class="series"))
+
+    if secondary:
+        top = secondary_max or max(float(ys.max()) for _, _, ys in secondary) * 1.05
+        top = top if top > 0 else 1.0
+        for tick in nice_ticks(0.0, top):
+            y = scale_y(np.float64(tick), top)
+            parts.append(
+                f'<text x="{MARGIN_LEFT + plot_width + 6}" y="{y + 4:.1f}">'
+                f"{format_tick(tick)}</text>"
+            )
+        parts.append(
+            f'<text transform="translate({WIDTH - 14},{MARGIN_TOP + plot_height / 2}) '
+            f'rotate(90)" text-anchor="middle" class="label">'
+            f"{html.escape(secondary_label)}</text>"
+        )
+        for name, xs, ys in secondary:
+            parts.append(
+                polyline(name=name, xs=xs, ys=ys, top=top, css_class="overlay")
+            )
+
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def legend(names: list[str]) -> str:
+    return (
+        '<div class="legend">'
+        + "".join(
+            f'<span><i style="background:{COLORS[index % len(COLORS)]}"></i>'
+            f"{html.escape(name)}</span>"
+            for index, name in enumerate(names)
+        )
+        + "</div>"
+    )
+
+
+def cdf_series(reports: dict[str, Report], column: str, scale: float) -> list[Series]:
+    series = list()
+    for name, report in reports.items():
+        values = report.samples.column(column)
+        if len(values) == 0:
+            continue
+        series.append(
+            (
+                name,
+                np.quantile(values, CDF_QUANTILES) * scale,
+                CDF_QUANTILES * 100,
+            )
+        )
+    return series
+
+
+def itl_series(reports: dict[str, Report]) -> list[Series]:
+    # Per-token timestamps are not kept, so each request contributes its
+    # mean inter-token latency (latency - ttft) / (output tokens - 1)
+    itl = dict()
+    for name, report in reports.items():
+        completion_tokens = report.samples.column("completion_tokens")
+        mask = completion_tokens > 1
+        if not mask.any():
+            continue
+        itl[name] = (
+            (
+                report.samples.column("latency")[mask]
+                - report.samples.column("ttft")[mask]
+            )
+            / (completion_tokens[mask] - 1)
+            * 1000
+        )
+    if not itl:
+        return list()
+
+    # Shared bins up to the largest p99.9, the tail is folded into the last bin
+    high = max(float(np.quantile(values, 0.999)) for values in itl.values())
+    edges = np.linspace(0.0, high if high > 0 else 1.0, HISTOGRAM_BINS + 1)
+    series = list()
+    for name, values in itl.items():
+        counts, _ = np.histogram(np.clip(values, 0.0, edges[-1]), bins=edges)
+        share = counts / len(values) * 100
+        # Step outline of the histogram
+        series.append((name, np.repeat(edges, 2)[1:-1], np.repeat(share, 2)))
+    return series
+
+
+def timeline_width(reports: dict[str, Report]) -> float:
+    span = 0.0
+    for report in reports.values():
+        start_time = report.samples.column("start_time")
+        if len(start_time) > 0:
+            end = start_time + report.samples.column("latency")
+            span = max(span, float(end.max() - start_time.min()))
+    return max(span / TIMELINE_POINTS, 0.1)
+
+
+def throughput_series(
+    reports: dict[str, Report], width: float
+) -> tuple[list[Series], list[Series]]:
+    throughput = list()
+    hit_ratio = list()
+    for name, report in reports.items():
+        start_time = report.samples.column("start_time")
+        if len(start_time) == 0:
+            continue
+        # Output tokens per second, credited to the window the request ended in
+        end = start_time + report.samples.column("latency") - start_time.min()
+        bins = (end // width).astype(np.int64)
+        tokens = np.bincount(bins, weights=report.samples.column("completion_tokens"))
+        xs = (np.arange(len(tokens)) + 0.5) * width
+        throughput.append((name, xs, tokens / width))
+
+        if report.lmcache_metrics is not None:
+            hit_ratio.append(
+                (
+                    name,
+                    np.asarray([0.0, float(end.max())]),
+                    np.full(2, report.lmcache_metrics.retrieve_hit_ratio * 100),
+                )
+            )
+    return throughput, hit_ratio
+
+
+def in_flight_series(reports: dict[str, Report], width: float) -> list[Series]:
+    series = list()
+    for name, report in reports.items():
+        samples = report.samples
+        # Successful, failed and aborted attempts all hold a connection
+        start_time = np.concatenate(
+            [
+                samples.column("start_time"),
+                samples.column("error_start_time"),
+                samples.column("abort_start_time"),
+            ]
+        )
+        if len(start_time) == 0:
+            continue
+        end_time = start_time + np.concatenate(
+            [
+                samples.column("latency"),
+                samples.column("error_latency"),
+                samples.column("abort_latency"),
+            ]
+        )
+        origin = start_time.min()
+        xs = np.arange(0.0, float(end_time.max() - origin) + width, width)
+        started = np.searchsorted(np.sort(start_time - origin), xs, side="right")
+        ended = np.searchsorted(np.sort(end_time - origin), xs, side="right")
+        series.append((name, xs, (started - ended).astype(np.float64)))
+    return series
+
+
+def loop_lag_series(reports: dict[str, Report]) -> list[Series]:
+    series = list()
+    for name, report in reports.items():
+        if not report.client_samples:
+            continue
+        times = np.asarray([sample.time for sample in report.client_samples])
+        lag = np.asarray([sample.loop_lag for sample in report.client_samples]) * 1000
+        # Keep the worst probe of each window, a lag spike must stay visible
+        step = max(1, math.ceil(len(times) / TIMELINE_POINTS))
+        starts = np.arange(0, len(times), step)
+        series.append((name, times[starts], np.maximum.reduceat(lag, starts)))
+    return series
+
+
+def summary_table(reports: dict[str, Report]) -> str:
+    columns = (
+        "Report",
+        "Successful",
+        "Failed",
+        "Request/s",
+        "Token/s",
+        "Avg ttft (ms)",
+        "Avg latency (s)",
+        "Retrieve hit ratio",
+    )
+    rows = list()
+    for name, report in reports.items():
+        values = (
+            name,
+            report.stats.successful_requests,
+            report.stats.failed_requests,
+            report.request_per_sec,
+            report.throughput_token,
+            report.ttft.avg_ttft,
+            report.latency.avg_latency,
+            (
+                report.lmcache_metrics.retrieve_hit_ratio
+                if report.lmcache_metrics is not None
+                else None
+            ),
+        )
+        rows.append(
+            "<tr>"
+            + "".join(
+                f"<td>{html.escape('-' if value is None else str(value))}</td>"
+                for value in values
+            )
+            + "</tr>"
+        )
+    head = "".join(f"<th>{column}</th>" for column in columns)
+    return f"<table><tr>{head}</tr>{''.join(rows)}</table>"
+
+
+def build_html_report(reports: dict[str, Report], title: str) -> str:
+    """Single-file HTML report of several runs, keyed by their display name."""
+    reports = {
+        name: report for name, report in reports.items() if report.samples is not None
+    }
+    names = list(reports)
+    width = timeline_width(reports=reports)
+    throughput, hit_ratio = throughput_series(reports=reports, width=width)
+
+    sections = [
+        ("Summary", summary_table(reports=reports)),
+        (
+            "TTFT CDF",
+            svg_chart(
+                names=names,
+                series=cdf_series(reports=reports, column="ttft", scale=1000),
+                x_label="TTFT (ms)",
+                y_label="Requests (%)",
+            ),
+        ),
+        (
+            "Latency CDF",
+            svg_chart(
+                names=names,
+                series=cdf_series(reports=reports, column="latency", scale=1),
+                x_label="Latency (s)",
+                y_label="Requests (%)",
+            ),
+        ),
+        (
+            "Inter-token latency histogram",
+            svg_chart(
+                names=names,
+                series=itl_series(reports=reports),
+                x_label="Mean inter-token latency per request (ms)",
+                y_label="Requests (%)",
+            ),
+        ),
+        (
+            "Output throughput",
+            svg_chart(
+                names=names,
+                series=throughput,
+                x_label=f"Time (s), {format_tick(width)} s windows",
+                y_label="Output tokens/s",
+                secondary=hit_ratio,
+                secondary_label="LMCache retrieve hit ratio (%)",
+                secondary_max=100.0,
+            ),
+        ),
+        (
+            "In-flight requests",
+            svg_chart(
+                names=names,
+                series=in_flight_series(reports=reports, width=width),
+                x_label="Time (s)",
+                y_label="Requests",
+            ),
+        ),
+    ]
+    loop_lag = loop_lag_series(reports=reports)
+    if loop_lag:
+        sections.append(
+            (
+                "Client event-loop lag",
+                svg_chart(
+                    names=names,
+                    series=loop_lag,
+                    x_label="Time (s)",
+                    y_label="Max loop lag (ms)",
+                ),
+            )
+        )
+
+    body = "".join(
+        f"<section><h2>{html.escape(heading)}</h2>{content}</section>"
+        for heading, content in sections
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px auto; max-width: {WIDTH + 40}px; color: #222; }}
+table {{ border-collapse: collapse; font-size: 13px; }}
+th, td {{ border: 1px solid #ddd; padding: 4px 8px; text-align: right; }}
+th:first-child, td:first-child {{ text-align: left; }}
+svg {{ width: 100%; height: auto; font-size: 11px; }}
+.plot {{ fill: none; stroke: #999; }}
+.grid {{ stroke: #eee; }}
+.label {{ font-size: 12px; }}
+.series {{ fill: none; stroke-width: 1.5; }}
+.overlay {{ fill: none; stroke-width: 1.5; stroke-dasharray: 6 4; }}
+.legend span {{ margin-right: 16px; font-size: 13px; }}
+.legend i {{ display: inline-block; width: 12px; height: 12px; margin-right: 4px; vertical-align: middle; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+{legend(names=names)}
+{body}
+</body>
+</html>
+"""
+
+
+async def save_html_report(
+    reports: dict[str, Report], title: str, save_path: str
+) -> None:
+    content = build_html_report(reports=reports, title=title)
+
+    Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+    async with await open_file(save_path, "w") as f:
+        await f.write(content)
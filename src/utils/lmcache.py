@@ -1,8 +1,13 @@
+import asyncio
 import re
 
 import httpx
 
 from type.metrics import LMCache, LMCacheRawData
+from utils.utils import extract_ip_from_url
+
+# LMCache updates its counters after the requests finish
+LMCACHE_SETTLE_TIME = 10.0
 
 
 def parse_lmcache_metrics_response(
@@ -50,16 +55,18 @@ def parse_lmcache_metrics_response(
     return metrics
 
 
-def fetch_lmcache_metrics(
+async def fetch_lmcache_metrics(
+    aclient: httpx.AsyncClient,
     lmcache_host: str,
 ) -> dict[str, list[dict[str, dict[str, str] | float]]] | None:
     try:
-        with httpx.Client() as client:
-            timeout_cfg = httpx.Timeout(connect=5.0, read=10.0, write=10.0, pool=5.0)
-            response = client.get(f"{lmcache_host}:7000/metrics", timeout=timeout_cfg)
-            response.raise_for_status()
+        timeout_cfg = httpx.Timeout(connect=5.0, read=10.0, write=10.0, pool=5.0)
+        response = await aclient.get(
+            f"{lmcache_host}:7000/metrics", timeout=timeout_cfg
+        )
+        response.raise_for_status()
 
-            metrics_data = response.text
+        metrics_data = response.text
 
     except httpx.HTTPError:
         print(
@@ -86,8 +93,10 @@ def get_metrics_value(
     return 0
 
 
-def get_lmcache_metrics(lmcache_host: str) -> LMCache | None:
-    metrics = fetch_lmcache_metrics(lmcache_host=lmcache_host)
+async def get_lmcache_metrics(
+    aclient: httpx.AsyncClient, lmcache_host: str
+) -> LMCache | None:
+    metrics = await fetch_lmcache_metrics(aclient=aclient, lmcache_host=lmcache_host)
     if metrics is not None:
         num_lookup_hits_total = get_metrics_value(
             metrics, "lmcache:num_lookup_hits_total"
@@ -153,3 +162,14 @@ def get_lmcache_metrics(lmcache_host: str) -> LMCache | None:
         return lmcache_metrics
 
     return None
+
+
+async def get_settled_lmcache_metrics(
+    aclient: httpx.AsyncClient, model_server: str
+) -> LMCache | None:
+    lmcache_host = extract_ip_from_url(url=model_server)
+    if lmcache_host is None:
+        return None
+
+    await asyncio.sleep(LMCACHE_SETTLE_TIME)
+    return await get_lmcache_metrics(aclient=aclient, lmcache_host=lmcache_host)
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import resource
+import time
+
+from type.metrics import ClientResourceSample
+
+
+def read_rss() -> float:
+    # Current resident set size (MB), peak RSS where /proc is unavailable
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss / 1024 / (1024 if os.uname().sysname == "Darwin" else 1)
+
+
+def read_cpu_time() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class ClientMonitor:
+    """Samples event-loop lag, process CPU and RSS of the benchmark client.
+
+    The probe sleeps for `interval` and records how late it wakes up; a busy
+    loop delays every timestamp the client takes, TTFT included.
+    """
+
+    def __init__(self, interval: float = 0.1) -> None:
+        self.interval = interval
+        self.samples: list[ClientResourceSample] = list()
+        self._task: asyncio.Task | None = None
+
+    async def _run(self, start_time: float) -> None:
+        last_wall = time.perf_counter()
+        last_cpu = read_cpu_time()
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            cpu = read_cpu_time()
+            wall = now - last_wall
+            self.samples.append(
+                ClientResourceSample(
+                    time=now - start_time,
+                    loop_lag=max(0.0, wall - self.interval),
+                    cpu_percent=(cpu - last_cpu) / wall * 100 if wall > 0 else 0.0,
+                    rss=read_rss(),
+                )
+            )
+            last_wall = now
+            last_cpu = cpu
+
+    def start(self, start_time: float) -> None:
+        self._task = asyncio.create_task(self._run(start_time=start_time))
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,168 @@
+import math
+
+import httpx
+
+from type.phase import Phase
+
+PHASE_KINDS = (
+    "warmup",
+    "ramp",
+    "steady",
+    "cooldown",
+    "cache_flush",
+    "repeat",
+    "context_ramp",
+)
+PHASE_OVERRIDES = (
+    "num_request",
+    "duration_time",
+    "concurrency",
+    "max_tokens",
+    "context_len",
+)
+CONTEXT_RAMP_OPTIONS = ("min_len", "max_len", "steps", "max_concurrency")
+
+
+def parse_phase(token: str) -> tuple[str, dict[str, str]]:
+    kind, _, options = token.partition(":")
+    if kind not in PHASE_KINDS:
+        raise ValueError(f"Unknown phase {kind}, must be one of {PHASE_KINDS}.")
+
+    params: dict[str, str] = dict()
+    for option in filter(None, options.split(",")):
+        key, sep, value = option.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid phase option {option} in {token}.")
+        params[key.strip()] = value.strip()
+
+    return kind, params
+
+
+def expand_context_ramp(
+    label: str, ramp: dict[str, int], overrides: dict[str, int]
+) -> list[Phase]:
+    # Prompt length, and concurrency when max_concurrency is set, grow
+    # geometrically; the default steps double the length each time
+    min_len = ramp.get("min_len", 1024)
+    max_len = ramp.get("max_len", 131072)
+    if not 1 <= min_len <= max_len:
+        raise ValueError(
+            f"context_ramp needs 1 <= min_len <= max_len, got {min_len} and {max_len}."
+        )
+    steps = ramp.get("steps", int(math.log2(max_len / min_len)) + 1)
+    if steps < 1:
+        raise ValueError(f"context_ramp steps is {steps}, must be >= 1.")
+    start_concurrency = overrides.get("concurrency", 1)
+    max_concurrency = ramp.get("max_concurrency")
+
+    phases: list[Phase] = list()
+    for step in range(steps):
+        fraction = step / (steps - 1) if steps > 1 else 0.0
+        context_len = round(min_len * (max_len / min_len) ** fraction)
+        step_overrides = dict(overrides, context_len=context_len)
+        if max_concurrency is not None:
+            step_overrides["concurrency"] = round(
+                start_concurrency * (max_concurrency / start_concurrency) ** fraction
+            )
+        phases.append(
+            Phase(
+                kind="context",
+                label=f"{label}_{context_len}",
+                overrides=step_overrides,
+            )
+        )
+
+    return phases
+
+
+def parse_phases(spec: str, use_lmcache: bool = False) -> list[Phase]:
+    """Parse a phase pipeline such as "warmup:num_request=16 steady cache_flush steady".
+
+    Each token is `kind[:key=value,...]`. `repeat:times=N` runs the phases
+    since the previous repeat (or the start) N times in total.
+    """
+    if not spec:
+        spec = (
+            "steady:label=cold steady:label=warm"
+            if use_lmcache
+            else "steady:label=single"
+        )
+
+    phases: list[Phase] = list()
+    block_start = 0
+    for token in spec.split():
+        kind, params = parse_phase(token=token)
+
+        if kind == "repeat":
+            times = int(params.get("times", 2))
+            if times < 1:
+                raise ValueError(f"repeat times is {times}, must be >= 1.")
+            block = phases[block_start:]
+            for phase in block:
+                phase.iteration = 1
+            for iteration in range(2, times + 1):
+                phases.extend(
+                    Phase(
+                        kind=phase.kind,
+                        label=phase.label,
+                        overrides=dict(phase.overrides),
+                        iteration=iteration,
+                    )
+                    for phase in block
+                )
+            block_start = len(phases)
+            continue
+
+        ramp = {
+            key: int(params.pop(key))
+            for key in CONTEXT_RAMP_OPTIONS
+            if kind == "context_ramp" and key in params
+        }
+        overrides: dict[str, int] = dict()
+        for key, value in params.items():
+            if key == "label":
+                continue
+            if key not in PHASE_OVERRIDES:
+                raise ValueError(
+                    f"Unknown phase option {key}, must be one of {PHASE_OVERRIDES + ('label',)}."
+                )
+            overrides[key] = int(value)
+        # A request count on its own must not be overridden by a global duration
+        if "num_request" in overrides and "duration_time" not in overrides:
+            overrides["duration_time"] = 0
+
+        if kind == "ramp" and overrides.get("duration_time", 1) < 1:
+            raise ValueError("ramp phase requires duration_time.")
+        if kind == "cooldown" and "duration_time" not in overrides:
+            raise ValueError("cooldown phase requires duration_time.")
+        if kind == "context_ramp":
+            phases.extend(
+                expand_context_ramp(
+                    label=params.get("label", "context"),
+                    ramp=ramp,
+                    overrides=overrides,
+                )
+            )
+            continue
+
+        phases.append(
+            Phase(kind=kind, label=params.get("label", kind), overrides=overrides)
+        )
+
+    return phases
+
+
+async def flush_prefix_cache(
+    aclient: httpx.AsyncClient, base_url: str, headers: dict
+) -> bool:
+    # vLLM exposes this endpoint when started with VLLM_SERVER_DEV_MODE=1
+    try:
+        response = await aclient.post(
+            f"{base_url.strip('/')}/reset_prefix_cache", headers=headers, timeout=30
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"\n❌ Failed to flush prefix cache: {e}", flush=True)
+        return False
+
+    return True
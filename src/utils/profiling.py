@@ -0,0 +1,143 @@
+import collections
+import contextlib
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Literal
+
+from type.metrics import Profile, ProfileSpan
+
+try:
+    import yappi
+except ImportError:
+    yappi = None
+
+
+class SpanProfiler:
+    """Accumulates wall time of named spans on the request hot path."""
+
+    def __init__(self) -> None:
+        self.total_ns: collections.Counter[str] = collections.Counter()
+        self.count: collections.Counter[str] = collections.Counter()
+
+    def add(self, name: str, elapsed_ns: int) -> None:
+        self.total_ns[name] += elapsed_ns
+        self.count[name] += 1
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter_ns() - start)
+
+    def to_profile(self, streamed_tokens: int) -> Profile:
+        return Profile(
+            streamed_tokens=streamed_tokens,
+            spans=[
+                ProfileSpan(
+                    name=name,
+                    count=self.count[name],
+                    total_time=round(total_ns / 1e6, 2),
+                    avg_time=round(total_ns / self.count[name] / 1e3, 2),
+                    per_token=(
+                        round(total_ns / streamed_tokens / 1e3, 3)
+                        if streamed_tokens > 0
+                        else None
+                    ),
+                )
+                for name, total_ns in self.total_ns.most_common()
+            ],
+        )
+
+
+def profile_span(
+    profiler: SpanProfiler | None, name: str
+) -> contextlib.AbstractContextManager:
+    return profiler.span(name) if profiler is not None else contextlib.nullcontext()
+
+
+class StackSampler:
+    """Samples the main thread's Python stack from a background thread.
+
+    The counts are written in the folded format that flamegraph.pl,
+    speedscope and inferno read. With asyncio the stack is that of whichever
+    task is running, and idle time shows up under the selector.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.stacks: collections.Counter[str] = collections.Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = list()
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class FunctionProfiler:
+    """cProfile, or yappi which also sees threads; both measure CPU time."""
+
+    def __init__(self, engine: Literal["cprofile", "yappi"]) -> None:
+        if engine == "yappi" and yappi is None:
+            raise RuntimeError(
+                "yappi is not installed, install it with `pip install .[profile]`."
+            )
+        self.engine = engine
+        self.profile = (
+            cProfile.Profile(time.process_time) if engine == "cprofile" else None
+        )
+
+    def start(self) -> None:
+        if self.profile is not None:
+            self.profile.enable()
+        else:
+            yappi.set_clock_type("cpu")
+            yappi.start()
+
+    def stop(self) -> None:
+        if self.profile is not None:
+            self.profile.disable()
+        else:
+            yappi.stop()
+
+    def save(self, path: str) -> None:
+        # pstats format, readable with snakeviz or gprof2dot
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if self.profile is not None:
+            self.profile.dump_stats(path)
+        else:
+            yappi.get_func_stats().save(path, type="pstat")
@@ -1,90 +1,192 @@
-import json
-import time
+import math
 from pathlib import Path
 from typing import Literal
 
+import numpy as np
+import orjson
 from anyio import open_file
 
-from type.metrics import TTFT, Latency, Stats, Token
+from type.metrics import (
+    TTFB,
+    TTFT,
+    AbortStorm,
+    AbortWindow,
+    AdaptiveConcurrency,
+    Batch,
+    ClientOverhead,
+    ClientResourceSample,
+    ConcurrencyStep,
+    ConfidenceIntervals,
+    ContextStep,
+    ErrorClassLatency,
+    Goodput,
+    HistogramBin,
+    Latency,
+    LMCache,
+    LongContextSummary,
+    MetricCI,
+    RepeatMetric,
+    RepeatSummary,
+    Retries,
+    Samples,
+    SampleTotals,
+    SchemaLatency,
+    ServerMetrics,
+    ServerMetricsSample,
+    SLOScenario,
+    SLOWindow,
+    Stats,
+    StructuredOutput,
+    Token,
+    TurnTTFT,
+)
 from type.report import Report
-from utils.lmcache import get_lmcache_metrics
-from utils.utils import extract_ip_from_url
+from utils.analysis import generate_length_analysis
+from utils.profiling import SpanProfiler
+from utils.statistics import (
+    bootstrap_confidence_intervals,
+    required_sample_size,
+    scale_count,
+)
+
+# Indented like json.dumps(indent=2); NumPy scalars and non-str keys are
+# converted instead of raising
+REPORT_JSON_OPTIONS = (
+    orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+)
 
 
 def generate_test_report(
     model_server: str,
     current_time: str,
-    run_label: Literal["cold", "warm", "single"],
+    run_label: str,
     model: str,
-    completion_type: Literal["chat", "generate"],
+    completion_type: Literal["chat", "generate", "embeddings"],
     max_tokens: int,
     num_concurrency: int,
     stats: Stats,
     duration: float,
     dataset: str,
     prompt: str,
-    ttft_list: list[float],
-    latency_list: list[float],
-    token_list: list[int],
+    samples: Samples,
     stop_reason: Literal["done", "cancelled", "error"],
-    use_lmcache: bool = False,
+    lmcache_metrics: LMCache | None = None,
+    session_mode: bool = False,
+    benchmark_start: float = 0.0,
+    slo_ttft: float | None = None,
+    slo_tpot: float | None = None,
+    slo_latency: float | None = None,
+    slo_window: float = 10.0,
+    target_ttft: float = 0.0,
+    concurrency_trajectory: list[ConcurrencyStep] | None = None,
+    bootstrap: bool = False,
+    bootstrap_resamples: int = 1000,
+    confidence: float = 0.95,
+    ci_target: float = 0.05,
+    length_analysis: bool = False,
+    phase: str = "steady",
+    abort_fraction: float = 0.0,
+    abort_start: float = 0.0,
+    abort_duration: float = 0.0,
+    abort_window: float = 5.0,
+    max_retries: int = 0,
+    client_samples: list[ClientResourceSample] | None = None,
+    max_loop_lag: float = 50.0,
+    profiler: SpanProfiler | None = None,
+    endpoint: str = "",
+    batch_size: int | None = None,
+    context_len: int = 0,
+    server_samples: list[ServerMetricsSample] | None = None,
+    structured_output: Literal["none", "json_schema", "tools"] = "none",
+    schema_names: list[str] | None = None,
+    totals: SampleTotals | None = None,
+    sample_rate: float = 1.0,
 ) -> Report:
     rps = stats.finished_requests / duration if duration > 0 else 0.0
 
-    if ttft_list:
-        avg_ttft = round(sum(ttft_list) / len(ttft_list) * 1000, 2)
-        max_ttft = round(max(ttft_list) * 1000, 2)
-        min_ttft = round(min(ttft_list) * 1000, 2)
-    else:
-        avg_ttft = None
-        max_ttft = None
-        min_ttft = None
-    ttft = TTFT(
-        avg_ttft=avg_ttft,
-        max_ttft=max_ttft,
-        min_ttft=min_ttft,
-    )
-
-    if latency_list:
-        avg_latency = round(sum(latency_list) / len(latency_list), 2)
-        max_latency = round(max(latency_list), 2)
-        min_latency = round(min(latency_list), 2)
-    else:
-        avg_latency = None
-        max_latency = None
-        min_latency = None
-    latency = Latency(
-        avg_latency=avg_latency,
-        max_latency=max_latency,
-        min_latency=min_latency,
-    )
-
-    if token_list:
-        avg_token = round(sum(token_list) / len(token_list), 2)
-        max_token = max(token_list)
-        min_token = min(token_list)
+    if totals is None:
+        totals = SampleTotals()
+        totals.update(samples=samples)
+    num_samples = totals.count
+    if num_samples > 0:
+        sums, mins, maxs = totals.sums, totals.mins, totals.maxs
+        ttft = TTFT(
+            avg_ttft=round(sums["ttft"] / num_samples * 1000, 2),
+            max_ttft=round(maxs["ttft"] * 1000, 2),
+            min_ttft=round(mins["ttft"] * 1000, 2),
+        )
+        ttfb = TTFB(
+            avg_ttfb=round(sums["ttfb"] / num_samples * 1000, 2),
+            max_ttfb=round(maxs["ttfb"] * 1000, 2),
+            min_ttfb=round(mins["ttfb"] * 1000, 2),
+        )
+        latency = Latency(
+            avg_latency=round(sums["latency"] / num_samples, 2),
+            max_latency=round(maxs["latency"], 2),
+            min_latency=round(mins["latency"], 2),
+        )
+        token = Token(
+            avg_token=round(sums["token"] / num_samples, 2),
+            max_token=int(maxs["token"]),
+            min_token=int(mins["token"]),
+            avg_input_token=round(sums["prompt_tokens"] / num_samples, 2),
+            avg_output_token=round(sums["completion_tokens"] / num_samples, 2),
+        )
+        throughput_token = (
+            round(sums["token"] / sums["latency"], 2) if sums["latency"] > 0 else 0.0
+        )
+        streamed_tokens = int(sums["completion_tokens"])
     else:
-        avg_token = None
-        max_token = None
-        min_token = None
-    token = Token(
-        avg_token=avg_token,
-        max_token=max_token,
-        min_token=min_token,
-    )
+        ttft = TTFT(avg_ttft=None, max_ttft=None, min_ttft=None)
+        ttfb = TTFB(avg_ttfb=None, max_ttfb=None, min_ttfb=None)
+        latency = Latency(avg_latency=None, max_latency=None, min_latency=None)
+        token = Token(avg_token=None, max_token=None, min_token=None)
+        throughput_token = 0.0
+        streamed_tokens = 0
 
-    throughput_token = (
-        round(sum(token_list) / sum(latency_list), 2) if sum(latency_list) > 0 else 0.0
+    session_turns = (
+        generate_session_turns_report(samples=samples, sample_rate=sample_rate)
+        if session_mode
+        else None
     )
 
-    if use_lmcache:
-        lmcache_host = extract_ip_from_url(url=model_server)
-        lmcache_metrics = None
-        if lmcache_host is not None:
-            time.sleep(10)
-            lmcache_metrics = get_lmcache_metrics(lmcache_host=lmcache_host)
+    if slo_ttft is not None or slo_tpot is not None or slo_latency is not None:
+        goodput = generate_goodput_report(
+            samples=samples,
+            stats=stats,
+            duration=duration,
+            run_label=run_label,
+            benchmark_start=benchmark_start,
+            slo_ttft=slo_ttft,
+            slo_tpot=slo_tpot,
+            slo_latency=slo_latency,
+            slo_window=slo_window,
+            session_mode=session_mode,
+            sample_rate=sample_rate,
+        )
     else:
-        lmcache_metrics = None
+        goodput = None
+
+    adaptive_concurrency = (
+        generate_adaptive_concurrency_report(
+            target_ttft=target_ttft,
+            num_concurrency=num_concurrency,
+            trajectory=concurrency_trajectory,
+        )
+        if concurrency_trajectory is not None
+        else None
+    )
+
+    confidence_intervals = (
+        generate_confidence_intervals_report(
+            samples=samples,
+            resamples=bootstrap_resamples,
+            confidence=confidence,
+            ci_target=ci_target,
+        )
+        if bootstrap
+        else None
+    )
 
     return Report(
         model_server=model_server,
@@ -96,6 +198,7 @@ def generate_test_report(
         max_tokens=max_tokens,
         num_concurrency=num_concurrency,
         total_duration_time=round(duration, 2),
+        duration=duration,
         dataset=dataset if dataset else prompt,
         request_per_sec=round(rps, 2),
         throughput_token=throughput_token,
@@ -104,15 +207,914 @@ def generate_test_report(
         latency=latency,
         token=token,
         lmcache_metrics=lmcache_metrics,
+        session_turns=session_turns,
+        goodput=goodput,
+        adaptive_concurrency=adaptive_concurrency,
+        confidence_intervals=confidence_intervals,
+        ttfb=ttfb,
+        length_analysis=(
+            generate_length_analysis(samples=samples, sample_rate=sample_rate)
+            if length_analysis and num_samples > 0
+            else None
+        ),
+        phase=phase,
+        abort_storm=(
+            generate_abort_report(
+                samples=samples,
+                duration=duration,
+                benchmark_start=benchmark_start,
+                abort_fraction=abort_fraction,
+                abort_start=abort_start,
+                abort_duration=abort_duration,
+                window=abort_window,
+                sample_rate=sample_rate,
+            )
+            if abort_fraction > 0
+            else None
+        ),
+        errors=(
+            generate_error_report(samples=samples, sample_rate=sample_rate)
+            if samples.error_class
+            else None
+        ),
+        retries=(
+            generate_retry_report(
+                stats=stats,
+                samples=samples,
+                max_retries=max_retries,
+                sample_rate=sample_rate,
+            )
+            if max_retries > 0
+            else None
+        ),
+        client_overhead=(
+            generate_client_overhead_report(
+                samples=samples,
+                client_samples=client_samples,
+                max_loop_lag=max_loop_lag,
+            )
+            if client_samples is not None
+            else None
+        ),
+        profile=(
+            profiler.to_profile(streamed_tokens=streamed_tokens)
+            if profiler is not None
+            else None
+        ),
+        batch=(
+            generate_batch_report(
+                samples=samples,
+                duration=duration,
+                endpoint=endpoint,
+                batch_size=batch_size,
+                sample_rate=sample_rate,
+            )
+            if batch_size is not None
+            else None
+        ),
+        context_len=context_len,
+        server_metrics=(
+            generate_server_metrics_report(server_samples=server_samples)
+            if server_samples
+            else None
+        ),
+        structured_output=(
+            generate_structured_output_report(
+                samples=samples,
+                kind=structured_output,
+                schema_names=schema_names,
+                sample_rate=sample_rate,
+            )
+            if structured_output != "none" and schema_names
+            else None
+        ),
+        sample_rate=sample_rate,
+        samples=samples,
+        client_samples=client_samples,
     )
 
 
-async def save_report_as_file(data: Report, save_path: str) -> None:
+def generate_session_turns_report(
+    samples: Samples, sample_rate: float = 1.0
+) -> list[TurnTTFT]:
+    turn = samples.column("turn")
+    if len(turn) == 0:
+        return list()
+
+    # Sort once by turn, then reduce each contiguous run of a turn
+    order = np.argsort(turn, kind="stable")
+    turn = turn[order]
+    ttft = samples.column("ttft")[order]
+    prompt_tokens = samples.column("prompt_tokens")[order]
+    starts = np.flatnonzero(np.r_[True, turn[1:] != turn[:-1]])
+    num_requests = np.diff(np.r_[starts, len(turn)])
+    ttft_sum = np.add.reduceat(ttft, starts)
+    ttft_max = np.maximum.reduceat(ttft, starts)
+    ttft_min = np.minimum.reduceat(ttft, starts)
+    prompt_tokens_sum = np.add.reduceat(prompt_tokens, starts)
+
+    return [
+        TurnTTFT(
+            turn=int(turn[start]) + 1,
+            num_requests=scale_count(int(num_requests[index]), sample_rate),
+            avg_ttft=round(float(ttft_sum[index]) / int(num_requests[index]) * 1000, 2),
+            max_ttft=round(float(ttft_max[index]) * 1000, 2),
+            min_ttft=round(float(ttft_min[index]) * 1000, 2),
+            avg_prompt_tokens=round(
+                float(prompt_tokens_sum[index]) / int(num_requests[index]), 2
+            ),
+        )
+        for index, start in enumerate(starts)
+    ]
+
+
+def generate_goodput_report(
+    samples: Samples,
+    stats: Stats,
+    duration: float,
+    run_label: str,
+    benchmark_start: float,
+    slo_ttft: float | None,
+    slo_tpot: float | None,
+    slo_latency: float | None,
+    slo_window: float,
+    session_mode: bool = False,
+    sample_rate: float = 1.0,
+) -> Goodput:
+    # slo_ttft and slo_tpot are in ms, slo_latency is in s
+    ttft = samples.column("ttft")
+    latency = samples.column("latency")
+    completion_tokens = samples.column("completion_tokens")
+    tpot = np.where(
+        completion_tokens > 1,
+        (latency - ttft) / np.maximum(completion_tokens - 1, 1),
+        np.nan,
+    )
+    met = np.ones(len(ttft), dtype=bool)
+    if slo_ttft is not None:
+        met &= ttft * 1000 <= slo_ttft
+    if slo_tpot is not None:
+        # Requests with at most one output token have no TPOT to check
+        met &= np.isnan(tpot) | (tpot * 1000 <= slo_tpot)
+    if slo_latency is not None:
+        met &= latency <= slo_latency
+
+    met_requests = scale_count(int(met.sum()), sample_rate)
+    # Failed requests never meet the SLOs
+    attainment = (
+        met_requests / stats.finished_requests if stats.finished_requests > 0 else 0.0
+    )
+    goodput = met_requests / duration if duration > 0 else 0.0
+
+    windows: list[SLOWindow] = list()
+    if slo_window > 0 and duration > 0:
+        num_windows = max(1, math.ceil(duration / slo_window))
+        finish = samples.column("start_time") + latency - benchmark_start
+        window_index = np.clip(
+            (finish // slo_window).astype(np.int64), 0, num_windows - 1
+        )
+        missed_index = np.clip(
+            (
+                (samples.column("missed_end_time") - benchmark_start) // slo_window
+            ).astype(np.int64),
+            0,
+            num_windows - 1,
+        )
+        # Failed and aborted requests are misses, as in the overall attainment
+        window_total = np.bincount(
+            np.concatenate([window_index, missed_index]), minlength=num_windows
+        )
+        window_met = np.bincount(window_index, weights=met, minlength=num_windows)
+
+        for index in range(num_windows):
+            window_start = index * slo_window
+            window_end = min((index + 1) * slo_window, duration)
+            window_len = window_end - window_start
+            windows.append(
+                SLOWindow(
+                    start=round(window_start, 2),
+                    end=round(window_end, 2),
+                    num_requests=scale_count(int(window_total[index]), sample_rate),
+                    met_requests=scale_count(int(window_met[index]), sample_rate),
+                    attainment=round(
+                        float(window_met[index]) / int(window_total[index])
+                        if window_total[index] > 0
+                        else 0.0,
+                        4,
+                    ),
+                    goodput=round(
+                        float(window_met[index]) / sample_rate / window_len
+                        if window_len > 0
+                        else 0.0,
+                        2,
+                    ),
+                )
+            )
+
+    scenarios = [
+        SLOScenario(
+            scenario=run_label,
+            num_requests=stats.finished_requests,
+            met_requests=met_requests,
+            attainment=round(attainment, 4),
+        )
+    ]
+    all_turns = np.concatenate([samples.column("turn"), samples.column("missed_turn")])
+    if session_mode and len(all_turns) > 0:
+        turns, turn_index = np.unique(all_turns, return_inverse=True)
+        turn_total = np.bincount(turn_index, minlength=len(turns))
+        turn_met = np.bincount(
+            turn_index[: len(met)], weights=met, minlength=len(turns)
+        )
+
+        for index, turn in enumerate(turns):
+            scenarios.append(
+                SLOScenario(
+                    scenario=f"{run_label}/turn_{int(turn) + 1}",
+                    num_requests=scale_count(int(turn_total[index]), sample_rate),
+                    met_requests=scale_count(int(turn_met[index]), sample_rate),
+                    attainment=round(
+                        float(turn_met[index]) / int(turn_total[index]), 4
+                    ),
+                )
+            )
+
+    return Goodput(
+        slo_ttft=slo_ttft,
+        slo_tpot=slo_tpot,
+        slo_latency=slo_latency,
+        met_requests=met_requests,
+        attainment=round(attainment, 4),
+        goodput=round(goodput, 2),
+        windows=windows,
+        scenarios=scenarios,
+    )
+
+
+def generate_adaptive_concurrency_report(
+    target_ttft: float,
+    num_concurrency: int,
+    trajectory: list[ConcurrencyStep],
+) -> AdaptiveConcurrency:
+    # The second half of the trajectory is treated as the equilibrium
+    settled = trajectory[len(trajectory) // 2 :]
+    if settled:
+        equilibrium_concurrency = round(
+            sum(step.concurrency for step in settled) / len(settled), 2
+        )
+        equilibrium_throughput = round(
+            sum(step.throughput for step in settled) / len(settled), 2
+        )
+    else:
+        equilibrium_concurrency = None
+        equilibrium_throughput = None
+
+    return AdaptiveConcurrency(
+        target_ttft=target_ttft,
+        final_concurrency=(
+            trajectory[-1].concurrency if trajectory else num_concurrency
+        ),
+        equilibrium_concurrency=equilibrium_concurrency,
+        equilibrium_throughput=equilibrium_throughput,
+        trajectory=trajectory,
+    )
+
+
+def generate_abort_report(
+    samples: Samples,
+    duration: float,
+    benchmark_start: float,
+    abort_fraction: float,
+    abort_start: float,
+    abort_duration: float,
+    window: float,
+    recovered_ratio: float = 0.9,
+    sample_rate: float = 1.0,
+) -> AbortStorm:
+    num_windows = max(1, math.ceil(duration / window)) if duration > 0 else 1
+    ttft = samples.column("ttft")
+    latency = samples.column("latency")
+    completion_tokens = samples.column("completion_tokens")
+    tpot = np.where(
+        completion_tokens > 1,
+        (latency - ttft) / np.maximum(completion_tokens - 1, 1),
+        np.nan,
+    )
+    finish = samples.column("start_time") + latency
+    window_index = np.clip(
+        ((finish - benchmark_start) // window).astype(np.int64), 0, num_windows - 1
+    )
+    abort_finish = samples.column("abort_start_time") + samples.column("abort_latency")
+    abort_index = np.clip(
+        ((abort_finish - benchmark_start) // window).astype(np.int64),
+        0,
+        num_windows - 1,
+    )
+
+    completed = np.bincount(window_index, minlength=num_windows) / sample_rate
+    aborted = np.bincount(abort_index, minlength=num_windows) / sample_rate
+    tokens = (
+        np.bincount(window_index, weights=completion_tokens, minlength=num_windows)
+        / sample_rate
+    )
+
+    windows: list[AbortWindow] = list()
+    for index in range(num_windows):
+        window_start = index * window
+        window_end = min((index + 1) * window, duration) if duration > 0 else window
+        window_len = max(window_end - window_start, 1e-9)
+        in_window = window_index == index
+        window_tpot = tpot[in_window]
+        window_tpot = window_tpot[~np.isnan(window_tpot)]
+        windows.append(
+            AbortWindow(
+                start=round(window_start, 2),
+                end=round(window_end, 2),
+                completed_requests=round(completed[index]),
+                aborted_requests=round(aborted[index]),
+                throughput=round(float(completed[index]) / window_len, 2),
+                throughput_token=round(float(tokens[index]) / window_len, 2),
+                p50_ttft=(
+                    round(float(np.median(ttft[in_window])) * 1000, 2)
+                    if completed[index] > 0
+                    else None
+                ),
+                p50_tpot=(
+                    round(float(np.median(window_tpot)) * 1000, 2)
+                    if len(window_tpot) > 0
+                    else None
+                ),
+            )
+        )
+
+    # Without an explicit storm window the storm lasts the whole run and
+    # there is no baseline to recover to
+    storm_end = abort_start + abort_duration if abort_duration > 0 else math.inf
+    # A last window cut short by the end of the run also holds the drained
+    # requests, its rate is no baseline
+    full_windows = [
+        w
+        for index, w in enumerate(windows)
+        if duration <= 0 or (index + 1) * window <= duration
+    ]
+    pre_windows = [w for w in full_windows if w.end <= abort_start]
+    post_windows = [w for w in full_windows if w.start >= storm_end]
+
+    pre_storm_throughput = (
+        sum(w.throughput for w in pre_windows) / len(pre_windows)
+        if pre_windows
+        else None
+    )
+    pre_ttft = [w.p50_ttft for w in pre_windows if w.p50_ttft is not None]
+    baseline_ttft = sum(pre_ttft) / len(pre_ttft) if pre_ttft else None
+
+    recovery_time = None
+    if pre_storm_throughput is not None:
+        for w in post_windows:
+            throughput_ok = w.throughput >= recovered_ratio * pre_storm_throughput
+            ttft_ok = (
+                baseline_ttft is None
+                or w.p50_ttft is None
+                or w.p50_ttft <= baseline_ttft / recovered_ratio
+            )
+            if throughput_ok and ttft_ok:
+                recovery_time = round(w.start - storm_end, 2)
+                break
+
+    # The settled second half of the post-storm windows shows leaked capacity
+    settled = post_windows[len(post_windows) // 2 :]
+    post_storm_throughput = (
+        sum(w.throughput for w in settled) / len(settled) if settled else None
+    )
+    capacity_ratio = (
+        post_storm_throughput / pre_storm_throughput
+        if pre_storm_throughput and post_storm_throughput is not None
+        else None
+    )
+
+    return AbortStorm(
+        abort_fraction=abort_fraction,
+        aborted_requests=scale_count(len(samples.abort_latency), sample_rate),
+        avg_abort_tokens=(
+            round(float(samples.column("abort_tokens").mean()), 2)
+            if len(samples.abort_tokens) > 0
+            else None
+        ),
+        avg_abort_time=(
+            round(float(samples.column("abort_latency").mean()), 2)
+            if len(samples.abort_latency) > 0
+            else None
+        ),
+        pre_storm_throughput=(
+            round(pre_storm_throughput, 2) if pre_storm_throughput is not None else None
+        ),
+        post_storm_throughput=(
+            round(post_storm_throughput, 2)
+            if post_storm_throughput is not None
+            else None
+        ),
+        capacity_ratio=round(capacity_ratio, 4) if capacity_ratio is not None else None,
+        recovery_time=recovery_time,
+        capacity_leak=(
+            capacity_ratio < recovered_ratio if capacity_ratio is not None else None
+        ),
+        windows=windows,
+    )
+
+
+def sample_statistics(c: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    # One percentile call per column, each one partitions the whole resample
+    ttft_p50, ttft_p90, ttft_p99 = np.percentile(c["ttft"], [50, 90, 99], axis=1)
+    latency_p50, latency_p90, latency_p99 = np.percentile(
+        c["latency"], [50, 90, 99], axis=1
+    )
+    return {
+        "Avg ttft (ms)": c["ttft"].mean(axis=1) * 1000,
+        "P50 ttft (ms)": ttft_p50 * 1000,
+        "P90 ttft (ms)": ttft_p90 * 1000,
+        "P99 ttft (ms)": ttft_p99 * 1000,
+        "Avg latency (s)": c["latency"].mean(axis=1),
+        "P50 latency (s)": latency_p50,
+        "P90 latency (s)": latency_p90,
+        "P99 latency (s)": latency_p99,
+        "Throughput token (tok/s)": (
+            c["token"].sum(axis=1) / np.maximum(c["latency"].sum(axis=1), 1e-12)
+        ),
+    }
+
+
+# Upper bounds (ms) of the error latency histogram bins
+ERROR_LATENCY_BINS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+def generate_error_report(
+    samples: Samples, sample_rate: float = 1.0
+) -> list[ErrorClassLatency]:
+    error_class = np.asarray(samples.error_class)
+    error_latency = samples.column("error_latency") * 1000
+    edges = np.asarray(ERROR_LATENCY_BINS, dtype=np.float64)
+
+    errors: list[ErrorClassLatency] = list()
+    for name in sorted(set(samples.error_class)):
+        latency = error_latency[error_class == name]
+        counts = np.bincount(
+            np.searchsorted(edges, latency, side="left"), minlength=len(edges) + 1
+        )
+        errors.append(
+            ErrorClassLatency(
+                error_class=name,
+                count=scale_count(len(latency), sample_rate),
+                avg_latency=round(float(latency.mean()), 2),
+                p50_latency=round(float(np.percentile(latency, 50)), 2),
+                p99_latency=round(float(np.percentile(latency, 99)), 2),
+                max_latency=round(float(latency.max()), 2),
+                histogram=[
+                    HistogramBin(
+                        le=float(edges[index]) if index < len(edges) else None,
+                        count=scale_count(int(count), sample_rate),
+                    )
+                    for index, count in enumerate(counts)
+                    if count > 0
+                ],
+            )
+        )
+
+    return errors
+
+
+def generate_retry_report(
+    stats: Stats, samples: Samples, max_retries: int, sample_rate: float = 1.0
+) -> Retries:
+    attempts = samples.column("attempts")
+    retried = attempts > 1
+    retried_latency = (
+        samples.column("latency")[retried] + samples.column("retry_wait")[retried]
+    )
+
+    return Retries(
+        max_retries=max_retries,
+        total_attempts=stats.attempts,
+        retries=stats.retries,
+        amplification=(
+            round(stats.attempts / stats.started_requests, 4)
+            if stats.started_requests > 0
+            else None
+        ),
+        retried_requests=scale_count(int(retried.sum()), sample_rate),
+        retry_exhausted=stats.retry_exhausted,
+        backoff_time=round(stats.backoff_time, 2),
+        avg_retried_latency=(
+            round(float(retried_latency.mean()), 2) if len(retried_latency) else None
+        ),
+    )
+
+
+def generate_batch_report(
+    samples: Samples,
+    duration: float,
+    endpoint: str,
+    batch_size: int,
+    sample_rate: float = 1.0,
+) -> Batch:
+    latency = samples.column("latency") * 1000
+    items = samples.column("items")
+    total_items = scale_count(int(items.sum()), sample_rate)
+    p50, p90, p99 = (
+        np.percentile(latency, (50, 90, 99)) if len(latency) else (None, None, None)
+    )
+
+    return Batch(
+        endpoint=endpoint,
+        batch_size=batch_size,
+        total_items=total_items,
+        items_per_sec=round(total_items / duration, 2) if duration > 0 else 0.0,
+        input_tokens_per_sec=(
+            round(
+                int(samples.column("prompt_tokens").sum()) / sample_rate / duration, 2
+            )
+            if duration > 0
+            else 0.0
+        ),
+        avg_batch_latency=round(float(latency.mean()), 2) if len(latency) else None,
+        p50_batch_latency=round(float(p50), 2) if p50 is not None else None,
+        p90_batch_latency=round(float(p90), 2) if p90 is not None else None,
+        p99_batch_latency=round(float(p99), 2) if p99 is not None else None,
+        avg_item_latency=(
+            round(float((latency / np.maximum(items, 1)).mean()), 2)
+            if len(latency)
+            else None
+        ),
+    )
+
+
+def generate_server_metrics_report(
+    server_samples: list[ServerMetricsSample],
+) -> ServerMetrics:
+    def series(name: str) -> np.ndarray:
+        values = [getattr(sample, name) for sample in server_samples]
+        return np.asarray([v for v in values if v is not None], dtype=np.float64)
+
+    preemptions = series("preemptions")
+    kv_cache_usage = series("kv_cache_usage") * 100
+    running, waiting, swapped = series("running"), series("waiting"), series("swapped")
+
+    return ServerMetrics(
+        num_scrapes=len(server_samples),
+        preemptions=(
+            int(preemptions[-1] - preemptions[0]) if len(preemptions) else None
+        ),
+        avg_kv_cache_usage=(
+            round(float(kv_cache_usage.mean()), 2) if len(kv_cache_usage) else None
+        ),
+        max_kv_cache_usage=(
+            round(float(kv_cache_usage.max()), 2) if len(kv_cache_usage) else None
+        ),
+        max_running=int(running.max()) if len(running) else None,
+        max_waiting=int(waiting.max()) if len(waiting) else None,
+        max_swapped=int(swapped.max()) if len(swapped) else None,
+    )
+
+
+def generate_structured_output_report(
+    samples: Samples,
+    kind: Literal["json_schema", "tools"],
+    schema_names: list[str],
+    sample_rate: float = 1.0,
+) -> StructuredOutput:
+    schema = samples.column("schema")
+    ttft = samples.column("ttft") * 1000
+    start_time = samples.column("start_time")
+    end_time = start_time + samples.column("latency")
+
+    schemas: list[SchemaLatency] = list()
+    steady = np.zeros(len(schema), dtype=bool)
+    for index, name in enumerate(schema_names):
+        requests = np.flatnonzero(schema == index)
+        if len(requests) == 0:
+            schemas.append(
+                SchemaLatency(
+                    schema=index,
+                    name=name,
+                    requests=0,
+                    first_ttft=None,
+                    steady_requests=0,
+                    avg_steady_ttft=None,
+                    p50_steady_ttft=None,
+                    compile_overhead=None,
+                )
+            )
+            continue
+
+        first = requests[np.argmin(start_time[requests])]
+        cached = requests[start_time[requests] >= end_time[first]]
+        steady[cached] = True
+        first_ttft = float(ttft[first])
+        p50_steady_ttft = (
+            float(np.percentile(ttft[cached], 50)) if len(cached) > 0 else None
+        )
+        schemas.append(
+            SchemaLatency(
+                schema=index,
+                name=name,
+                requests=scale_count(len(requests), sample_rate),
+                first_ttft=round(first_ttft, 2),
+                steady_requests=scale_count(len(cached), sample_rate),
+                avg_steady_ttft=(
+                    round(float(ttft[cached].mean()), 2) if len(cached) > 0 else None
+                ),
+                p50_steady_ttft=(
+                    round(p50_steady_ttft, 2) if p50_steady_ttft is not None else None
+                ),
+                compile_overhead=(
+                    round(first_ttft - p50_steady_ttft, 2)
+                    if p50_steady_ttft is not None
+                    else None
+                ),
+            )
+        )
+
+    first_ttft = [item.first_ttft for item in schemas if item.first_ttft is not None]
+    overhead = [
+        item.compile_overhead for item in schemas if item.compile_overhead is not None
+    ]
+    steady_ttft = ttft[steady]
+    return StructuredOutput(
+        kind=kind,
+        num_schemas=len(schema_names),
+        avg_first_ttft=round(float(np.mean(first_ttft)), 2) if first_ttft else None,
+        avg_steady_ttft=(
+            round(float(steady_ttft.mean()), 2) if len(steady_ttft) > 0 else None
+        ),
+        p50_steady_ttft=(
+            round(float(np.percentile(steady_ttft, 50)), 2)
+            if len(steady_ttft) > 0
+            else None
+        ),
+        p99_steady_ttft=(
+            round(float(np.percentile(steady_ttft, 99)), 2)
+            if len(steady_ttft) > 0
+            else None
+        ),
+        avg_compile_overhead=round(float(np.mean(overhead)), 2) if overhead else None,
+        schemas=schemas,
+    )
+
+
+def generate_client_overhead_report(
+    samples: Samples,
+    client_samples: list[ClientResourceSample],
+    max_loop_lag: float,
+    max_cpu_percent: float = 90.0,
+) -> ClientOverhead:
+    loop_lag = np.asarray([s.loop_lag for s in client_samples], dtype=np.float64) * 1000
+    cpu_percent = np.asarray([s.cpu_percent for s in client_samples], dtype=np.float64)
+    rss = np.asarray([s.rss for s in client_samples], dtype=np.float64)
+    queue_time = samples.column("queue_time")
+    wire_time = samples.column("latency")
+
+    p99_loop_lag = float(np.percentile(loop_lag, 99)) if len(loop_lag) else None
+    avg_cpu_percent = float(cpu_percent.mean()) if len(cpu_percent) else None
+
+    # The event loop runs on one core, so a loop near 100% CPU or waking up
+    # late inflates every client-side timestamp
+    warnings: list[str] = list()
+    if p99_loop_lag is not None and p99_loop_lag > max_loop_lag:
+        warnings.append(
+            f"p99 event-loop lag {p99_loop_lag:.2f} ms exceeds {max_loop_lag} ms, "
+            "client-side TTFT/latency include client scheduling delay"
+        )
+    if avg_cpu_percent is not None and avg_cpu_percent > max_cpu_percent:
+        warnings.append(
+            f"client CPU averaged {avg_cpu_percent:.1f}% of a core, "
+            "the client is likely the bottleneck"
+        )
+
+    total_time = float(queue_time.sum() + wire_time.sum())
+
+    return ClientOverhead(
+        avg_loop_lag=round(float(loop_lag.mean()), 2) if len(loop_lag) else None,
+        p99_loop_lag=round(p99_loop_lag, 2) if p99_loop_lag is not None else None,
+        max_loop_lag=round(float(loop_lag.max()), 2) if len(loop_lag) else None,
+        avg_cpu_percent=(
+            round(avg_cpu_percent, 2) if avg_cpu_percent is not None else None
+        ),
+        max_cpu_percent=(
+            round(float(cpu_percent.max()), 2) if len(cpu_percent) else None
+        ),
+        max_rss=round(float(rss.max()), 2) if len(rss) else None,
+        avg_queue_time=(
+            round(float(queue_time.mean()) * 1000, 2) if len(queue_time) else None
+        ),
+        p99_queue_time=(
+            round(float(np.percentile(queue_time, 99)) * 1000, 2)
+            if len(queue_time)
+            else None
+        ),
+        queue_share=(
+            round(float(queue_time.sum()) / total_time, 4) if total_time > 0 else None
+        ),
+        trustworthy=len(warnings) == 0,
+        warnings=warnings,
+    )
+
+
+def generate_confidence_intervals_report(
+    samples: Samples, resamples: int, confidence: float, ci_target: float
+) -> ConfidenceIntervals:
+    columns = {
+        "ttft": samples.column("ttft"),
+        "latency": samples.column("latency"),
+        "token": samples.column("token"),
+    }
+    intervals = bootstrap_confidence_intervals(
+        columns=columns,
+        statistics=sample_statistics,
+        n_resamples=resamples,
+        confidence=confidence,
+    )
+
+    metrics: list[MetricCI] = list()
+    for name, (estimate, ci_low, ci_high) in intervals.items():
+        metrics.append(
+            MetricCI(
+                metric=name,
+                estimate=round(estimate, 2),
+                ci_low=round(ci_low, 2),
+                ci_high=round(ci_high, 2),
+                required_samples=required_sample_size(
+                    n=len(samples.ttft),
+                    estimate=estimate,
+                    ci_low=ci_low,
+                    ci_high=ci_high,
+                    ci_target=ci_target,
+                ),
+            )
+        )
+
+    return ConfidenceIntervals(
+        confidence=confidence,
+        resamples=resamples,
+        ci_target=ci_target,
+        metrics=metrics,
+    )
+
+
+def generate_repeat_summary(
+    reports: list[Report],
+    run_label: str,
+    resamples: int,
+    confidence: float,
+    ci_target: float,
+) -> RepeatSummary:
+    run_values: dict[str, list[float]] = {
+        "Request per second (req/s)": [r.request_per_sec for r in reports],
+        "Throughput token (tok/s)": [r.throughput_token for r in reports],
+    }
+    for report in reports:
+        if report.samples is None or len(report.samples.ttft) == 0:
+            continue
+        columns = {
+            "ttft": report.samples.column("ttft")[np.newaxis, :],
+            "latency": report.samples.column("latency")[np.newaxis, :],
+            "token": report.samples.column("token")[np.newaxis, :],
+        }
+        for name, values in sample_statistics(columns).items():
+            if name.startswith("Throughput"):
+                continue
+            run_values.setdefault(name, list()).append(float(values[0]))
+    if all(r.goodput is not None for r in reports):
+        run_values["Goodput (req/s)"] = [r.goodput.goodput for r in reports]
+
+    metrics: list[RepeatMetric] = list()
+    for name, values in run_values.items():
+        if not values:
+            continue
+        (mean, ci_low, ci_high) = bootstrap_confidence_intervals(
+            columns={"value": np.asarray(values, dtype=np.float64)},
+            statistics=lambda c: {"mean": c["value"].mean(axis=1)},
+            n_resamples=resamples,
+            confidence=confidence,
+        )["mean"]
+        metrics.append(
+            RepeatMetric(
+                metric=name,
+                mean=round(mean, 2),
+                std=round(float(np.std(values, ddof=1)) if len(values) > 1 else 0.0, 2),
+                ci_low=round(ci_low, 2),
+                ci_high=round(ci_high, 2),
+                required_runs=required_sample_size(
+                    n=len(values),
+                    estimate=mean,
+                    ci_low=ci_low,
+                    ci_high=ci_high,
+                    ci_target=ci_target,
+                ),
+                values=[round(value, 2) for value in values],
+            )
+        )
+
+    return RepeatSummary(
+        run_label=run_label,
+        num_runs=len(reports),
+        confidence=confidence,
+        metrics=metrics,
+    )
+
+
+# KV-cache usage (%) from which a step counts as saturated
+KV_CACHE_SATURATION = 95.0
+
+
+def generate_long_context_summary(
+    reports: list[Report], run_label: str, collapse_threshold: float
+) -> LongContextSummary:
+    summary = LongContextSummary(
+        run_label=run_label, collapse_threshold=collapse_threshold
+    )
+    peak_throughput = 0.0
+    previous_ttft = None
+    for report in reports:
+        samples = report.samples
+        num_samples = len(samples.ttft) if samples is not None else 0
+        ttft = samples.column("ttft") * 1000 if num_samples else None
+        avg_input_tokens = (
+            float(samples.column("prompt_tokens").mean()) if num_samples else None
+        )
+        tokens = (
+            float(samples.column("token").sum()) / report.sample_rate
+            if num_samples
+            else 0.0
+        )
+        throughput = tokens / report.duration if report.duration > 0 else 0.0
+        avg_ttft = float(ttft.mean()) if num_samples else None
+        server = report.server_metrics
+
+        failure_share = (
+            report.stats.failed_requests / report.stats.finished_requests
+            if report.stats.finished_requests > 0
+            else 0.0
+        )
+        collapsed = (
+            throughput < (1 - collapse_threshold) * peak_throughput
+            or failure_share > collapse_threshold
+        )
+        peak_throughput = max(peak_throughput, throughput)
+
+        step = ContextStep(
+            run_label=report.run_label,
+            context_len=report.context_len,
+            concurrency=report.num_concurrency,
+            successful_requests=report.stats.successful_requests,
+            failed_requests=report.stats.failed_requests,
+            avg_input_tokens=(
+                round(avg_input_tokens, 2) if avg_input_tokens is not None else None
+            ),
+            avg_ttft=round(avg_ttft, 2) if avg_ttft is not None else None,
+            p99_ttft=(
+                round(float(np.percentile(ttft, 99)), 2) if num_samples else None
+            ),
+            ttft_growth=(
+                round(avg_ttft / previous_ttft, 2)
+                if avg_ttft is not None and previous_ttft
+                else None
+            ),
+            ttft_per_1k_tokens=(
+                round(avg_ttft / avg_input_tokens * 1000, 2)
+                if avg_ttft is not None and avg_input_tokens
+                else None
+            ),
+            throughput=round(throughput, 2),
+            preemptions=server.preemptions if server is not None else None,
+            max_kv_cache_usage=(
+                server.max_kv_cache_usage if server is not None else None
+            ),
+            collapsed=collapsed,
+        )
+        summary.steps.append(step)
+        previous_ttft = avg_ttft if avg_ttft is not None else previous_ttft
+
+        if collapsed and summary.collapse_context_len is None:
+            summary.collapse_context_len = step.context_len
+            summary.collapse_concurrency = step.concurrency
+        if step.preemptions and summary.first_preemption_context_len is None:
+            summary.first_preemption_context_len = step.context_len
+        if (
+            step.max_kv_cache_usage is not None
+            and step.max_kv_cache_usage >= KV_CACHE_SATURATION
+            and summary.kv_saturated_context_len is None
+        ):
+            summary.kv_saturated_context_len = step.context_len
+
+    return summary
+
+
+def build_report_content(data: Report) -> dict:
     report_content = {
         "Model server": data.model_server,
         "Date": data.current_time,
         "Stop reason": data.stop_reason,
         "Run label": data.run_label,
+        "Phase": data.phase,
         "Model": data.model,
         "Completion type": data.completion_type,
         "Limit output tokens": data.max_tokens,
@@ -121,6 +1123,7 @@ async def save_report_as_file(data: Report, save_path: str) -> None:
         "Dataset": data.dataset,
         "Request per second (req/s)": data.request_per_sec,
         "Throughput token (tok/s)": data.throughput_token,
+        "Sample rate": data.sample_rate,
         "Stats": {
             "Started requests": data.stats.started_requests,
             "Finished requests": data.stats.finished_requests,
@@ -129,12 +1132,18 @@ async def save_report_as_file(data: Report, save_path: str) -> None:
             "Timeout requests": data.stats.timeout_requests,
             "Non-200 requests": data.stats.non_200_requests,
             "Cancelled requests": data.stats.cancelled_requests,
+            "Aborted requests": data.stats.aborted_requests,
         },
         "TTFT": {
             "Avg ttft (ms)": data.ttft.avg_ttft,
             "Max ttft (ms)": data.ttft.max_ttft,
             "Min ttft (ms)": data.ttft.min_ttft,
         },
+        "TTFB": {
+            "Avg ttfb (ms)": data.ttfb.avg_ttfb if data.ttfb is not None else None,
+            "Max ttfb (ms)": data.ttfb.max_ttfb if data.ttfb is not None else None,
+            "Min ttfb (ms)": data.ttfb.min_ttfb if data.ttfb is not None else None,
+        },
         "Latency": {
             "Avg latency (s)": data.latency.avg_latency,
             "Max latency (s)": data.latency.max_latency,
@@ -144,6 +1153,8 @@ async def save_report_as_file(data: Report, save_path: str) -> None:
             "Avg token (tok/req)": data.token.avg_token,
             "Max token (tok/req)": data.token.max_token,
             "Min token (tok/req)": data.token.min_token,
+            "Avg input token (tok/req)": data.token.avg_input_token,
+            "Avg output token (tok/req)": data.token.avg_output_token,
         },
     }
 
@@ -164,10 +1175,405 @@ async def save_report_as_file(data: Report, save_path: str) -> None:
         }
         report_content.update(lmcache_report)
 
+    if data.session_turns is not None:
+        session_report = {
+            "Session Turns": [
+                {
+                    "Turn": turn.turn,
+                    "Num requests": turn.num_requests,
+                    "Avg ttft (ms)": turn.avg_ttft,
+                    "Max ttft (ms)": turn.max_ttft,
+                    "Min ttft (ms)": turn.min_ttft,
+                    "Avg prompt tokens (tok/req)": turn.avg_prompt_tokens,
+                }
+                for turn in data.session_turns
+            ]
+        }
+        report_content.update(session_report)
+
+    if data.goodput is not None:
+        goodput_report = {
+            "Goodput": {
+                "SLO ttft (ms)": data.goodput.slo_ttft,
+                "SLO tpot (ms)": data.goodput.slo_tpot,
+                "SLO latency (s)": data.goodput.slo_latency,
+                "Met requests": data.goodput.met_requests,
+                "SLO attainment": data.goodput.attainment,
+                "Goodput (req/s)": data.goodput.goodput,
+                "Windows": [
+                    {
+                        "Start (s)": window.start,
+                        "End (s)": window.end,
+                        "Num requests": window.num_requests,
+                        "Met requests": window.met_requests,
+                        "SLO attainment": window.attainment,
+                        "Goodput (req/s)": window.goodput,
+                    }
+                    for window in data.goodput.windows
+                ],
+                "Scenarios": [
+                    {
+                        "Scenario": scenario.scenario,
+                        "Num requests": scenario.num_requests,
+                        "Met requests": scenario.met_requests,
+                        "SLO attainment": scenario.attainment,
+                    }
+                    for scenario in data.goodput.scenarios
+                ],
+            }
+        }
+        report_content.update(goodput_report)
+
+    if data.adaptive_concurrency is not None:
+        adaptive_report = {
+            "Adaptive Concurrency": {
+                "Target p95 ttft (ms)": data.adaptive_concurrency.target_ttft,
+                "Final concurrency": data.adaptive_concurrency.final_concurrency,
+                "Equilibrium concurrency": data.adaptive_concurrency.equilibrium_concurrency,
+                "Equilibrium throughput (req/s)": data.adaptive_concurrency.equilibrium_throughput,
+                "Trajectory": [
+                    {
+                        "Time (s)": step.time,
+                        "Concurrency": step.concurrency,
+                        "P95 ttft (ms)": step.p95_ttft,
+                        "Throughput (req/s)": step.throughput,
+                    }
+                    for step in data.adaptive_concurrency.trajectory
+                ],
+            }
+        }
+        report_content.update(adaptive_report)
+
+    if data.confidence_intervals is not None:
+        ci_report = {
+            "Confidence Intervals": {
+                "Confidence": data.confidence_intervals.confidence,
+                "Resamples": data.confidence_intervals.resamples,
+                "CI target": data.confidence_intervals.ci_target,
+                "Metrics": [
+                    {
+                        "Metric": metric.metric,
+                        "Estimate": metric.estimate,
+                        "CI low": metric.ci_low,
+                        "CI high": metric.ci_high,
+                        "Required requests": metric.required_samples,
+                    }
+                    for metric in data.confidence_intervals.metrics
+                ],
+            }
+        }
+        report_content.update(ci_report)
+
+    if data.length_analysis is not None:
+        latency_model = data.length_analysis.latency_model
+        length_report = {
+            "Length Analysis": {
+                "Latency model": (
+                    {
+                        "Intercept (ms)": latency_model.intercept,
+                        "Per input token (ms/tok)": latency_model.per_input_token,
+                        "Per output token (ms/tok)": latency_model.per_output_token,
+                        "R squared": latency_model.r_squared,
+                        "Num requests": latency_model.num_requests,
+                    }
+                    if latency_model is not None
+                    else None
+                ),
+                "Buckets": [
+                    {
+                        "Input tokens": bucket.input_tokens,
+                        "Output tokens": bucket.output_tokens,
+                        "Num requests": bucket.num_requests,
+                        "P50 ttft (ms)": bucket.p50_ttft,
+                        "P90 ttft (ms)": bucket.p90_ttft,
+                        "P99 ttft (ms)": bucket.p99_ttft,
+                        "P50 tpot (ms)": bucket.p50_tpot,
+                        "P90 tpot (ms)": bucket.p90_tpot,
+                        "P99 tpot (ms)": bucket.p99_tpot,
+                        "P50 latency (s)": bucket.p50_latency,
+                        "P90 latency (s)": bucket.p90_latency,
+                        "P99 latency (s)": bucket.p99_latency,
+                    }
+                    for bucket in data.length_analysis.buckets
+                ],
+            }
+        }
+        report_content.update(length_report)
+
+    if data.abort_storm is not None:
+        abort_report = {
+            "Abort Storm": {
+                "Abort fraction": data.abort_storm.abort_fraction,
+                "Aborted requests": data.abort_storm.aborted_requests,
+                "Avg abort tokens (tok/req)": data.abort_storm.avg_abort_tokens,
+                "Avg abort time (s)": data.abort_storm.avg_abort_time,
+                "Pre-storm throughput (req/s)": data.abort_storm.pre_storm_throughput,
+                "Post-storm throughput (req/s)": data.abort_storm.post_storm_throughput,
+                "Capacity ratio": data.abort_storm.capacity_ratio,
+                "Recovery time (s)": data.abort_storm.recovery_time,
+                "Capacity leak": data.abort_storm.capacity_leak,
+                "Windows": [
+                    {
+                        "Start (s)": window.start,
+                        "End (s)": window.end,
+                        "Completed requests": window.completed_requests,
+                        "Aborted requests": window.aborted_requests,
+                        "Throughput (req/s)": window.throughput,
+                        "Throughput token (tok/s)": window.throughput_token,
+                        "P50 ttft (ms)": window.p50_ttft,
+                        "P50 tpot (ms)": window.p50_tpot,
+                    }
+                    for window in data.abort_storm.windows
+                ],
+            }
+        }
+        report_content.update(abort_report)
+
+    if data.errors is not None:
+        error_report = {
+            "Errors": [
+                {
+                    "Error class": error.error_class,
+                    "Count": error.count,
+                    "Avg latency (ms)": error.avg_latency,
+                    "P50 latency (ms)": error.p50_latency,
+                    "P99 latency (ms)": error.p99_latency,
+                    "Max latency (ms)": error.max_latency,
+                    "Histogram": [
+                        {
+                            "Le (ms)": histogram_bin.le
+                            if histogram_bin.le is not None
+                            else "inf",
+                            "Count": histogram_bin.count,
+                        }
+                        for histogram_bin in error.histogram
+                    ],
+                }
+                for error in data.errors
+            ]
+        }
+        report_content.update(error_report)
+
+    if data.retries is not None:
+        retry_report = {
+            "Retries": {
+                "Max retries": data.retries.max_retries,
+                "Total attempts": data.retries.total_attempts,
+                "Retries": data.retries.retries,
+                "Retry amplification": data.retries.amplification,
+                "Retried requests": data.retries.retried_requests,
+                "Retry exhausted requests": data.retries.retry_exhausted,
+                "Backoff time (s)": data.retries.backoff_time,
+                "Avg retried latency (s)": data.retries.avg_retried_latency,
+            }
+        }
+        report_content.update(retry_report)
+
+    if data.batch is not None:
+        batch_report = {
+            "Batch": {
+                "Endpoint": data.batch.endpoint,
+                "Batch size": data.batch.batch_size,
+                "Total items": data.batch.total_items,
+                "Items per second (item/s)": data.batch.items_per_sec,
+                "Input tokens per second (tok/s)": data.batch.input_tokens_per_sec,
+                "Avg batch latency (ms)": data.batch.avg_batch_latency,
+                "P50 batch latency (ms)": data.batch.p50_batch_latency,
+                "P90 batch latency (ms)": data.batch.p90_batch_latency,
+                "P99 batch latency (ms)": data.batch.p99_batch_latency,
+                "Avg item latency (ms)": data.batch.avg_item_latency,
+            }
+        }
+        report_content.update(batch_report)
+
+    if data.server_metrics is not None:
+        server_report = {
+            "Server Metrics": {
+                "Num scrapes": data.server_metrics.num_scrapes,
+                "Preemptions": data.server_metrics.preemptions,
+                "Avg KV cache usage (%)": data.server_metrics.avg_kv_cache_usage,
+                "Max KV cache usage (%)": data.server_metrics.max_kv_cache_usage,
+                "Max running requests": data.server_metrics.max_running,
+                "Max waiting requests": data.server_metrics.max_waiting,
+                "Max swapped requests": data.server_metrics.max_swapped,
+            }
+        }
+        report_content.update(server_report)
+
+    if data.structured_output is not None:
+        structured_report = {
+            "Structured Output": {
+                "Kind": data.structured_output.kind,
+                "Number of schemas": data.structured_output.num_schemas,
+                "Avg first ttft (ms)": data.structured_output.avg_first_ttft,
+                "Avg steady ttft (ms)": data.structured_output.avg_steady_ttft,
+                "P50 steady ttft (ms)": data.structured_output.p50_steady_ttft,
+                "P99 steady ttft (ms)": data.structured_output.p99_steady_ttft,
+                "Avg compile overhead (ms)": data.structured_output.avg_compile_overhead,
+                "Schemas": [
+                    {
+                        "Schema": schema.schema,
+                        "Name": schema.name,
+                        "Requests": schema.requests,
+                        "First ttft (ms)": schema.first_ttft,
+                        "Steady requests": schema.steady_requests,
+                        "Avg steady ttft (ms)": schema.avg_steady_ttft,
+                        "P50 steady ttft (ms)": schema.p50_steady_ttft,
+                        "Compile overhead (ms)": schema.compile_overhead,
+                    }
+                    for schema in data.structured_output.schemas
+                ],
+            }
+        }
+        report_content.update(structured_report)
+
+    if data.client_overhead is not None:
+        client_report = {
+            "Client Overhead": {
+                "Trustworthy": data.client_overhead.trustworthy,
+                "Warnings": data.client_overhead.warnings,
+                "Avg loop lag (ms)": data.client_overhead.avg_loop_lag,
+                "P99 loop lag (ms)": data.client_overhead.p99_loop_lag,
+                "Max loop lag (ms)": data.client_overhead.max_loop_lag,
+                "Avg CPU (%)": data.client_overhead.avg_cpu_percent,
+                "Max CPU (%)": data.client_overhead.max_cpu_percent,
+                "Max RSS (MB)": data.client_overhead.max_rss,
+                "Avg queue time (ms)": data.client_overhead.avg_queue_time,
+                "P99 queue time (ms)": data.client_overhead.p99_queue_time,
+                "Queue share": data.client_overhead.queue_share,
+            }
+        }
+        report_content.update(client_report)
+
+    if data.profile is not None:
+        profile_report = {
+            "Profile": {
+                "Streamed tokens": data.profile.streamed_tokens,
+                "Spans": [
+                    {
+                        "Name": span.name,
+                        "Count": span.count,
+                        "Total time (ms)": span.total_time,
+                        "Avg time (us)": span.avg_time,
+                        "Time per token (us)": span.per_token,
+                    }
+                    for span in data.profile.spans
+                ],
+            }
+        }
+        report_content.update(profile_report)
+
+    return report_content
+
+
+async def save_report_as_file(data: Report, save_path: str) -> None:
+    report_content = build_report_content(data=data)
+
+    Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+    async with await open_file(save_path, "wb") as f:
+        await f.write(orjson.dumps(report_content, option=REPORT_JSON_OPTIONS))
+
+
+async def save_long_context_summary_as_file(
+    data: LongContextSummary, save_path: str
+) -> None:
+    summary_content = {
+        "Run label": data.run_label,
+        "Collapse threshold": data.collapse_threshold,
+        "Collapse context length (tok)": data.collapse_context_len,
+        "Collapse concurrency": data.collapse_concurrency,
+        "First preemption context length (tok)": data.first_preemption_context_len,
+        "KV cache saturated context length (tok)": data.kv_saturated_context_len,
+        "Steps": [
+            {
+                "Run label": step.run_label,
+                "Context length (tok)": step.context_len,
+                "Concurrency": step.concurrency,
+                "Successful requests": step.successful_requests,
+                "Failed requests": step.failed_requests,
+                "Avg input tokens (tok/req)": step.avg_input_tokens,
+                "Avg ttft (ms)": step.avg_ttft,
+                "P99 ttft (ms)": step.p99_ttft,
+                "Ttft growth": step.ttft_growth,
+                "Ttft per 1k input tokens (ms)": step.ttft_per_1k_tokens,
+                "Throughput token (tok/s)": step.throughput,
+                "Preemptions": step.preemptions,
+                "Max KV cache usage (%)": step.max_kv_cache_usage,
+                "Collapsed": step.collapsed,
+            }
+            for step in data.steps
+        ],
+    }
+
     Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-    async with await open_file(save_path, "w") as f:
-        encode_data = json.dumps(report_content, indent=2, ensure_ascii=True)
-        await f.write(encode_data)
+    async with await open_file(save_path, "wb") as f:
+        await f.write(orjson.dumps(summary_content, option=REPORT_JSON_OPTIONS))
+
+
+async def save_repeat_summary_as_file(data: RepeatSummary, save_path: str) -> None:
+    summary_content = {
+        "Run label": data.run_label,
+        "Number of runs": data.num_runs,
+        "Confidence": data.confidence,
+        "Metrics": [
+            {
+                "Metric": metric.metric,
+                "Mean": metric.mean,
+                "Std": metric.std,
+                "CI low": metric.ci_low,
+                "CI high": metric.ci_high,
+                "Required runs": metric.required_runs,
+                "Values": metric.values,
+            }
+            for metric in data.metrics
+        ],
+    }
+
+    Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+    async with await open_file(save_path, "wb") as f:
+        await f.write(orjson.dumps(summary_content, option=REPORT_JSON_OPTIONS))
+
+
+def show_repeat_summary(summary: RepeatSummary) -> None:
+    summary_content = f"""
+***** 🔁 REPEAT SUMMARY ({summary.run_label}, {summary.num_runs} runs, {int(summary.confidence * 100)}% CI) *****
+"""
+    for metric in summary.metrics:
+        summary_content += (
+            f"{metric.metric}: {metric.mean} ± {metric.std} "
+            f"[{metric.ci_low}, {metric.ci_high}], required runs {metric.required_runs}\n"
+        )
+
+    print(summary_content)
+
+
+def show_long_context_summary(summary: LongContextSummary) -> None:
+    summary_content = f"""
+***** 📏 LONG CONTEXT SUMMARY ({summary.run_label}, {len(summary.steps)} steps) *****
+"""
+    for step in summary.steps:
+        summary_content += (
+            f"{step.context_len} tok x {step.concurrency}: avg ttft (ms) {step.avg_ttft}"
+            f"{f' (x{step.ttft_growth})' if step.ttft_growth is not None else ''}"
+            f", throughput (tok/s) {step.throughput}, "
+            f"preemptions {step.preemptions}, max KV cache (%) {step.max_kv_cache_usage}"
+            f"{', collapsed' if step.collapsed else ''}\n"
+        )
+    if summary.collapse_context_len is not None:
+        summary_content += (
+            f"💥 Throughput collapses at {summary.collapse_context_len} tokens "
+            f"x {summary.collapse_concurrency} concurrency\n"
+        )
+    if summary.first_preemption_context_len is not None:
+        summary_content += (
+            f"First preemption at {summary.first_preemption_context_len} tokens\n"
+        )
+    if summary.kv_saturated_context_len is not None:
+        summary_content += (
+            f"KV cache saturated at {summary.kv_saturated_context_len} tokens\n"
+        )
+
+    print(summary_content)
 
 
 def show_report(report: Report) -> None:
@@ -177,6 +1583,7 @@ Model server: {report.model_server}
 Date: {report.current_time}
 Stop reason: {report.stop_reason}
 Run label: {report.run_label}
+Phase: {report.phase}
 Model: {report.model}
 Limit output tokens: {report.max_tokens}
 Num concurrency: {report.num_concurrency}
@@ -184,12 +1591,18 @@ Duration time (s): {report.total_duration_time}
 Dataset: {report.dataset}
 Request per second (req/s): {report.request_per_sec}
 Throughput token (tok/s): {report.throughput_token}
+Sample rate: {report.sample_rate}
 
 ***** TIME TO FIRST TOKEN *****
 Avg ttft (ms): {report.ttft.avg_ttft}
 Max ttft (ms): {report.ttft.max_ttft}
 Min ttft (ms): {report.ttft.min_ttft}
 
+***** TIME TO FIRST BYTE *****
+Avg ttfb (ms): {report.ttfb.avg_ttfb if report.ttfb is not None else None}
+Max ttfb (ms): {report.ttfb.max_ttfb if report.ttfb is not None else None}
+Min ttfb (ms): {report.ttfb.min_ttfb if report.ttfb is not None else None}
+
 ***** LATENCY *****
 Avg latency (ms): {report.latency.avg_latency}
 Max latency (ms): {report.latency.max_latency}
@@ -199,6 +1612,8 @@ Min latency (ms): {report.latency.min_latency}
 Avg token (tok/req): {report.token.avg_token}
 Max token (tok/req): {report.token.max_token}
 Min token (tok/req): {report.token.min_token}
+Avg input token (tok/req): {report.token.avg_input_token}
+Avg output token (tok/req): {report.token.avg_output_token}
                     """
 
     if report.lmcache_metrics is not None:
@@ -211,4 +1626,154 @@ Evict ratio: {report.lmcache_metrics.evict_ratio}
     """
         report_content += lmcache_report
 
+    if report.session_turns is not None:
+        session_report = "\n***** SESSION TURNS *****\n"
+        for turn in report.session_turns:
+            session_report += (
+                f"Turn {turn.turn}: num requests {turn.num_requests}, "
+                f"avg ttft (ms) {turn.avg_ttft}, "
+                f"avg prompt tokens {turn.avg_prompt_tokens}\n"
+            )
+        report_content += session_report
+
+    if report.goodput is not None:
+        goodput_report = f"""
+***** GOODPUT *****
+SLO ttft (ms): {report.goodput.slo_ttft}
+SLO tpot (ms): {report.goodput.slo_tpot}
+SLO latency (s): {report.goodput.slo_latency}
+Met requests: {report.goodput.met_requests}
+SLO attainment: {report.goodput.attainment}
+Goodput (req/s): {report.goodput.goodput}
+    """
+        report_content += goodput_report
+
+    if report.adaptive_concurrency is not None:
+        adaptive_report = f"""
+***** ADAPTIVE CONCURRENCY *****
+Target p95 ttft (ms): {report.adaptive_concurrency.target_ttft}
+Final concurrency: {report.adaptive_concurrency.final_concurrency}
+Equilibrium concurrency: {report.adaptive_concurrency.equilibrium_concurrency}
+Equilibrium throughput (req/s): {report.adaptive_concurrency.equilibrium_throughput}
+    """
+        report_content += adaptive_report
+
+    if report.confidence_intervals is not None:
+        ci_report = f"\n***** CONFIDENCE INTERVALS ({int(report.confidence_intervals.confidence * 100)}%) *****\n"
+        for metric in report.confidence_intervals.metrics:
+            ci_report += (
+                f"{metric.metric}: {metric.estimate} "
+                f"[{metric.ci_low}, {metric.ci_high}], "
+                f"required requests {metric.required_samples}\n"
+            )
+        report_content += ci_report
+
+    if report.length_analysis is not None:
+        length_report = "\n***** LENGTH ANALYSIS *****\n"
+        latency_model = report.length_analysis.latency_model
+        if latency_model is not None:
+            length_report += (
+                f"Latency model (ms): {latency_model.intercept} "
+                f"+ {latency_model.per_input_token}·in "
+                f"+ {latency_model.per_output_token}·out "
+                f"(R² {latency_model.r_squared})\n"
+            )
+        for bucket in report.length_analysis.buckets:
+            length_report += (
+                f"in {bucket.input_tokens} / out {bucket.output_tokens}: "
+                f"n {bucket.num_requests}, p50 ttft (ms) {bucket.p50_ttft}, "
+                f"p50 tpot (ms) {bucket.p50_tpot}, p50 latency (s) {bucket.p50_latency}\n"
+            )
+        report_content += length_report
+
+    if report.abort_storm is not None:
+        abort_report = f"""
+***** ABORT STORM *****
+Abort fraction: {report.abort_storm.abort_fraction}
+Aborted requests: {report.abort_storm.aborted_requests}
+Avg abort tokens (tok/req): {report.abort_storm.avg_abort_tokens}
+Pre-storm throughput (req/s): {report.abort_storm.pre_storm_throughput}
+Post-storm throughput (req/s): {report.abort_storm.post_storm_throughput}
+Recovery time (s): {report.abort_storm.recovery_time}
+Capacity leak: {report.abort_storm.capacity_leak}
+    """
+        report_content += abort_report
+
+    if report.errors is not None:
+        error_report = """
+***** ERRORS *****
+"""
+        for error in report.errors:
+            error_report += (
+                f"{error.error_class}: {error.count} attempts, "
+                f"avg latency (ms) {error.avg_latency}, "
+                f"p50 (ms) {error.p50_latency}, p99 (ms) {error.p99_latency}\n"
+            )
+        report_content += error_report
+
+    if report.retries is not None:
+        retry_report = f"""
+***** RETRIES *****
+Total attempts: {report.retries.total_attempts}
+Retries: {report.retries.retries}
+Retry amplification: {report.retries.amplification}
+Retried requests: {report.retries.retried_requests}
+Retry exhausted requests: {report.retries.retry_exhausted}
+Avg retried latency (s): {report.retries.avg_retried_latency}
+    """
+        report_content += retry_report
+
+    if report.batch is not None:
+        batch_report = f"""
+***** BATCH ({report.batch.endpoint}, batch size {report.batch.batch_size}) *****
+Items per second (item/s): {report.batch.items_per_sec}
+Input tokens per second (tok/s): {report.batch.input_tokens_per_sec}
+Avg batch latency (ms): {report.batch.avg_batch_latency}
+P99 batch latency (ms): {report.batch.p99_batch_latency}
+Avg item latency (ms): {report.batch.avg_item_latency}
+    """
+        report_content += batch_report
+
+    if report.server_metrics is not None:
+        server_report = f"""
+***** SERVER METRICS *****
+Preemptions: {report.server_metrics.preemptions}
+Max KV cache usage (%): {report.server_metrics.max_kv_cache_usage}
+Max waiting requests: {report.server_metrics.max_waiting}
+    """
+        report_content += server_report
+
+    if report.structured_output is not None:
+        structured_report = f"""
+***** STRUCTURED OUTPUT ({report.structured_output.kind}, {report.structured_output.num_schemas} schemas) *****
+Avg first ttft (ms): {report.structured_output.avg_first_ttft}
+Avg steady ttft (ms): {report.structured_output.avg_steady_ttft}
+P99 steady ttft (ms): {report.structured_output.p99_steady_ttft}
+Avg compile overhead (ms): {report.structured_output.avg_compile_overhead}
+    """
+        report_content += structured_report
+
+    if report.client_overhead is not None:
+        client_report = f"""
+***** CLIENT OVERHEAD *****
+P99 loop lag (ms): {report.client_overhead.p99_loop_lag}
+Avg CPU (%): {report.client_overhead.avg_cpu_percent}
+Max RSS (MB): {report.client_overhead.max_rss}
+Avg queue time (ms): {report.client_overhead.avg_queue_time}
+    """
+        for warning in report.client_overhead.warnings:
+            client_report += f"\n⚠️  Untrustworthy run: {warning}"
+        report_content += client_report
+
+    if report.profile is not None:
+        profile_report = """
+***** PROFILE *****
+"""
+        for span in report.profile.spans:
+            profile_report += (
+                f"{span.name}: {span.count} calls, total (ms) {span.total_time}, "
+                f"avg (us) {span.avg_time}, per token (us) {span.per_token}\n"
+            )
+        report_content += profile_report
+
     print(report_content)
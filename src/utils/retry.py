@@ -0,0 +1,102 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from type.request import RequestFailure, RetryPolicy
+
+
+def parse_retry_on(spec: str) -> frozenset[str]:
+    # "429,503,timeout" -> {"http_429", "http_503", "timeout"}
+    retry_on = set()
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        retry_on.add(f"http_{item}" if item.isdigit() else item)
+
+    return frozenset(retry_on)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    # Retry-After is either delay-seconds or an HTTP-date
+    if value is None:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def classify_failure(error: Exception) -> RequestFailure:
+    if isinstance(error, httpx.ConnectTimeout):
+        return RequestFailure(
+            error_class="connect_timeout",
+            message="Request failed: ConnectTimeout (DNS/TCP/TLS handshake)",
+            timeout=True,
+        )
+    if isinstance(error, httpx.WriteTimeout):
+        return RequestFailure(
+            error_class="write_timeout",
+            message="Request failed: WriteTimeout (likely while sending the request body)",
+            timeout=True,
+        )
+    if isinstance(error, httpx.PoolTimeout):
+        return RequestFailure(
+            error_class="pool_timeout",
+            message="Request failed: PoolTimeout (no available connection in pool)",
+            timeout=True,
+        )
+    if isinstance(error, asyncio.TimeoutError):
+        return RequestFailure(
+            error_class="timeout",
+            message="Request failed: TimeoutError (overall request timeout exceeded)",
+            timeout=True,
+        )
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return RequestFailure(
+            error_class=f"http_{status_code}",
+            message=f"Request failed: HTTPStatusError (status code: {status_code}, mes: {error})",
+            non_200=True,
+            retry_after=parse_retry_after(error.response.headers.get("retry-after")),
+        )
+    if isinstance(error, httpx.ConnectError):
+        return RequestFailure(
+            error_class="connect_error",
+            message=f"Request failed: ConnectError ({error})",
+        )
+    return RequestFailure(error_class="error", message=str(error))
+
+
+def should_retry(policy: RetryPolicy, failure: RequestFailure, attempt: int) -> bool:
+    return attempt <= policy.max_retries and failure.error_class in policy.retry_on
+
+
+def retry_delay(
+    policy: RetryPolicy, failure: RequestFailure, attempt: int, rng: random.Random
+) -> float:
+    # The server's Retry-After wins over the client's own backoff
+    if policy.respect_retry_after and failure.retry_after is not None:
+        return min(failure.retry_after, policy.max_delay)
+
+    if policy.backoff == "exponential":
+        delay = min(policy.max_delay, policy.base_delay * 2 ** (attempt - 1))
+    else:
+        delay = min(policy.max_delay, policy.base_delay)
+
+    if policy.jitter == "full":
+        return rng.uniform(0, delay)
+    if policy.jitter == "equal":
+        return delay / 2 + rng.uniform(0, delay / 2)
+    return delay
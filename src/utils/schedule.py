@@ -0,0 +1,131 @@
+import os
+import random
+from dataclasses import asdict
+from pathlib import Path
+
+import orjson
+from anyio import open_file
+
+from type.request import RequestSpec
+from type.run_args import Args
+from utils.datasets import synthesize_prompt
+
+
+def phase_seed(seed: int | None, label: str) -> str | None:
+    # One stream per phase label, so adding a phase leaves the others intact
+    return f"{seed}:{label}" if seed is not None else None
+
+
+class RequestScheduler:
+    """Hands out the requests of one phase in issue order.
+
+    Prompts, arrival times, output lengths and server seeds are drawn from
+    one RNG as each request is issued, so with a fixed seed the i-th request
+    of two runs is the same whatever the response timing. Prompts are taken
+    in order from the start of the dataset, independently of other phases.
+    An imported schedule is replayed as is instead.
+    """
+
+    def __init__(
+        self,
+        args: Args,
+        prompts: list[str],
+        seed: str | None = None,
+        tokens_per_word: float = 1.0,
+        specs: list[RequestSpec] | None = None,
+        record: bool = False,
+        num_schemas: int = 0,
+    ) -> None:
+        self.args = args
+        self.prompts = prompts
+        self.rng = random.Random(seed)
+        self.tokens_per_word = tokens_per_word
+        self.imported = specs
+        self.specs: list[RequestSpec] | None = list() if record else None
+        self.num_schemas = num_schemas
+        self._index = 0
+        self._prompt_index = 0
+        self._arrival = 0.0
+
+    @property
+    def open_loop(self) -> bool:
+        # Imported schedules keep their arrival times
+        if self.imported is not None:
+            return any(spec.arrival > 0 for spec in self.imported)
+        return self.args.request_rate > 0
+
+    def _next_prompt(self) -> str:
+        prompt = self.prompts[self._prompt_index % len(self.prompts)]
+        self._prompt_index += 1
+        return prompt
+
+    def _draw(self) -> RequestSpec:
+        if self.args.context_len > 0:
+            prompt = synthesize_prompt(
+                num_tokens=self.args.context_len,
+                rng=self.rng,
+                tokens_per_word=self.tokens_per_word,
+            )
+        elif self.args.batch_size == 1:
+            prompt = self._next_prompt()
+        else:
+            prompt = [self._next_prompt() for _ in range(self.args.batch_size)]
+
+        if self.args.request_rate > 0:
+            # Poisson arrivals
+            self._arrival += self.rng.expovariate(self.args.request_rate)
+        max_tokens = (
+            self.rng.randint(self.args.min_output_tokens, self.args.max_tokens)
+            if self.args.min_output_tokens > 0
+            else self.args.max_tokens
+        )
+        return RequestSpec(
+            index=self._index,
+            arrival=self._arrival,
+            prompt=prompt,
+            max_tokens=max_tokens,
+            seed=self.rng.getrandbits(31) if self.args.seed is not None else None,
+            # Round-robin, so every schema is compiled once and then reused
+            schema=self._index % self.num_schemas if self.num_schemas > 0 else None,
+        )
+
+    def next(self) -> RequestSpec | None:
+        # None once an imported schedule is used up
+        if self.imported is not None:
+            if self._index >= len(self.imported):
+                return None
+            spec = self.imported[self._index]
+        else:
+            spec = self._draw()
+        self._index += 1
+        return spec
+
+    def record(self, spec: RequestSpec) -> None:
+        # Called when the request is sent, open-loop runs draw one ahead
+        if self.specs is not None:
+            self.specs.append(spec)
+
+
+def schedule_path(root: str, name: str) -> str:
+    # <root> is a run directory, whose files start with its <time>
+    return os.path.join(root, f"{os.path.basename(os.path.normpath(root))}_{name}")
+
+
+async def load_schedule(path: str) -> list[RequestSpec]:
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Schedule file {path} not found.")
+
+    async with await open_file(path, "rb") as f:
+        lines = (await f.read()).splitlines()
+    return [RequestSpec(**orjson.loads(line)) for line in lines if line]
+
+
+async def save_schedule(specs: list[RequestSpec], save_path: str) -> None:
+    Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+    async with await open_file(save_path, "wb") as f:
+        await f.write(
+            b"".join(
+                orjson.dumps(asdict(spec)) + b"\n"
+                for spec in sorted(specs, key=lambda spec: spec.index)
+            )
+        )
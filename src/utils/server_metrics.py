@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import httpx
+
+from type.metrics import ServerMetricsSample
+from utils.lmcache import parse_lmcache_metrics_response
+
+# Older vLLM releases use the names after the first one
+SERVER_METRICS = {
+    "preemptions": ("vllm:num_preemptions_total", "vllm:num_preemptions"),
+    "kv_cache_usage": ("vllm:kv_cache_usage_perc", "vllm:gpu_cache_usage_perc"),
+    "running": ("vllm:num_requests_running",),
+    "waiting": ("vllm:num_requests_waiting",),
+    "swapped": ("vllm:num_requests_swapped",),
+}
+
+
+def sum_metric(
+    metrics: dict[str, list[dict[str, dict[str, str] | float]]], names: tuple[str, ...]
+) -> float | None:
+    # Summed over label sets, e.g. one per model or engine
+    for name in names:
+        entries = metrics.get(name)
+        if entries:
+            return float(sum(entry["value"] for entry in entries))
+    return None
+
+
+class ServerMetricsScraper:
+    """Polls the model server's Prometheus endpoint while a phase runs."""
+
+    def __init__(
+        self, aclient: httpx.AsyncClient, base_url: str, interval: float = 1.0
+    ) -> None:
+        self.aclient = aclient
+        self.url = f"{base_url.strip('/')}/metrics"
+        self.interval = interval
+        self.samples: list[ServerMetricsSample] = list()
+        self.available = True
+        self._start_time = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def scrape(self) -> None:
+        if not self.available:
+            return
+        try:
+            response = await self.aclient.get(self.url, timeout=5.0)
+            response.raise_for_status()
+            metrics = parse_lmcache_metrics_response(response.text)
+        except httpx.HTTPError as e:
+            # One warning, a server without /metrics stays without it
+            print(f"\n⚠️  Failed to scrape server metrics from {self.url}: {e}")
+            self.available = False
+            return
+
+        self.samples.append(
+            ServerMetricsSample(
+                time=time.perf_counter() - self._start_time,
+                **{
+                    key: sum_metric(metrics=metrics, names=names)
+                    for key, names in SERVER_METRICS.items()
+                },
+            )
+        )
+
+    async def _run(self) -> None:
+        while True:
+            await self.scrape()
+            await asyncio.sleep(self.interval)
+
+    def start(self, start_time: float) -> None:
+        self._start_time = start_time
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # A last scrape so counters cover the whole phase
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            await self.scrape()
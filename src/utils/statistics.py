@@ -0,0 +1,117 @@
+import math
+from typing import Callable
+
+import numpy as np
+
+# Upper bound of resampled elements materialised at once per column
+BOOTSTRAP_CHUNK_ELEMENTS = 1 << 22
+# Larger runs use m-out-of-n resamples rescaled by sqrt(m / n)
+BOOTSTRAP_MAX_RESAMPLE_SIZE = 100_000
+BOOTSTRAP_SEED = 0
+
+
+def rank_with_ties(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Average ranks (1-based) and the sizes of every tie group
+    order = np.argsort(values, kind="stable")
+    ordered = values[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    tie_sizes = np.diff(np.r_[starts, len(values)])
+    # A group at 0-based position start covers ranks start+1..start+size
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.repeat(starts + (tie_sizes + 1) / 2, tie_sizes)
+
+    return ranks, tie_sizes
+
+
+def mann_whitney_u(baseline: np.ndarray, candidate: np.ndarray) -> tuple[float, float]:
+    """One-sided Mann-Whitney U test that candidate is stochastically greater.
+
+    Uses the normal approximation with tie and continuity correction, which is
+    accurate for the sample sizes a benchmark run produces.
+    Returns (U statistic of candidate, p-value).
+    """
+    n_baseline = len(baseline)
+    n_candidate = len(candidate)
+    if n_baseline == 0 or n_candidate == 0:
+        return 0.0, 1.0
+
+    ranks, tie_sizes = rank_with_ties(
+        np.concatenate([baseline, candidate]).astype(np.float64)
+    )
+    rank_sum_candidate = float(ranks[n_baseline:].sum())
+    u_candidate = rank_sum_candidate - n_candidate * (n_candidate + 1) / 2
+
+    n = n_baseline + n_candidate
+    mean_u = n_baseline * n_candidate / 2
+    tie_sizes = tie_sizes.astype(np.float64)
+    tie_term = float((tie_sizes**3 - tie_sizes).sum()) / (n * (n - 1)) if n > 1 else 0
+    var_u = n_baseline * n_candidate / 12 * ((n + 1) - tie_term)
+    if var_u <= 0:
+        return u_candidate, 1.0
+
+    z = (u_candidate - mean_u - 0.5) / math.sqrt(var_u)
+    p_value = 0.5 * math.erfc(z / math.sqrt(2))
+
+    return u_candidate, p_value
+
+
+def scale_count(count: int | float, sample_rate: float) -> int:
+    # Rows of a uniform sample kept at sample_rate, back to all requests
+    return round(count / sample_rate)
+
+
+def bootstrap_confidence_intervals(
+    columns: dict[str, np.ndarray],
+    statistics: Callable[[dict[str, np.ndarray]], dict[str, np.ndarray]],
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    seed: int = BOOTSTRAP_SEED,
+    max_resample_size: int = BOOTSTRAP_MAX_RESAMPLE_SIZE,
+) -> dict[str, tuple[float, float, float]]:
+    """Percentile bootstrap of several statistics over the same resamples.
+
+    `statistics` receives the columns as 2D arrays (one resample per row) and
+    returns {name: one value per row}, so all work stays vectorized and
+    statistics can share intermediate results. Resamples
+    are drawn in chunks to bound memory, and above max_resample_size the
+    m-out-of-n bootstrap keeps the cost per resample flat with millions of
+    samples. Returns {name: (estimate, ci_low, ci_high)}.
+    """
+    n = len(next(iter(columns.values())))
+    if n == 0:
+        return dict()
+
+    m = min(n, max_resample_size)
+    rng = np.random.default_rng(seed)
+    chunk_size = max(1, min(n_resamples, BOOTSTRAP_CHUNK_ELEMENTS // m))
+    resampled_stats: dict[str, list[np.ndarray]] = dict()
+
+    for chunk_start in range(0, n_resamples, chunk_size):
+        size = min(chunk_size, n_resamples - chunk_start)
+        index = rng.integers(0, n, size=(size, m))
+        resampled = {name: column[index] for name, column in columns.items()}
+        for name, values in statistics(resampled).items():
+            resampled_stats.setdefault(name, list()).append(values)
+
+    alpha = (1 - confidence) / 2
+    scale = math.sqrt(m / n)
+    full = {name: column[np.newaxis, :] for name, column in columns.items()}
+    intervals: dict[str, tuple[float, float, float]] = dict()
+    for name, full_values in statistics(full).items():
+        estimate = float(full_values[0])
+        values = estimate + (np.concatenate(resampled_stats[name]) - estimate) * scale
+        ci_low, ci_high = np.quantile(values, [alpha, 1 - alpha])
+        intervals[name] = (estimate, float(ci_low), float(ci_high))
+
+    return intervals
+
+
+def required_sample_size(
+    n: int, estimate: float, ci_low: float, ci_high: float, ci_target: float
+) -> int | None:
+    # CI half-width shrinks with sqrt(n): n_required = n * (half_width / target)^2
+    target_half_width = abs(estimate) * ci_target
+    if n == 0 or target_half_width == 0:
+        return None
+    half_width = (ci_high - ci_low) / 2
+    return max(1, math.ceil(n * (half_width / target_half_width) ** 2))
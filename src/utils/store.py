@@ -0,0 +1,150 @@
+import sqlite3
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import orjson
+
+from type.report import Report
+from type.run_args import Args
+from utils.reporting import build_report_content
+
+SAMPLE_COLUMNS = ("ttft", "latency", "token", "prompt_tokens", "completion_tokens")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    run_time TEXT NOT NULL,
+    run_label TEXT NOT NULL,
+    tag TEXT,
+    model TEXT NOT NULL,
+    model_server TEXT NOT NULL,
+    stop_reason TEXT NOT NULL,
+    request_per_sec REAL,
+    throughput_token REAL,
+    avg_ttft REAL,
+    avg_latency REAL,
+    config TEXT NOT NULL,
+    report TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_tag ON runs (tag, run_label);
+CREATE INDEX IF NOT EXISTS idx_runs_model ON runs (model, run_time);
+CREATE TABLE IF NOT EXISTS run_samples (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+
+def connect_store(db_path: str) -> sqlite3.Connection:
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def ingest_report(db_path: str, report: Report, args: Args, tag: str | None) -> int:
+    config = asdict(args)
+    # Never persist credentials
+    config["api_key"] = None
+
+    with connect_store(db_path=db_path) as conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO runs (
+                created_at, run_time, run_label, tag, model, model_server,
+                stop_reason, request_per_sec, throughput_token, avg_ttft,
+                avg_latency, config, report
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                datetime.now().isoformat(timespec="seconds"),
+                report.current_time,
+                report.run_label,
+                tag,
+                report.model,
+                report.model_server,
+                report.stop_reason,
+                report.request_per_sec,
+                report.throughput_token,
+                report.ttft.avg_ttft,
+                report.latency.avg_latency,
+                orjson.dumps(config).decode(),
+                orjson.dumps(build_report_content(data=report)).decode(),
+            ),
+        )
+        run_id = cursor.lastrowid
+
+        if report.samples is not None:
+            conn.executemany(
+                "INSERT INTO run_samples (run_id, name, data) VALUES (?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        name,
+                        report.samples.column(name).astype(np.float64).tobytes(),
+                    )
+                    for name in SAMPLE_COLUMNS
+                ],
+            )
+
+    conn.close()
+    return run_id
+
+
+def list_runs(db_path: str, limit: int = 20) -> list[sqlite3.Row]:
+    with connect_store(db_path=db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT id, run_time, run_label, tag, model, stop_reason,
+                   request_per_sec, throughput_token, avg_ttft, avg_latency
+            FROM runs ORDER BY id DESC LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+
+    conn.close()
+    return rows
+
+
+def load_runs(
+    db_path: str,
+    run_id: int | None = None,
+    tag: str | None = None,
+    run_label: str | None = None,
+) -> tuple[list[dict], dict[str, np.ndarray]]:
+    """Load the reports and concatenated samples of one run or of every run with a tag."""
+    query = "SELECT id, report FROM runs WHERE "
+    if run_id is not None:
+        query += "id = ?"
+        params: list = [run_id]
+    else:
+        query += "tag = ?"
+        params = [tag]
+    if run_label is not None:
+        query += " AND run_label = ?"
+        params.append(run_label)
+
+    reports: list[dict] = list()
+    chunks: dict[str, list[np.ndarray]] = {name: list() for name in SAMPLE_COLUMNS}
+    with connect_store(db_path=db_path) as conn:
+        for row in conn.execute(query, params).fetchall():
+            reports.append(orjson.loads(row["report"]))
+            for sample_row in conn.execute(
+                "SELECT name, data FROM run_samples WHERE run_id = ?", (row["id"],)
+            ):
+                chunks.setdefault(sample_row["name"], list()).append(
+                    np.frombuffer(sample_row["data"], dtype=np.float64)
+                )
+
+    conn.close()
+    samples = {
+        name: np.concatenate(values) if values else np.empty(0, dtype=np.float64)
+        for name, values in chunks.items()
+    }
+    return reports, samples
@@ -0,0 +1,57 @@
+import os
+from typing import Literal
+
+import orjson
+from anyio import open_file
+
+from type.request import StructuredOutputSchema
+
+
+async def load_structured_outputs(
+    path: str,
+    kind: Literal["json_schema", "tools"],
+    num_schemas: int = 0,
+    tool_choice: Literal["auto", "required"] = "required",
+) -> list[StructuredOutputSchema]:
+    """Reads a JSON list of schemas, requests rotate through them.
+
+    A json_schema entry is {"name": ..., "schema": {...}} or a bare JSON
+    schema. A tools entry is one tool or a list of tools, each an OpenAI tool
+    or a bare function definition.
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Schema file {path} not found.")
+
+    async with await open_file(path, "rb") as f:
+        entries = orjson.loads(await f.read())
+    if isinstance(entries, dict):
+        entries = [entries]
+    if num_schemas > 0:
+        entries = entries[:num_schemas]
+    if len(entries) == 0:
+        raise RuntimeError(f"Schema file {path} contains no schemas.")
+
+    schemas: list[StructuredOutputSchema] = list()
+    for index, entry in enumerate(entries):
+        if kind == "json_schema":
+            name = entry.get("name") or entry.get("title") or f"schema_{index}"
+            payload = {
+                "response_format": {
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": name,
+                        "schema": entry.get("schema", entry),
+                        "strict": True,
+                    },
+                }
+            }
+        else:
+            tools = [
+                tool if "function" in tool else {"type": "function", "function": tool}
+                for tool in (entry if isinstance(entry, list) else [entry])
+            ]
+            name = ",".join(tool["function"]["name"] for tool in tools)
+            payload = {"tools": tools, "tool_choice": tool_choice}
+        schemas.append(StructuredOutputSchema(name=name, payload=payload))
+
+    return schemas
@@ -0,0 +1,80 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+
+class LocalTokenizer:
+    """HuggingFace tokenizer.json loaded from disk, encoding off the event loop.
+
+    The Rust tokenizer releases the GIL, so a thread pool gives real
+    parallelism without reloading the tokenizer in every worker process.
+    """
+
+    def __init__(self, path: str, max_workers: int = 4) -> None:
+        if Tokenizer is None:
+            raise RuntimeError(
+                "tokenizers is not installed, install it with `pip install .[tokenizer]`."
+            )
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Tokenizer file {path} not found.")
+
+        self.path = path
+        self.tokenizer = Tokenizer.from_file(path)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tokenizer"
+        )
+        # Prompt token counts keyed by text, one entry per dataset prompt
+        self.prompt_cache: dict[str, int] = dict()
+
+    def _count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+    async def count_tokens(self, text: str) -> int:
+        if not text:
+            return 0
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._count_tokens, text)
+
+    def _count_batch_tokens(self, texts: list[str]) -> list[int]:
+        encodings = self.tokenizer.encode_batch(texts, add_special_tokens=False)
+        return [len(encoding.ids) for encoding in encodings]
+
+    async def count_batch_tokens(self, texts: list[str]) -> list[int]:
+        # encode_batch parallelizes across texts inside the Rust tokenizer
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self._count_batch_tokens, texts
+        )
+
+    async def count_prompt_tokens(self, text: str) -> int:
+        if text not in self.prompt_cache:
+            self.prompt_cache[text] = await self.count_tokens(text=text)
+        return self.prompt_cache[text]
+
+    async def count_payload_tokens(self, payload: dict) -> int:
+        # Chat templates are not applied, so chat prompts are counted as the
+        # sum of their message contents
+        if "messages" in payload:
+            counts = await asyncio.gather(
+                *(
+                    self.count_prompt_tokens(text=message.get("content") or "")
+                    for message in payload["messages"]
+                )
+            )
+            return sum(counts)
+        # Batched completions and embeddings carry a list of prompts
+        prompts = payload.get("input", payload.get("prompt")) or ""
+        if isinstance(prompts, list):
+            counts = await asyncio.gather(
+                *(self.count_prompt_tokens(text=text) for text in prompts)
+            )
+            return sum(counts)
+        return await self.count_prompt_tokens(text=prompts)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,283 @@
+import asyncio
+import codecs
+from collections.abc import AsyncIterator, Mapping
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import Literal, Protocol
+from urllib.parse import urlsplit
+
+import httpx
+import orjson
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class StreamResponse(Protocol):
+    status_code: int
+    headers: Mapping[str, str]
+
+    def aiter_lines(self) -> AsyncIterator[str]: ...
+
+    async def aread(self) -> bytes: ...
+
+
+class Transport(Protocol):
+    """Streaming POST used by request_openai_format.
+
+    Connection failures are raised as httpx.ConnectTimeout / httpx.ConnectError
+    whatever the backend, so error classification stays backend independent.
+    """
+
+    def stream(
+        self, url: str, headers: dict, payload: dict
+    ) -> AbstractAsyncContextManager[StreamResponse]: ...
+
+    async def aclose(self) -> None: ...
+
+
+class HttpxTransport:
+    def __init__(self, aclient: httpx.AsyncClient) -> None:
+        self.aclient = aclient
+        self.timeout = httpx.Timeout(connect=10.0, read=None, write=60.0, pool=10.0)
+
+    def stream(
+        self, url: str, headers: dict, payload: dict
+    ) -> AbstractAsyncContextManager[httpx.Response]:
+        return self.aclient.stream(
+            "POST", url=url, headers=headers, json=payload, timeout=self.timeout
+        )
+
+    async def aclose(self) -> None:
+        # The client is owned by the caller
+        return None
+
+
+class AiohttpResponse:
+    def __init__(self, response: "aiohttp.ClientResponse") -> None:
+        self.response = response
+        self.status_code = response.status
+        self.headers = response.headers
+
+    async def aiter_lines(self) -> AsyncIterator[str]:
+        async for line in self.response.content:
+            yield line.decode("utf-8").rstrip("\r\n")
+
+    async def aread(self) -> bytes:
+        return await self.response.read()
+
+
+class AiohttpTransport:
+    def __init__(
+        self, connect_timeout: float = 10.0, max_connections: int = 100
+    ) -> None:
+        if aiohttp is None:
+            raise RuntimeError(
+                "aiohttp is not installed, install it with `pip install .[aiohttp]`."
+            )
+
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max_connections),
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout),
+        )
+
+    @asynccontextmanager
+    async def stream(
+        self, url: str, headers: dict, payload: dict
+    ) -> AsyncIterator[AiohttpResponse]:
+        try:
+            response = await self.session.post(
+                url, data=orjson.dumps(payload), headers=headers
+            )
+        except aiohttp.ConnectionTimeoutError as e:
+            raise httpx.ConnectTimeout(str(e)) from None
+        except aiohttp.ClientConnectorError as e:
+            raise httpx.ConnectError(str(e)) from None
+
+        # Leaving the context before the body is read drops the connection
+        async with response:
+            yield AiohttpResponse(response=response)
+
+    async def aclose(self) -> None:
+        await self.session.close()
+
+
+class RawResponse:
+    """HTTP/1.1 response read straight off an asyncio stream."""
+
+    def __init__(self, reader: asyncio.StreamReader) -> None:
+        self.reader = reader
+        self.status_code = 0
+        self.headers: dict[str, str] = dict()
+        self.chunked = False
+        self.content_length: int | None = None
+        self.keep_alive = False
+        self.complete = False
+
+    async def read_head(self) -> None:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection")
+        self.status_code = int(status_line.split(b" ", 2)[1])
+
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            self.headers[name.strip().lower()] = value.strip()
+
+        self.chunked = "chunked" in self.headers.get("transfer-encoding", "").lower()
+        if "content-length" in self.headers:
+            self.content_length = int(self.headers["content-length"])
+        self.keep_alive = self.headers.get("connection", "").lower() != "close" and (
+            self.chunked or self.content_length is not None
+        )
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        if self.chunked:
+            while True:
+                size = int((await self.reader.readline()).split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers up to the closing empty line
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                data = await self.reader.readexactly(size + 2)
+                yield data[:-2]
+        elif self.content_length is not None:
+            remaining = self.content_length
+            while remaining > 0:
+                data = await self.reader.read(min(remaining, 65536))
+                if not data:
+                    raise ConnectionResetError("Server closed the connection")
+                remaining -= len(data)
+                yield data
+        else:
+            while data := await self.reader.read(65536):
+                yield data
+        self.complete = True
+
+    async def aiter_lines(self) -> AsyncIterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        buffer = ""
+        async for data in self.aiter_bytes():
+            buffer += decoder.decode(data)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+        buffer += decoder.decode(b"", final=True)
+        if buffer:
+            yield buffer.rstrip("\r")
+
+    async def aread(self) -> bytes:
+        return b"".join([data async for data in self.aiter_bytes()])
+
+
+class RawTransport:
+    """Minimal HTTP/1.1 client on asyncio streams with keep-alive pooling.
+
+    Skips everything the benchmark does not need (redirects, cookies,
+    compression, HTTP/2), which keeps per-chunk overhead to a readline.
+    """
+
+    def __init__(
+        self, connect_timeout: float = 10.0, max_connections: int = 100
+    ) -> None:
+        self.connect_timeout = connect_timeout
+        self.connections = asyncio.Semaphore(max_connections)
+        self.idle: dict[
+            tuple[str, int, bool],
+            list[tuple[asyncio.StreamReader, asyncio.StreamWriter]],
+        ] = dict()
+
+    async def _open(
+        self, host: str, port: int, tls: bool
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        try:
+            async with asyncio.timeout(self.connect_timeout):
+                return await asyncio.open_connection(
+                    host, port, ssl=True if tls else None
+                )
+        except TimeoutError as e:
+            raise httpx.ConnectTimeout(f"Connect to {host}:{port} timed out") from e
+        except OSError as e:
+            raise httpx.ConnectError(str(e)) from None
+
+    @asynccontextmanager
+    async def stream(
+        self, url: str, headers: dict, payload: dict
+    ) -> AsyncIterator[RawResponse]:
+        split = urlsplit(url)
+        tls = split.scheme == "https"
+        host = split.hostname or ""
+        port = split.port or (443 if tls else 80)
+        target = (split.path or "/") + (f"?{split.query}" if split.query else "")
+        body = orjson.dumps(payload)
+        head = (
+            f"POST {target} HTTP/1.1\r\nHost: {split.netloc}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            + "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+            + "\r\n"
+        ).encode("latin-1")
+
+        key = (host, port, tls)
+        async with self.connections:
+            idle = self.idle.setdefault(key, list())
+            while True:
+                reused = len(idle) > 0
+                reader, writer = idle.pop() if reused else await self._open(*key)
+                response = RawResponse(reader=reader)
+                try:
+                    writer.write(head + body)
+                    await writer.drain()
+                    await response.read_head()
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    # The server may have dropped an idle keep-alive connection
+                    if not reused:
+                        raise
+
+            try:
+                yield response
+            finally:
+                if response.complete and response.keep_alive:
+                    idle.append((reader, writer))
+                else:
+                    writer.close()
+
+    async def aclose(self) -> None:
+        for connections in self.idle.values():
+            for _, writer in connections:
+                writer.close()
+        self.idle.clear()
+
+
+def create_transport(
+    backend: Literal["httpx", "aiohttp", "raw"],
+    aclient: httpx.AsyncClient,
+    max_connections: int = 100,
+) -> Transport:
+    # max_connections matches the httpx default pool, whose limits are set
+    # on aclient
+    if backend == "aiohttp":
+        return AiohttpTransport(max_connections=max_connections)
+    if backend == "raw":
+        return RawTransport(max_connections=max_connections)
+    return HttpxTransport(aclient=aclient)
+
+
+def install_event_loop(runtime: Literal["asyncio", "uvloop"]) -> None:
+    # Every later asyncio.run picks the loop up from the policy
+    if runtime != "uvloop":
+        return
+
+    try:
+        import uvloop
+    except ImportError:
+        raise RuntimeError(
+            "uvloop is not installed, install it with `pip install .[uvloop]`."
+        ) from None
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
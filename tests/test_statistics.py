@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from utils.statistics import (
+    bootstrap_confidence_intervals,
+    mann_whitney_u,
+    rank_with_ties,
+)
+
+
+def mean_statistic(columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    return {"mean": columns["value"].mean(axis=1)}
+
+
+def test_rank_with_ties_averages_tie_groups():
+    ranks, tie_sizes = rank_with_ties(np.array([3, 1, 2, 2, 5, 3, 3], dtype=float))
+
+    assert ranks.tolist() == [5.0, 1.0, 2.5, 2.5, 7.0, 5.0, 5.0]
+    assert tie_sizes.tolist() == [1, 2, 3, 1]
+
+
+def test_rank_with_ties_without_ties():
+    ranks, tie_sizes = rank_with_ties(np.array([0.3, 0.1, 0.2]))
+
+    assert ranks.tolist() == [3.0, 1.0, 2.0]
+    assert tie_sizes.tolist() == [1, 1, 1]
+
+
+def test_mann_whitney_u_untied():
+    # U = 15 - 6, var = 3 * 3 / 12 * 7, z = (9 - 4.5 - 0.5) / sqrt(var)
+    u, p = mann_whitney_u(np.array([1.0, 2.0, 3.0]), np.array([4.0, 5.0, 6.0]))
+
+    assert u == 9.0
+    assert p == pytest.approx(0.0404278, abs=1e-6)
+
+
+def test_mann_whitney_u_tied():
+    # Ranks 1, 3, 3, 6 | 3, 6, 6, 8; tie groups 1, 3, 3, 1
+    u, p = mann_whitney_u(
+        np.array([1.0, 2.0, 2.0, 3.0]), np.array([2.0, 3.0, 3.0, 4.0])
+    )
+
+    assert u == 13.0
+    assert p == pytest.approx(0.0860169, abs=1e-6)
+
+
+def test_mann_whitney_u_is_one_sided():
+    # Only a candidate with larger values, e.g. a latency regression, is
+    # significant; the improvement gets the complementary p-value
+    baseline = np.array([10.0, 11.0, 12.0, 13.0, 14.0, 15.0])
+    regression = baseline + 10
+
+    _, p_regression = mann_whitney_u(baseline, regression)
+    u_improvement, p_improvement = mann_whitney_u(regression, baseline)
+
+    assert p_regression < 0.01
+    assert u_improvement == 0.0
+    assert p_improvement > 0.99
+
+
+def test_mann_whitney_u_degenerate_inputs():
+    assert mann_whitney_u(np.array([]), np.array([1.0])) == (0.0, 1.0)
+    # All values tied, the variance is zero
+    assert mann_whitney_u(np.array([2.0, 2.0, 2.0]), np.array([2.0, 2.0])) == (
+        3.0,
+        1.0,
+    )
+
+
+def test_bootstrap_constant_column_has_zero_width():
+    intervals = bootstrap_confidence_intervals(
+        columns={"value": np.full(50, 7.0)}, statistics=mean_statistic
+    )
+
+    assert intervals == {"mean": (7.0, 7.0, 7.0)}
+
+
+def test_bootstrap_mean_interval():
+    values = np.random.default_rng(1).normal(size=10_000)
+
+    estimate, ci_low, ci_high = bootstrap_confidence_intervals(
+        columns={"value": values}, statistics=mean_statistic
+    )["mean"]
+
+    assert estimate == pytest.approx(values.mean())
+    assert ci_low < estimate < ci_high
+    # Normal theory: 1.96 standard errors on either side
+    assert (ci_high - ci_low) / 2 == pytest.approx(1.96 / 100, rel=0.1)
+
+
+def test_bootstrap_is_deterministic_and_rescales_subsamples():
+    values = np.random.default_rng(2).exponential(size=10_000)
+
+    first = bootstrap_confidence_intervals(
+        columns={"value": values}, statistics=mean_statistic
+    )
+    second = bootstrap_confidence_intervals(
+        columns={"value": values}, statistics=mean_statistic
+    )
+    _, ci_low, ci_high = bootstrap_confidence_intervals(
+        columns={"value": values},
+        statistics=mean_statistic,
+        max_resample_size=1_000,
+    )["mean"]
+
+    assert first == second
+    # m-out-of-n resamples are rescaled to the width of the full sample
+    full_low, full_high = first["mean"][1:]
+    assert ci_high - ci_low == pytest.approx(full_high - full_low, rel=0.15)
+
+
+def test_bootstrap_empty_columns():
+    assert (
+        bootstrap_confidence_intervals(
+            columns={"value": np.array([])}, statistics=mean_statistic
+        )
+        == dict()
+    )
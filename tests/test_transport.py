@@ -0,0 +1,225 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+import orjson
+
+from utils.transport import RawTransport
+
+# Writes one response; returns True to keep the connection open
+Respond = Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[bool]]
+
+SSE_HEAD = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Transfer-Encoding: chunked\r\n\r\n"
+)
+# One event split inside a line, inside "\r\n" and inside the UTF-8 of "é"
+SSE_CHUNKS = (
+    b'data: {"n"',
+    b": 1}\r",
+    b"\n\r\ndata: caf\xc3",
+    b"\xa9\r\n\r\ndata: [DONE]\r\n\r\n",
+)
+SSE_LINES = ['data: {"n": 1}', "", "data: café", "", "data: [DONE]", ""]
+
+
+class ScriptedServer:
+    """Local HTTP/1.1 server answering the n-th request with responses[n]."""
+
+    def __init__(self, responses: list[Respond]) -> None:
+        self.responses = responses
+        self.connections = 0
+        self.payloads: list[dict] = list()
+        self.url = ""
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = next(
+                    int(line.split(b":", 1)[1])
+                    for line in head.split(b"\r\n")
+                    if line.lower().startswith(b"content-length:")
+                )
+                self.payloads.append(orjson.loads(await reader.readexactly(length)))
+                respond = self.responses[len(self.payloads) - 1]
+                if not await respond(reader, writer):
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+@contextlib.asynccontextmanager
+async def serve(*responses: Respond) -> AsyncIterator[ScriptedServer]:
+    server = ScriptedServer(responses=list(responses))
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    server.url = f"http://127.0.0.1:{port}/v1/chat/completions"
+    async with listener:
+        yield server
+
+
+def chunked(*chunks: bytes) -> Respond:
+    async def respond(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        writer.write(SSE_HEAD)
+        for chunk in chunks:
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return True
+
+    return respond
+
+
+def hang_after(chunk: bytes) -> Respond:
+    # Streams one chunk, then waits until the client disconnects
+    async def respond(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        writer.write(SSE_HEAD + f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        await writer.drain()
+        await reader.read()
+        return False
+
+    return respond
+
+
+def plain(body: bytes, headers: bytes, keep_open: bool) -> Respond:
+    async def respond(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        writer.write(b"HTTP/1.1 200 OK\r\n" + headers + b"\r\n" + body)
+        await writer.drain()
+        return keep_open
+
+    return respond
+
+
+async def fetch_lines(transport: RawTransport, url: str) -> list[str]:
+    async with transport.stream(url=url, headers={}, payload={"n": 1}) as response:
+        assert response.status_code == 200
+        return [line async for line in response.aiter_lines()]
+
+
+def idle_connections(transport: RawTransport) -> int:
+    return sum(len(connections) for connections in transport.idle.values())
+
+
+def test_sse_lines_split_across_chunks_on_a_reused_connection():
+    async def scenario() -> None:
+        async with serve(chunked(*SSE_CHUNKS), chunked(*SSE_CHUNKS)) as server:
+            transport = RawTransport()
+            assert await fetch_lines(transport, server.url) == SSE_LINES
+            assert await fetch_lines(transport, server.url) == SSE_LINES
+            await transport.aclose()
+
+        assert server.connections == 1
+        assert server.payloads == [{"n": 1}, {"n": 1}]
+
+    asyncio.run(scenario())
+
+
+def test_connection_close_is_not_pooled():
+    async def scenario() -> None:
+        async with serve(
+            # Without a length the body ends when the server closes
+            plain(b"data: a\n\ndata: b", b"Connection: close\r\n", keep_open=False),
+            plain(
+                b"data: c\n",
+                b"Content-Length: 8\r\nConnection: close\r\n",
+                keep_open=False,
+            ),
+        ) as server:
+            transport = RawTransport()
+            assert await fetch_lines(transport, server.url) == [
+                "data: a",
+                "",
+                "data: b",
+            ]
+            assert idle_connections(transport) == 0
+            assert await fetch_lines(transport, server.url) == ["data: c"]
+            assert idle_connections(transport) == 0
+            await transport.aclose()
+
+        assert server.connections == 2
+
+    asyncio.run(scenario())
+
+
+def test_early_close_drops_the_connection():
+    async def scenario() -> None:
+        async with serve(chunked(*SSE_CHUNKS), chunked(*SSE_CHUNKS)) as server:
+            transport = RawTransport()
+            async with transport.stream(
+                url=server.url, headers={}, payload={"n": 1}
+            ) as response:
+                async for line in response.aiter_lines():
+                    assert line == 'data: {"n": 1}'
+                    break
+            # The unread rest of the stream must not leak into the next request
+            assert idle_connections(transport) == 0
+            assert await fetch_lines(transport, server.url) == SSE_LINES
+            await transport.aclose()
+
+        assert server.connections == 2
+
+    asyncio.run(scenario())
+
+
+def test_abort_mid_stream_then_reuse():
+    async def scenario() -> None:
+        async with serve(
+            hang_after(b"data: 1\r\n\r\n"), chunked(*SSE_CHUNKS), chunked(*SSE_CHUNKS)
+        ) as server:
+            transport = RawTransport()
+            first_line = asyncio.Event()
+
+            async def read_all() -> None:
+                async with transport.stream(
+                    url=server.url, headers={}, payload={"n": 1}
+                ) as response:
+                    async for _ in response.aiter_lines():
+                        first_line.set()
+
+            task = asyncio.create_task(read_all())
+            await first_line.wait()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+            assert idle_connections(transport) == 0
+            assert await fetch_lines(transport, server.url) == SSE_LINES
+            assert await fetch_lines(transport, server.url) == SSE_LINES
+            await transport.aclose()
+
+        # The aborted connection is replaced once, then kept alive
+        assert server.connections == 2
+
+    asyncio.run(scenario())
+
+
+def test_stale_keep_alive_connection_is_retried():
+    async def scenario() -> None:
+        async with serve(
+            # Keep-alive by default, but the server drops the connection
+            plain(b"data: a\n", b"Content-Length: 8\r\n", keep_open=False),
+            chunked(*SSE_CHUNKS),
+        ) as server:
+            transport = RawTransport()
+            assert await fetch_lines(transport, server.url) == ["data: a"]
+            assert idle_connections(transport) == 1
+            await asyncio.sleep(0.05)
+            assert await fetch_lines(transport, server.url) == SSE_LINES
+            await transport.aclose()
+
+        assert server.connections == 2
+
+    asyncio.run(scenario())